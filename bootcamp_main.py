@@ -5,7 +5,6 @@ Main process to setup and manage all the other working processes
 """
 
 import multiprocessing as mp
-import queue
 import time
 
 from pymavlink import mavutil
@@ -17,10 +16,18 @@ from modules.command import command
 from modules.command import command_worker
 from modules.heartbeat import heartbeat_receiver_worker
 from modules.heartbeat import heartbeat_sender_worker
+from modules.mavlink_router import mavlink_router_worker
+from modules.mavlink_router import routed_connection
+from modules.mission import mission
+from modules.reorder import reorder_worker
+from modules.reorder import sequenced_item
+from modules.telemetry import telemetry
 from modules.telemetry import telemetry_worker
-from utilities.workers import queue_proxy_wrapper
+from utilities.workers import pipeline
+from utilities.workers import sharded_queue
 from utilities.workers import worker_controller
 from utilities.workers import worker_manager
+from utilities.workers import worker_supervisor
 
 
 # MAVLink connection
@@ -29,19 +36,38 @@ CONNECTION_STRING = "tcp:localhost:12345"
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
-# Set queue max sizes (<= 0 for infinity)
-INPUT_QUEUE_MAXSIZE = 0
-OUTPUT_QUEUE_MAXSIZE = 0
-
-# Set worker counts
-
-HEARTBEAT_SENDER_COUNT = 1
-HEARTBEAT_RECEIVER_COUNT = 1
-TELEMETRY_WORKER_COUNT = 1
-COMMAND_WORKER_COUNT = 1
+# Queue sizes and backends, and worker counts and scheduling, are in the pipeline section of
+# the configuration file
 
 # Any other constants
 TARGET_POSITION = command.Position(10, 20, 30)  # might need to edit
+# Fly the waypoints of a CSV file of x,y,z lines instead of to the target position, None for
+# the target position
+MISSION_FILE_PATH = None
+MISSION_ACCEPTANCE_RADIUS = 2  # m
+# Start each vehicle at its nearest waypoint rather than the first, only when restarting main
+# while the vehicles are already flying the mission
+MISSION_RESUME_FROM_NEAREST = False
+# Emit fused telemetry as soon as both position and attitude are newer than the last emit
+TELEMETRY_EMIT_POLICY = telemetry.EmitPolicy.ON_BOTH
+TELEMETRY_EMIT_PERIOD = 0.5  # seconds, only for the FIXED_RATE policy
+# Commands are put back in telemetry order after parallel command workers
+# At least the command worker count times the command worker batch size
+REORDER_WINDOW = 128
+MAIN_BATCH_SIZE = 32  # Maximum items read from each queue per main loop iteration
+# Restart crashed workers, and workers stuck without looping (e.g. in a blocking receive)
+SUPERVISOR_PERIOD = 1  # seconds
+WORKER_HANG_TIMEOUT = 10  # seconds
+WORKER_RESTART_INITIAL_BACKOFF = 1  # seconds
+WORKER_RESTART_MAX_BACKOFF = 30  # seconds
+# Time for workers to stop after requesting exit before they are terminated
+SHUTDOWN_TIMEOUT = 2  # seconds
+# Skip frames that no worker subscribes to from the header, without decoding them
+ROUTER_FILTER_MESSAGE_IDS = True
+# Fork process workers from a server that has already imported these, so that starting and
+# restarting a worker does not import them again
+USE_FORKSERVER = False
+FORKSERVER_PRELOAD_MODULES = ["__main__", "pymavlink.mavutil", "numpy"]
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
 # =================================================================================================
@@ -51,6 +77,9 @@ def main() -> int:
     """
     Main function.
     """
+    if USE_FORKSERVER:
+        worker_manager.start_forkserver(FORKSERVER_PRELOAD_MODULES)
+
     # Configuration settings
     result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
     if not result:
@@ -69,8 +98,7 @@ def main() -> int:
     # Get Pylance to stop complaining
     assert main_logger is not None
 
-    # Create a connection to the drone. Assume that this is safe to pass around to all processes
-    # In reality, this will not work, but to simplify the bootamp, preetend it is allowed
+    # Create a connection to the drone. Only the MAVLink router worker uses it after startup
     # To test, you will run each of your workers individually to see if they work
     # (test "drones" are provided for you test your workers)
     # NOTE: If you want to have type annotations for the connection, it is of type mavutil.mavfile
@@ -86,141 +114,147 @@ def main() -> int:
     # Create a multiprocess manager for synchronized queues
 
     manager = mp.Manager()
-    # Create queues
-
-    heartbeat_output_queue = queue_proxy_wrapper.QueueProxyWrapper(manager, OUTPUT_QUEUE_MAXSIZE)
-
-    telemetry_output_queue = queue_proxy_wrapper.QueueProxyWrapper(manager, OUTPUT_QUEUE_MAXSIZE)
-
-    command_input_queue = telemetry_output_queue  # telemetry feeds command
-    command_output_queue = queue_proxy_wrapper.QueueProxyWrapper(manager, OUTPUT_QUEUE_MAXSIZE)
+    # Create queues, their sizes and the worker counts are in the pipeline configuration
 
-    # Create worker properties for each worker type (what inputs it takes, how many workers)
-    # Heartbeat sender
-
-    result, heartbeat_sender_properties = worker_manager.WorkerProperties.create(
-        count=HEARTBEAT_SENDER_COUNT,
-        target=heartbeat_sender_worker.heartbeat_sender_worker,
-        work_arguments=(connection,),
-        input_queues=[],
-        output_queues=[],
-        controller=controller,
-        local_logger=main_logger,
+    result, bootcamp_pipeline = pipeline.Pipeline.create(
+        config["pipeline"], manager, controller, main_logger
     )
-
     if not result:
-        main_logger.error("Failed to create Heartbeat Sender")
+        main_logger.error("Failed to create pipeline")
         return -1
 
-    # Heartbeat receiver
-    result, heartbeat_receiver_properties = worker_manager.WorkerProperties.create(
-        count=HEARTBEAT_RECEIVER_COUNT,
-        target=heartbeat_receiver_worker.heartbeat_receiver_worker,
-        work_arguments=(connection,),
-        input_queues=[],
-        output_queues=[heartbeat_output_queue],
-        controller=controller,
-        local_logger=main_logger,
+    # Get Pylance to stop complaining
+    assert bootcamp_pipeline is not None
+
+    # Only the router uses the connection, it routes received messages to the other workers
+    # by type and writes their outbound messages
+    # Telemetry and acknowledgements are sharded by system ID, so each vehicle is handled by
+    # 1 telemetry and 1 command worker, each with a routed connection to its shard
+    heartbeat_message_queue = bootcamp_pipeline.get_queue("heartbeat_message")
+    telemetry_message_queue = bootcamp_pipeline.get_queue("telemetry_message")
+    command_ack_queue = bootcamp_pipeline.get_queue("command_ack")
+    outbound_queue = bootcamp_pipeline.get_queue("outbound")
+    routes = {
+        "HEARTBEAT": [heartbeat_message_queue],
+        "ATTITUDE": [telemetry_message_queue],
+        "LOCAL_POSITION_NED": [telemetry_message_queue],
+        "COMMAND_ACK": [command_ack_queue],
+    }
+
+    heartbeat_sender_connection = routed_connection.RoutedConnection(None, outbound_queue)
+    heartbeat_receiver_connection = routed_connection.RoutedConnection(
+        heartbeat_message_queue, None
     )
-
-    if not result:
-        main_logger.error("Failed to create Heartbeat Receiver")
-        return -1
-
-    # Telemetry
-
-    result, telemetry_properties = worker_manager.WorkerProperties.create(
-        count=TELEMETRY_WORKER_COUNT,
-        target=telemetry_worker.telemetry_worker,
-        work_arguments=(connection,),
-        input_queues=[],
-        output_queues=[telemetry_output_queue],
-        controller=controller,
-        local_logger=main_logger,
+    telemetry_connections = sharded_queue.PerWorker(
+        [
+            routed_connection.RoutedConnection(shard, None)
+            for shard in telemetry_message_queue.get_shards()
+        ]
     )
-
-    if not result:
-        main_logger.error("Failed to create Telemetry Worker")
-        return -1
-
-    # Command
-
-    result, command_properties = worker_manager.WorkerProperties.create(
-        count=COMMAND_WORKER_COUNT,
-        target=command_worker.command_worker,
-        work_arguments=(connection, TARGET_POSITION),
-        input_queues=[command_input_queue],
-        output_queues=[command_output_queue],
-        controller=controller,
-        local_logger=main_logger,
+    command_connections = sharded_queue.PerWorker(
+        [
+            routed_connection.RoutedConnection(shard, outbound_queue)
+            for shard in command_ack_queue.get_shards()
+        ]
     )
+    telemetry_sequence_counter = sequenced_item.SequenceCounter()
 
+    # Waypoints are indexed once here rather than in every command worker
+    target = TARGET_POSITION
+    if MISSION_FILE_PATH is not None:
+        try:
+            target = mission.Mission.load(MISSION_FILE_PATH, MISSION_ACCEPTANCE_RADIUS)
+        except (OSError, ValueError) as exception:
+            main_logger.error(f"Failed to load mission: {exception}")
+            return -1
+
+        main_logger.info(f"Loaded mission of {len(target)} waypoints")
+
+    # Create the workers of each stage from what it runs and its arguments
+    # excluding input/output queues and controller
+
+    result = bootcamp_pipeline.create_workers(
+        {
+            "mavlink_router": (
+                mavlink_router_worker.mavlink_router_worker,
+                (connection, routes, ROUTER_FILTER_MESSAGE_IDS),
+            ),
+            "heartbeat_sender": (
+                heartbeat_sender_worker.heartbeat_sender_worker,
+                (heartbeat_sender_connection,),
+            ),
+            "heartbeat_receiver": (
+                heartbeat_receiver_worker.heartbeat_receiver_worker,
+                (heartbeat_receiver_connection,),
+            ),
+            "telemetry": (
+                telemetry_worker.telemetry_worker,
+                (
+                    telemetry_connections,
+                    TELEMETRY_EMIT_POLICY,
+                    TELEMETRY_EMIT_PERIOD,
+                    telemetry_sequence_counter,
+                ),
+            ),
+            "command": (
+                command_worker.command_worker,
+                (command_connections, target, MISSION_RESUME_FROM_NEAREST),
+            ),
+            "reorder": (
+                reorder_worker.reorder_worker,
+                (REORDER_WINDOW,),
+            ),
+        }
+    )
     if not result:
-        main_logger.error("Failed to create Command Worker")
+        main_logger.error("Failed to create workers")
         return -1
 
-    # Create the workers (processes) and obtain their managers
-
-    result_heartbeat_sender, heartbeat_sender_manager = worker_manager.WorkerManager.create(
-        heartbeat_sender_properties, main_logger
-    )
-    result_heartbeat_receiver, heartbeat_receiver_manager = worker_manager.WorkerManager.create(
-        heartbeat_receiver_properties, main_logger
-    )
-    result_telemetry, telemetry_manager = worker_manager.WorkerManager.create(
-        telemetry_properties, main_logger
-    )
-    result_command, command_manager = worker_manager.WorkerManager.create(
-        command_properties, main_logger
-    )
-
     # Start worker processes
 
-    if result_heartbeat_sender:
-        heartbeat_sender_manager.start_workers()
-    else:
-        main_logger.warning("Heartbeat Sender Not Created")
-        return -1
+    bootcamp_pipeline.start_workers()
 
-    if result_heartbeat_receiver:
-        heartbeat_receiver_manager.start_workers()
-    else:
-        main_logger.warning("Heartbeat Receiver Not Created")
+    result, supervisor = worker_supervisor.WorkerSupervisor.create(
+        bootcamp_pipeline.get_worker_managers(),
+        controller,
+        WORKER_HANG_TIMEOUT,
+        WORKER_RESTART_INITIAL_BACKOFF,
+        WORKER_RESTART_MAX_BACKOFF,
+        main_logger,
+    )
+    if not result:
+        main_logger.error("Failed to create Worker Supervisor")
         return -1
 
-    if result_telemetry:
-        telemetry_manager.start_workers()
-    else:
-        main_logger.warning("Telemetry Not Created")
-        return -1
+    # Get Pylance to stop complaining
+    assert supervisor is not None
 
-    if result_command:
-        command_manager.start_workers()
-    else:
-        main_logger.warning("Command Not Created")
-        return -1
+    supervisor.start(SUPERVISOR_PERIOD)
 
     main_logger.info("Started")
 
     # Main's work: read from all queues that output to main, and log any commands that we make
 
+    heartbeat_output_queue = bootcamp_pipeline.get_queue("heartbeat_output")
+    command_output_queue = bootcamp_pipeline.get_queue("command_output")
     start_time = time.time()
     # Continue running for 100 seconds or until the drone disconnects
 
     while time.time() - start_time < 100 and not controller.is_exit_requested():
         controller.check_pause()
 
-        try:
-            heartbeat_msg = heartbeat_output_queue.queue.get_nowait()
-            if heartbeat_msg == "Disconnected":
-                controller.request_exit()
-                break
+        heartbeat_states = heartbeat_output_queue.get_many(MAIN_BATCH_SIZE, 0.0)
+        if "Disconnected" in heartbeat_states:
+            controller.request_exit()
+            break
+
+        # Each item is the actions decided from 1 telemetry sample
+        for actions in command_output_queue.get_many(MAIN_BATCH_SIZE, 0.5):
+            if actions is None:
+                continue
 
-            cmd = command_output_queue.queue.get(timeout=0.5)
-            if cmd is not None:
-                main_logger.info(f"Command issued: {cmd}")
-        except queue.Empty:
-            pass
+            for action in actions:
+                main_logger.info(f"Command issued to system {action.system_id}: {action}")
 
         # if time.time() - last_heartbeat_time > heartbeat_timeout:
         #     main_logger.info("Drone Disconnected - No heartbeats")
@@ -228,22 +262,16 @@ def main() -> int:
 
     # Stop the processes
 
+    supervisor.stop()
     controller.request_exit()
     main_logger.info("Requested exit")
 
-    # Fill and drain queues from END TO START
-    command_output_queue.fill_and_drain_queue()
-    telemetry_output_queue.fill_and_drain_queue()
-    heartbeat_output_queue.fill_and_drain_queue()
-    main_logger.info("Queues cleared")
-
-    # Clean up worker processes
-
-    heartbeat_sender_manager.join_workers()
-    heartbeat_receiver_manager.join_workers()
-    telemetry_manager.join_workers()
-    command_manager.join_workers()
-    main_logger.info("Stopped")
+    # Close queues and join workers from END TO START, forcibly if they do not stop in time
+    shutdown_time = bootcamp_pipeline.stop(SHUTDOWN_TIMEOUT)
+    main_logger.info(
+        f"Stopped in {shutdown_time} s, "
+        f"workers exited {controller.get_exit_latency()} s after requesting exit"
+    )
 
     # We can reset controller in case we want to reuse it
 
@@ -14,9 +14,9 @@ from documentation.multiprocess_example.countup import countup_worker
 from modules.common.modules.logger import logger
 from modules.common.modules.logger import logger_main_setup
 from modules.common.modules.read_yaml import read_yaml
-from utilities.workers import queue_proxy_wrapper
+from utilities.workers import pipeline
+from utilities.workers import worker_autoscaler
 from utilities.workers import worker_controller
-from utilities.workers import worker_manager
 
 
 # Play with these numbers to see queue bottlenecks
@@ -25,9 +25,21 @@ ADD_RANDOM_TO_CONCATENATOR_QUEUE_MAX_SIZE = 5
 
 # Play with these numbers to see process bottlenecks
 COUNTUP_WORKER_COUNT = 2
-ADD_RANDOM_WORKER_COUNT = 2
+ADD_RANDOM_WORKER_COUNT = 1
 CONCATENATOR_WORKER_COUNT = 2
 
+# Add Random is stateless, so it is scaled between its worker count and this
+# to keep the time to drain its input queue between the drain times
+ADD_RANDOM_MAX_WORKER_COUNT = 4
+ADD_RANDOM_SERVICE_TIME = 0.2  # seconds per item, initial estimate
+SCALE_UP_DRAIN_TIME = 0.5  # seconds
+SCALE_DOWN_DRAIN_TIME = 0.1  # seconds
+SCALE_COOLDOWN = 1  # seconds
+SCALE_PERIOD = 0.2  # seconds
+
+# Time for workers to stop after requesting exit before they are terminated
+SHUTDOWN_TIMEOUT = 2  # seconds
+
 
 # main() is required for early return
 def main() -> int:
@@ -62,130 +74,90 @@ def main() -> int:
     # See 2nd note: https://docs.python.org/3/library/multiprocessing.html#pipes-and-queues
     mp_manager = mp.Manager()
 
+    # Queues and stages, usually the "pipeline" section of the configuration file
+    # Data path: countup_worker to add_random_worker to concatenator_workers
     # Queue maxsize should always be >= the larger of producers/consumers count
     # Example: Producers 3, consumers 2, so queue maxsize minimum is 3
-    countup_to_add_random_queue = queue_proxy_wrapper.QueueProxyWrapper(
-        mp_manager,
-        COUNTUP_TO_ADD_RANDOM_QUEUE_MAX_SIZE,
-    )
-    add_random_to_concatenator_queue = queue_proxy_wrapper.QueueProxyWrapper(
-        mp_manager,
-        ADD_RANDOM_TO_CONCATENATOR_QUEUE_MAX_SIZE,
-    )
-
-    # Worker properties
-    result, countup_worker_properties = worker_manager.WorkerProperties.create(
-        count=COUNTUP_WORKER_COUNT,  # How many workers
-        target=countup_worker.countup_worker,  # What's the function that this worker runs
-        work_arguments=(  # The function's arguments excluding input/output queues and controller
-            3,
-            100,
-        ),
-        input_queues=[],  # Note that input/output queues must be in the proper order
-        output_queues=[countup_to_add_random_queue],
-        controller=controller,  # Worker controller
-        local_logger=main_logger,  # Main logger to log any failures during worker creation
-    )
-    if not result:
-        print("Failed to create arguments for Countup")
-        return -1
-
-    # Get Pylance to stop complaining
-    assert countup_worker_properties is not None
-
-    result, add_random_worker_properties = worker_manager.WorkerProperties.create(
-        count=ADD_RANDOM_WORKER_COUNT,
-        target=add_random_worker.add_random_worker,
-        work_arguments=(
-            252,
-            10,
-            5,
-        ),
-        input_queues=[countup_to_add_random_queue],
-        output_queues=[add_random_to_concatenator_queue],
-        controller=controller,
-        local_logger=main_logger,
+    # Each queue gets a sentinel per worker that consumes it at shutdown
+    topology = {
+        "queues": {
+            "countup_to_add_random": {"maxsize": COUNTUP_TO_ADD_RANDOM_QUEUE_MAX_SIZE},
+            "add_random_to_concatenator": {"maxsize": ADD_RANDOM_TO_CONCATENATOR_QUEUE_MAX_SIZE},
+        },
+        "stages": {
+            "countup": {
+                "count": COUNTUP_WORKER_COUNT,  # How many workers
+                "output_queues": ["countup_to_add_random"],
+            },
+            "add_random": {
+                "count": ADD_RANDOM_WORKER_COUNT,
+                "max_count": ADD_RANDOM_MAX_WORKER_COUNT,
+                # Note that input/output queues must be in the proper order
+                "input_queues": ["countup_to_add_random"],
+                "output_queues": ["add_random_to_concatenator"],
+            },
+            "concatenator": {
+                "count": CONCATENATOR_WORKER_COUNT,
+                "input_queues": ["add_random_to_concatenator"],
+            },
+        },
+    }
+
+    # Creates the queues, main logger logs any problem with the topology
+    result, example_pipeline = pipeline.Pipeline.create(
+        topology, mp_manager, controller, main_logger
     )
     if not result:
-        print("Failed to create arguments for Add Random")
+        print("Failed to create pipeline")
         return -1
 
     # Get Pylance to stop complaining
-    assert add_random_worker_properties is not None
-
-    result, concatenator_worker_properties = worker_manager.WorkerProperties.create(
-        count=CONCATENATOR_WORKER_COUNT,
-        target=concatenator_worker.concatenator_worker,
-        work_arguments=(
-            "Hello ",
-            " world!",
-        ),
-        input_queues=[add_random_to_concatenator_queue],
-        output_queues=[],
-        controller=controller,
-        local_logger=main_logger,
+    assert example_pipeline is not None
+
+    # What function each stage runs, and its arguments excluding input/output queues and
+    # controller
+    result = example_pipeline.create_workers(
+        {
+            "countup": (countup_worker.countup_worker, (3, 100)),
+            "add_random": (add_random_worker.add_random_worker, (252, 10, 5)),
+            "concatenator": (concatenator_worker.concatenator_worker, ("Hello ", " world!")),
+        }
     )
     if not result:
-        print("Failed to create arguments for Concatenator")
+        print("Failed to create workers")
         return -1
 
-    # Get Pylance to stop complaining
-    assert concatenator_worker_properties is not None
-
-    # Prepare processes
-    # Data path: countup_worker to add_random_worker to concatenator_workers
-    worker_managers: list[worker_manager.WorkerManager] = []  # List of all worker managers
-
-    result, countup_manager = worker_manager.WorkerManager.create(
-        worker_properties=countup_worker_properties,
-        local_logger=main_logger,
-    )
-    if not result:
-        print("Failed to create manager for Countup")
-        return -1
-
-    # Get Pylance to stop complaining
-    assert countup_manager is not None
-
-    worker_managers.append(countup_manager)
-
-    result, add_random_manager = worker_manager.WorkerManager.create(
-        worker_properties=add_random_worker_properties,
-        local_logger=main_logger,
-    )
-    if not result:
-        print("Failed to create manager for Add Random")
-        return -1
-
-    # Get Pylance to stop complaining
-    assert add_random_manager is not None
-
-    worker_managers.append(add_random_manager)
-
-    result, concatenator_manager = worker_manager.WorkerManager.create(
-        worker_properties=concatenator_worker_properties,
-        local_logger=main_logger,
+    # Start worker processes
+    example_pipeline.start_workers()
+
+    result, add_random_autoscaler = worker_autoscaler.WorkerAutoscaler.create(
+        example_pipeline.get_worker_manager("add_random"),
+        controller,
+        ADD_RANDOM_SERVICE_TIME,
+        SCALE_UP_DRAIN_TIME,
+        SCALE_DOWN_DRAIN_TIME,
+        SCALE_COOLDOWN,
+        main_logger,
     )
     if not result:
-        print("Failed to create manager for Concatenator")
+        print("Failed to create autoscaler for Add Random")
         return -1
 
     # Get Pylance to stop complaining
-    assert concatenator_manager is not None
-
-    worker_managers.append(concatenator_manager)
+    assert add_random_autoscaler is not None
 
-    # Start worker processes
-    for manager in worker_managers:
-        manager.start_workers()
+    add_random_autoscaler.start(SCALE_PERIOD)
 
     main_logger.info("Started", True)
 
     # Run for some time and then pause
     time.sleep(2)
-    controller.request_pause()
-
-    main_logger.info("Paused", True)
+    # Workers blocked on a full queue do not reach check_pause(), so do not wait forever
+    result = controller.request_pause(True, 1.0)
+    if result:
+        main_logger.info(f"Paused, all workers parked in {controller.get_pause_latency()} s", True)
+    else:
+        main_logger.warning("Paused, not all workers parked in time", True)
 
     time.sleep(4)
     controller.request_resume()
@@ -194,19 +166,14 @@ def main() -> int:
     time.sleep(2)
 
     # Stop the processes
+    add_random_autoscaler.stop()
     controller.request_exit()
 
     main_logger.info("Requested exit", True)
 
-    # Fill and drain queues from END TO START
-    countup_to_add_random_queue.fill_and_drain_queue()
-    add_random_to_concatenator_queue.fill_and_drain_queue()
-
-    main_logger.info("Queues cleared", True)
-
-    # Clean up worker processes
-    for manager in worker_managers:
-        manager.join_workers()
+    # Unblock workers and clean up worker processes from END TO START,
+    # forcibly if they do not stop in time
+    example_pipeline.stop(SHUTDOWN_TIMEOUT)
 
     main_logger.info("Stopped", True)
 
@@ -4,6 +4,7 @@ Intermediate worker that adds a random number to the input.
 
 import os
 import pathlib
+import queue
 
 from modules.common.modules.logger import logger
 from utilities.workers import queue_proxy_wrapper
@@ -11,6 +12,9 @@ from utilities.workers import worker_controller
 from . import add_random
 
 
+QUEUE_TIMEOUT = 0.5  # seconds
+
+
 def add_random_worker(
     seed: int,
     max_random_term: int,
@@ -51,8 +55,11 @@ def add_random_worker(
 
         # Get an item from the queue
         # If the queue is empty, the worker process will block
-        # until the queue is non-empty
-        term = input_queue.queue.get()
+        # until the queue is non-empty or the timeout, so that it notices when it is retired
+        try:
+            term = input_queue.queue.get(timeout=QUEUE_TIMEOUT)
+        except queue.Empty:
+            continue
 
         # Exit on sentinel
         if term is None:
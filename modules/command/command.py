@@ -2,12 +2,18 @@
 Decision-making logic.
 """
 
+import enum
 import math
 
+import numpy as np
 from pymavlink import mavutil
 
+from . import command_sender
+from . import decision
 from ..common.modules.logger import logger
+from ..mission import mission
 from ..telemetry import telemetry
+from ..telemetry import telemetry_history
 
 
 class Position:
@@ -21,6 +27,42 @@ class Position:
         self.z = z
 
 
+class ActionType(enum.Enum):
+    """
+    Control axis of an action.
+    """
+
+    CHANGE_ALTITUDE = 0
+    CHANGE_YAW = 1
+
+
+class Action:
+    """
+    Command decided for 1 control axis. Rendered as text only when logged.
+    """
+
+    __slots__ = ("action_type", "amount", "system_id")
+
+    __NAMES = {
+        ActionType.CHANGE_ALTITUDE: "CHANGE ALTITUDE",
+        ActionType.CHANGE_YAW: "CHANGE YAW",
+    }
+
+    def __init__(self, action_type: ActionType, amount: float, system_id: int = 1) -> None:
+        """
+        action_type: Control axis.
+        amount: Change in height in m, or change in yaw in degrees in the range [-180, 180]
+            with positive counter-clockwise.
+        system_id: System ID of the vehicle commanded.
+        """
+        self.action_type = action_type
+        self.amount = amount
+        self.system_id = system_id
+
+    def __str__(self) -> str:
+        return f"{self.__NAMES[self.action_type]}: {self.amount:.2f}"
+
+
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
@@ -28,21 +70,56 @@ class Command:  # pylint: disable=too-many-instance-attributes
     """
     Command class to make a decision based on recieved telemetry,
     and send out commands based upon the data.
+
+    Each vehicle is commanded separately by the system ID of its telemetry, with a velocity
+    history per vehicle. All vehicles fly the same mission, each with its own progress, and
+    a fixed target is a mission of 1 waypoint.
+
+    MAV_CMD_CONDITION_YAW is a turn relative to the current heading, whose angle shrinks on
+    every sample as the vehicle turns. Sending it again would add to the turn in progress, so
+    a yaw is only sent again once the heading it turns to has moved by more than the yaw
+    tolerance, or the last one failed or was given up on.
     """
 
     __private_key = object()
 
+    # Telemetry arrives at a few Hz, this covers well over the averaging window
+    __HISTORY_CAPACITY = 256
+    __EMA_TIME_CONSTANT = 2000  # ms
+    __AVERAGE_VELOCITY_WINDOW = 5000  # ms
+    # Commands without an acknowledgement are sent again, a few times
+    __ACK_TIMEOUT = 1.0  # seconds
+    __MAX_RETRIES = 3
+    # For telemetry without a system ID, such as from a single vehicle test
+    __DEFAULT_SYSTEM_ID = 1
+    # Deciding in NumPy has a fixed cost, and is only faster for batches at least this large
+    __MIN_SWARM_BATCH_SIZE = 16
+    # A fixed target is held, so its acceptance radius only matters for logging
+    __TARGET_ACCEPTANCE_RADIUS = 1.0  # m
+
     @classmethod
     def create(
         cls,
         connection: mavutil.mavfile,
-        target: Position,
+        target: "Position | mission.Mission",
         local_logger: logger.Logger,
+        resume_from_nearest: bool = False,
     ) -> tuple:
         """
         Falliable create (instantiation) method to create a Command object.
+
+        target: Mission to fly, or a fixed position.
+        resume_from_nearest: Whether vehicles start at the waypoint nearest to them rather than
+            the first, for vehicles already flying the mission (e.g. after a restart).
         """
-        return True, Command(cls.__private_key, connection, target, local_logger)
+        if isinstance(target, Position):
+            target = mission.Mission(
+                [(target.x, target.y, target.z)], cls.__TARGET_ACCEPTANCE_RADIUS
+            )
+
+        return True, Command(
+            cls.__private_key, connection, target, local_logger, resume_from_nearest
+        )
 
         #  Create a Command object
 
@@ -50,48 +127,202 @@ class Command:  # pylint: disable=too-many-instance-attributes
         self,
         key: object,
         connection: mavutil.mavfile,
-        target: Position,
+        target: mission.Mission,
         local_logger: logger.Logger,
+        resume_from_nearest: bool,
     ) -> None:
         assert key is Command.__private_key, "Use create() method"
 
         # Do any intializiation here
         self.key = key
         self.connection = connection
-        self.target = target
+        self.mission = target
+        self.resume_from_nearest = resume_from_nearest
         self.local_logger = local_logger
-        self.velocity_x = 0
-        self.velocity_y = 0
-        self.velocity_z = 0
-        self.counter = 0
+        # System ID to the index of the waypoint the vehicle is flying to
+        self.waypoint_indices: "dict[int, int]" = {}
+        # System ID to the telemetry history of the vehicle, added when it is first seen
+        self.histories: "dict[int, telemetry_history.TelemetryHistory]" = {}
+        # System ID to the heading in degrees of the last yaw sent, until the vehicle faces it
+        self.yaw_headings: "dict[int, float]" = {}
+        self.sender = command_sender.CommandSender(
+            connection,
+            self.__ACK_TIMEOUT,
+            self.__MAX_RETRIES,
+            self.__DEFAULT_SYSTEM_ID,
+        )
+
+    def __get_history(self, system_id: int) -> telemetry_history.TelemetryHistory:
+        """
+        Returns the telemetry history of the vehicle.
+        """
+        history = self.histories.get(system_id)
+        if history is None:
+            history = telemetry_history.TelemetryHistory(
+                self.__HISTORY_CAPACITY,
+                self.__EMA_TIME_CONSTANT,
+            )
+            self.histories[system_id] = history
+
+        return history
+
+    def run_sender(self) -> None:
+        """
+        Handles command acknowledgements and sends again the commands that timed out.
+        Call regularly, including when there is no telemetry.
+        """
+        acknowledged, given_up = self.sender.run()
+        for (system_id, command, params), result in acknowledged:
+            if result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
+                self.local_logger.info(f"Command {command} {params} to {system_id} accepted")
+                continue
+
+            self.local_logger.warning(
+                f"Command {command} {params} to {system_id} failed with result {result}"
+            )
+            # The vehicle is not turning, so the next decision sends the yaw again
+            if command == mavutil.mavlink.MAV_CMD_CONDITION_YAW:
+                self.yaw_headings.pop(system_id, None)
+
+        for system_id, command, params in given_up:
+            if command == mavutil.mavlink.MAV_CMD_CONDITION_YAW:
+                self.yaw_headings.pop(system_id, None)
+
+            self.local_logger.warning(
+                f"Command {command} {params} to {system_id} not acknowledged, giving up"
+            )
+
+    def __update_history(self, current_telemetry: telemetry.TelemetryData) -> int:
+        """
+        Adds the telemetry to the history of its vehicle, and logs the average velocity over
+        the last few seconds.
+
+        Returns the system ID of the vehicle.
+        """
+        system_id = current_telemetry.system_id
+        if system_id is None:
+            system_id = self.__DEFAULT_SYSTEM_ID
+
+        history = self.__get_history(system_id)
+        is_added = history.append(
+            current_telemetry.time_since_boot,
+            current_telemetry.values()[1:],
+        )
+        if is_added:
+            end_time = history.get_newest_time()
+            start_time = end_time - self.__AVERAGE_VELOCITY_WINDOW
+            _, mean = history.mean(start_time, end_time)
+            avg_vel = tuple(
+                float(mean[telemetry_history.VALUE_INDEX[name]])
+                for name in ("x_velocity", "y_velocity", "z_velocity")
+            )
+
+            self.local_logger.info(f"Average velocity vector of {system_id}: {avg_vel} m/s")
+
+        return system_id
+
+    def __get_target(
+        self, system_id: int, current_telemetry: telemetry.TelemetryData
+    ) -> "tuple[float, float, float]":
+        """
+        Advances the vehicle past the waypoints it has reached.
+
+        Returns the position of the waypoint to fly to.
+        """
+        index = self.waypoint_indices.get(system_id)
+        position = (current_telemetry.x, current_telemetry.y, current_telemetry.z)
+        next_index = self.mission.get_next_target(index, position, self.resume_from_nearest)
+        if next_index != index:
+            self.local_logger.info(
+                f"System {system_id} flying to waypoint {next_index} of {len(self.mission)}"
+            )
+            self.waypoint_indices[system_id] = next_index
+
+        return self.mission.get_waypoint(next_index)
+
+    def __is_turning(self, system_id: int, yaw: float, delta_yaw: float) -> bool:
+        """
+        Records the heading the yaw turns to, unless it is within the yaw tolerance of the
+        heading of the last yaw sent.
+
+        yaw: Heading in radians.
+        delta_yaw: Change in yaw in degrees.
+
+        Returns whether the vehicle is already turning to the heading.
+        """
+        heading = math.degrees(yaw) + delta_yaw
+        last_heading = self.yaw_headings.get(system_id)
+        if last_heading is not None:
+            # Wrap to [-180, 180)
+            difference = (heading - last_heading + 180.0) % 360.0 - 180.0
+            if abs(difference) <= decision.YAW_TOLERANCE:
+                return True
+
+        self.yaw_headings[system_id] = heading
+        return False
+
+    def __send(
+        self,
+        system_id: int,
+        commands: "list[tuple[int, tuple[float, ...]]]",
+        delta_height: float,
+        yaw: float,
+        delta_yaw: float,
+    ) -> "list[Action]":
+        """
+        Sends the commands to the vehicle together, except a yaw to the heading the vehicle is
+        already turning to.
+
+        yaw: Heading in radians.
+
+        Returns an action per command.
+        """
+        is_yaw_decided = any(
+            command_id == mavutil.mavlink.MAV_CMD_CONDITION_YAW for command_id, _ in commands
+        )
+        if not is_yaw_decided:
+            # Facing the heading
+            self.yaw_headings.pop(system_id, None)
+
+        commands_to_send = commands
+        if is_yaw_decided and self.__is_turning(system_id, yaw, delta_yaw):
+            commands_to_send = [
+                command
+                for command in commands
+                if command[0] != mavutil.mavlink.MAV_CMD_CONDITION_YAW
+            ]
+
+        # The sender skips a command in flight with the same parameters and replaces one with
+        # different parameters, so each vehicle has at most 1 of each command in flight
+        self.sender.send_many(commands_to_send, target_system=system_id)
+
+        actions = []
+        for command_id, _ in commands:
+            if command_id == mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT:
+                actions.append(Action(ActionType.CHANGE_ALTITUDE, delta_height, system_id))
+            else:
+                actions.append(Action(ActionType.CHANGE_YAW, delta_yaw, system_id))
+
+        return actions
 
     def run(
         self,
         current_telemetry: telemetry.TelemetryData,
-    ) -> str:
+    ) -> "list[Action]":
         """
         Make a decision based on received telemetry data.
+        Every control axis is evaluated each time, and the commands needed are sent together.
+
+        Returns an action per axis that needs a command, empty if none do.
         """
 
         if current_telemetry is None:
             self.local_logger.warning("No telemetry data receieved!")
-            return "No telemetry data received"
-
-        # Log average velocity for this trip so far
+            return []
 
-        if current_telemetry is not None:
-            self.counter += 1
-            self.velocity_x += current_telemetry.x_velocity
-            self.velocity_y += current_telemetry.y_velocity
-            self.velocity_z += current_telemetry.z_velocity
+        system_id = self.__update_history(current_telemetry)
 
-            dt = self.counter
-
-            avg_vel = (self.velocity_x / dt, self.velocity_y / dt, self.velocity_z / dt)
-
-            self.local_logger.info(f"Average velocity vector: {avg_vel} m/s")
-
-        # Use COMMAND_LONG (76) message, assume the target_system=1 and target_componenet=0
+        # Use COMMAND_LONG (76) message, target_system is the vehicle of the telemetry and target_componenet=0
         # The appropriate commands to use are instructed below
 
         # Adjust height using the comand MAV_CMD_CONDITION_CHANGE_ALT (113)
@@ -101,57 +332,78 @@ class Command:  # pylint: disable=too-many-instance-attributes
         # String to return to main: "CHANGING_YAW: {degree you changed it by in range [-180, 180]}"
         # Positive angle is counter-clockwise as in a right handed system
 
-        dx = self.target.x - current_telemetry.x
-        dy = self.target.y - current_telemetry.y
-        target_yaw = math.atan2(dy, dx)
-        current_yaw = current_telemetry.yaw
-
-        # Compute delta yaw in radians
-        delta_yaw_rad = target_yaw - current_yaw
-        delta_yaw_rad = math.atan2(math.sin(delta_yaw_rad), math.cos(delta_yaw_rad))
-        delta_yaw_deg = math.degrees(delta_yaw_rad)
-
-        if delta_yaw_deg >= 0:
-            direction = -1
-        else:
-            direction = 1
-
-        delta_height = self.target.z - current_telemetry.z
-
-        if abs(delta_height) > 0.5:
-            self.connection.mav.command_long_send(
-                target_system=1,
-                target_component=0,
-                command=mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT,
-                confirmation=0,
-                param1=1,
-                param2=0,
-                param3=0,
-                param4=0,
-                param5=0,
-                param6=0,
-                param7=self.target.z,
-            )
-            return f"CHANGE ALTITUDE: {delta_height:.2f}"
-
-        if abs(delta_yaw_deg) > 5:
-            self.connection.mav.command_long_send(
-                target_system=1,
-                target_component=0,
-                command=mavutil.mavlink.MAV_CMD_CONDITION_YAW,
-                confirmation=0,
-                param1=abs(delta_yaw_deg),
-                param2=5,
-                param3=direction,
-                param4=1,
-                param5=0,
-                param6=0,
-                param7=0,
+        target = self.__get_target(system_id, current_telemetry)
+        delta_height, delta_yaw_deg, direction = decision.decide(
+            current_telemetry.x,
+            current_telemetry.y,
+            current_telemetry.z,
+            current_telemetry.yaw,
+            *target,
+        )
+
+        # Altitude and yaw are independent, so correct both at once
+        commands = decision.get_commands(delta_height, delta_yaw_deg, direction, target[2])
+
+        return self.__send(system_id, commands, delta_height, current_telemetry.yaw, delta_yaw_deg)
+
+    def run_many(
+        self,
+        telemetry_batch: "list[telemetry.TelemetryData]",
+    ) -> "list[list[Action]]":
+        """
+        Same as run() for each telemetry in order, with the decisions for all of them made
+        in a single NumPy pass for large batches, see decision.decide_swarm() .
+
+        Returns the actions of each telemetry, empty for None as with run() .
+        """
+        valid_batch = [
+            current_telemetry
+            for current_telemetry in telemetry_batch
+            if current_telemetry is not None
+        ]
+        if len(valid_batch) < self.__MIN_SWARM_BATCH_SIZE:
+            return [self.run(current_telemetry) for current_telemetry in telemetry_batch]
+
+        system_ids = []
+        targets = []
+        for current_telemetry in valid_batch:
+            system_id = self.__update_history(current_telemetry)
+            system_ids.append(system_id)
+            targets.append(self.__get_target(system_id, current_telemetry))
+
+        positions = np.array(
+            [
+                (current_telemetry.x, current_telemetry.y, current_telemetry.z)
+                for current_telemetry in valid_batch
+            ],
+            dtype=np.float64,
+        )
+        yaws = np.array(
+            [current_telemetry.yaw for current_telemetry in valid_batch], dtype=np.float64
+        )
+        swarm_decision = decision.decide_swarm(positions, yaws, np.array(targets, dtype=np.float64))
+
+        valid_actions = iter(
+            self.__send(
+                system_id,
+                swarm_decision.get_commands(i),
+                float(swarm_decision.delta_heights[i]),
+                float(yaws[i]),
+                float(swarm_decision.delta_yaws[i]),
             )
+            for i, system_id in enumerate(system_ids)
+        )
+
+        actions = []
+        for current_telemetry in telemetry_batch:
+            if current_telemetry is None:
+                self.local_logger.warning("No telemetry data receieved!")
+                actions.append([])
+                continue
 
-            return f"CHANGE YAW: {delta_yaw_deg:.2f}"
+            actions.append(next(valid_actions))
 
-        return "Nothing Done"
+        return actions
 
 
 # =================================================================================================
@@ -0,0 +1,241 @@
+"""
+Sends commands over MAVLink and tracks their acknowledgements.
+"""
+
+import time
+
+from pymavlink import mavutil
+
+from . import timer_wheel
+
+
+class CommandSender:
+    """
+    Sends COMMAND_LONG messages and keeps each in flight until a COMMAND_ACK for it arrives.
+
+    At most 1 command per target system and command ID is in flight. Sending a command that
+    is already in flight with the same parameters does nothing, so a decision repeated every
+    telemetry sample does not flood the link. Sending it with different parameters replaces
+    the command in flight, as the vehicle only acts on the newest, so a caller whose
+    parameters change every sample (e.g. a relative yaw) only sends when the change matters.
+    COMMAND_ACK only carries the command ID, so it is matched to the command in flight with
+    that ID to the vehicle that sent the acknowledgement, which can be an acknowledgement of a
+    command that was replaced.
+
+    A command without an acknowledgement within the timeout is sent again with the
+    confirmation field incremented, and given up on after the maximum number of retries.
+
+    Commands sent together, and commands sent again together, go back to back in a single
+    write to the connection.
+    """
+
+    __TIMER_TICK = 0.05  # seconds
+    __TIMER_SLOT_COUNT = 256
+
+    def __init__(
+        self,
+        connection: mavutil.mavfile,
+        ack_timeout: float,
+        max_retries: int,
+        target_system: int = 1,
+        target_component: int = 0,
+    ) -> None:
+        """
+        connection: MAVLink connection to send commands and receive COMMAND_ACK with.
+        ack_timeout: Time in seconds to wait for an acknowledgement before sending again,
+            must be greater than 0 .
+        max_retries: Number of times to send again before giving up, at least 0 .
+        target_system: System ID of the vehicle when sending without one.
+        target_component: Component ID on the vehicle.
+        """
+        if ack_timeout <= 0.0:
+            raise ValueError(f"Acknowledgement timeout must be greater than 0, got {ack_timeout}")
+
+        if max_retries < 0:
+            raise ValueError(f"Maximum retries must be at least 0, got {max_retries}")
+
+        self.__connection = connection
+        self.__ack_timeout = ack_timeout
+        self.__max_retries = max_retries
+        self.__target_system = target_system
+        self.__target_component = target_component
+
+        # Ticks count from 0 rather than from now, so any monotonic clock works
+        self.__timers = timer_wheel.TimerWheel(self.__TIMER_TICK, self.__TIMER_SLOT_COUNT, 0.0)
+        # Target system and command ID to the parameters and the number of times sent
+        self.__in_flight: "dict[tuple[int, int], tuple[tuple[float, ...], int]]" = {}
+
+    def __pack(
+        self, key: "tuple[int, int]", params: "tuple[float, ...]", confirmation: int
+    ) -> bytes:
+        """
+        Encodes the command as COMMAND_LONG, keeping the sequence number of the connection.
+        """
+        mav = self.__connection.mav
+        target_system, command = key
+        message = mav.command_long_encode(
+            target_system,
+            self.__target_component,
+            command,
+            confirmation,
+            *params,
+        )
+        buffer = message.pack(mav)
+
+        # Same bookkeeping as MAVLink.send()
+        mav.seq = (mav.seq + 1) % 256
+        mav.total_packets_sent += 1
+        mav.total_bytes_sent += len(buffer)
+        return buffer
+
+    def __write(self, buffers: "list[bytes]") -> None:
+        """
+        Writes the packed commands to the link at once.
+        """
+        if len(buffers) > 0:
+            self.__connection.write(b"".join(buffers))
+
+    def __remove(self, key: "tuple[int, int]") -> "tuple[int, int, tuple[float, ...]]":
+        """
+        Stops tracking the command.
+
+        Returns the target system, command and parameters.
+        """
+        params, _ = self.__in_flight.pop(key)
+        self.__timers.cancel(key)
+        return key + (params,)
+
+    def send(
+        self,
+        command: int,
+        params: "tuple[float, ...]",
+        now: "float | None" = None,
+        target_system: "int | None" = None,
+    ) -> bool:
+        """
+        Sends the command unless it is already in flight with the same parameters.
+
+        command: MAV_CMD ID.
+        params: The 7 parameters of COMMAND_LONG.
+        now: Monotonic time in seconds, None for the current time.
+        target_system: System ID of the vehicle, None for the one of the sender.
+
+        Returns whether the command was sent.
+        """
+        return self.send_many([(command, params)], now, target_system)[0]
+
+    def send_many(
+        self,
+        commands: "list[tuple[int, tuple[float, ...]]]",
+        now: "float | None" = None,
+        target_system: "int | None" = None,
+    ) -> "list[bool]":
+        """
+        Sends the commands that are not already in flight with the same parameters,
+        in a single write.
+
+        commands: MAV_CMD ID and the 7 parameters of COMMAND_LONG of each command.
+        now: Monotonic time in seconds, None for the current time.
+        target_system: System ID of the vehicle, None for the one of the sender.
+
+        Returns whether each command was sent.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        if target_system is None:
+            target_system = self.__target_system
+
+        buffers = []
+        is_sent = []
+        for command, params in commands:
+            if len(params) != 7:
+                raise ValueError(f"COMMAND_LONG has 7 parameters, got {len(params)}")
+
+            key = (target_system, command)
+            params = tuple(float(param) for param in params)
+            in_flight = self.__in_flight.get(key)
+            if in_flight is not None and in_flight[0] == params:
+                is_sent.append(False)
+                continue
+
+            # Replaces the command in flight, if any, and restarts its retries
+            buffers.append(self.__pack(key, params, 0))
+            self.__in_flight[key] = (params, 1)
+            self.__timers.schedule(key, now + self.__ack_timeout)
+            is_sent.append(True)
+
+        self.__write(buffers)
+        return is_sent
+
+    def handle_ack(
+        self, message: mavutil.mavlink.MAVLink_message, now: "float | None" = None
+    ) -> "tuple[tuple[int, int, tuple[float, ...]], int] | None":
+        """
+        Matches the COMMAND_ACK to the in flight command with its command ID to the vehicle
+        that sent it.
+        A result of MAV_RESULT_IN_PROGRESS keeps the command in flight without sending it
+        again for another timeout.
+
+        message: COMMAND_ACK message.
+        now: Monotonic time in seconds, None for the current time.
+
+        Returns the target system, command and parameters with the MAV_RESULT, None if
+        nothing matched or the command is still in progress.
+        """
+        key = (message.get_srcSystem(), message.command)
+        if key not in self.__in_flight:
+            return None
+
+        if message.result == mavutil.mavlink.MAV_RESULT_IN_PROGRESS:
+            if now is None:
+                now = time.monotonic()
+
+            self.__timers.schedule(key, now + self.__ack_timeout)
+            return None
+
+        return self.__remove(key), message.result
+
+    def run(self, now: "float | None" = None) -> "tuple[list[tuple[tuple, int]], list[tuple]]":
+        """
+        Handles received acknowledgements, then sends again the commands that timed out.
+        Call regularly, as often as the timeout resolution needed.
+
+        now: Monotonic time in seconds, None for the current time.
+
+        Returns the commands acknowledged with their MAV_RESULT, and the commands given up on.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        acknowledged = []
+        while True:
+            message = self.__connection.recv_match(type="COMMAND_ACK", blocking=False)
+            if message is None:
+                break
+
+            result = self.handle_ack(message, now)
+            if result is not None:
+                acknowledged.append(result)
+
+        given_up = []
+        buffers = []
+        for key in self.__timers.advance(now):
+            params, send_count = self.__in_flight[key]
+            if send_count > self.__max_retries:
+                given_up.append(self.__remove(key))
+                continue
+
+            # Confirmation counts the retransmissions
+            buffers.append(self.__pack(key, params, send_count))
+            self.__in_flight[key] = (params, send_count + 1)
+            self.__timers.schedule(key, now + self.__ack_timeout)
+
+        self.__write(buffers)
+        return acknowledged, given_up
+
+    def get_in_flight_count(self) -> int:
+        """
+        Returns the number of commands waiting for an acknowledgement.
+        """
+        return len(self.__in_flight)
@@ -10,15 +10,25 @@ from pymavlink import mavutil
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
 from . import command
+from ..mission import mission
+from ..reorder import sequenced_item
 from ..common.modules.logger import logger
 
 
+# Maximum number of telemetry samples taken from the queue at once
+MAX_BATCH_SIZE = 32
+# Maximum number of telemetry samples handled per loop iteration, including a drained backlog
+MAX_BACKLOG_SIZE = 256
+QUEUE_TIMEOUT = 0.5  # seconds
+
+
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
 def command_worker(
     connection: mavutil.mavfile,
-    target: command.Position,
+    target: command.Position | mission.Mission,
+    resume_from_nearest: bool,
     input_queue: queue_proxy_wrapper.QueueProxyWrapper,
     output_queue: queue_proxy_wrapper.QueueProxyWrapper,
     controller: worker_controller.WorkerController,
@@ -26,7 +36,15 @@ def command_worker(
     """
     Worker process.
 
-    args... describe what the arguments are
+    connection is the MAVLink connection to send commands on and receive their
+        acknowledgements from.
+    target is the mission to fly, or a fixed position to turn and climb towards.
+    resume_from_nearest is whether vehicles start at the waypoint nearest to them rather than
+        the first, for vehicles already flying the mission (e.g. after a restart).
+    input_queue holds telemetry from the telemetry workers, sequenced or not.
+    output_queue is where the actions decided for each telemetry are put, keeping the sequence
+        of sequenced telemetry.
+    controller is how the main process communicates to this worker process.
     """
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -50,7 +68,9 @@ def command_worker(
     # =============================================================================================
     # Instantiate class object (command.Command)
 
-    result, command_instance = command.Command.create(connection, target, local_logger)
+    result, command_instance = command.Command.create(
+        connection, target, local_logger, resume_from_nearest
+    )
 
     if not result:
         local_logger.error("Could not initialize Command object")
@@ -62,21 +82,67 @@ def command_worker(
     while not controller.is_exit_requested():
         controller.check_pause()
 
-        try:
-            current_telemetry = input_queue.queue.get(timeout=0.5)
+        # Acknowledgements and retransmissions are handled at least every queue timeout
+        command_instance.run_sender()
+
+        # Drain everything that has arrived so far, including a backlog from falling behind
+        telemetry_batch = input_queue.get_many(MAX_BATCH_SIZE, QUEUE_TIMEOUT)
+        if len(telemetry_batch) == 0:
+            local_logger.debug("Queue timeout")
+            continue
+
+        chunk_size = len(telemetry_batch)
+        while chunk_size == MAX_BATCH_SIZE and len(telemetry_batch) < MAX_BACKLOG_SIZE:
+            chunk = input_queue.get_many(MAX_BATCH_SIZE, 0.0)
+            chunk_size = len(chunk)
+            telemetry_batch += chunk
 
+        sequences = []
+        telemetry_data = []
+        for current_telemetry in telemetry_batch:
             if current_telemetry is None:
                 local_logger.warning("Received None from telemetry queue")
                 continue
 
-            command_string = command_instance.run(current_telemetry)
-
-            if command_string:
-                output_queue.queue.put(command_string)
-
-        except TimeoutError:
-            local_logger.debug("Queue timeout or error")
-            continue
+            # Sequenced telemetry keeps its sequence, for a reorder stage after parallel workers
+            sequence = None
+            if isinstance(current_telemetry, sequenced_item.SequencedItem):
+                sequence = current_telemetry.sequence
+                current_telemetry = current_telemetry.item
+
+            sequences.append(sequence)
+            telemetry_data.append(current_telemetry)
+
+        # Only the newest telemetry of each vehicle is decided on, as with a latest value queue
+        # per vehicle, so a backlog is skipped rather than commanded from
+        newest_indices = {
+            current_telemetry.system_id: i for i, current_telemetry in enumerate(telemetry_data)
+        }
+        is_newest = [False] * len(telemetry_data)
+        for i in newest_indices.values():
+            is_newest[i] = True
+
+        # Decide for the whole batch at once
+        decided_actions = iter(
+            command_instance.run_many(
+                [
+                    current_telemetry
+                    for current_telemetry, is_decided in zip(telemetry_data, is_newest)
+                    if is_decided
+                ]
+            )
+        )
+        outputs = []
+        for sequence, is_decided in zip(sequences, is_newest):
+            actions = next(decided_actions) if is_decided else []
+            if sequence is not None:
+                # Every sequence is passed on, even without actions, so the reorder stage
+                # does not wait for it
+                outputs.append(sequenced_item.SequencedItem(sequence, actions or None))
+            elif len(actions) > 0:
+                outputs.append(actions)
+
+        output_queue.put_many(outputs)
 
     local_logger.info("Command worker stopped")
 
@@ -0,0 +1,152 @@
+"""
+Decides the commands that turn and climb a vehicle towards a target.
+"""
+
+import math
+
+import numpy as np
+from pymavlink import mavutil
+
+
+ALTITUDE_TOLERANCE = 0.5  # m
+YAW_TOLERANCE = 5  # degrees
+YAW_SPEED = 5  # degrees/s
+
+
+def decide(
+    x: float, y: float, z: float, yaw: float, target_x: float, target_y: float, target_z: float
+) -> "tuple[float, float, int]":
+    """
+    Decides for 1 vehicle.
+
+    x, y, z: Position in m.
+    yaw: Heading in radians.
+    target_x, target_y, target_z: Target position in m.
+
+    Returns the change in height in m, the change in yaw to face the target in degrees in the
+    range [-180, 180] with positive counter-clockwise, and the yaw direction parameter.
+    """
+    target_yaw = math.atan2(target_y - y, target_x - x)
+
+    # Wrap to [-pi, pi]
+    delta_yaw = target_yaw - yaw
+    delta_yaw = math.atan2(math.sin(delta_yaw), math.cos(delta_yaw))
+    delta_yaw_deg = math.degrees(delta_yaw)
+
+    direction = -1 if delta_yaw_deg >= 0 else 1
+
+    return target_z - z, delta_yaw_deg, direction
+
+
+def get_commands(
+    delta_height: float, delta_yaw: float, direction: int, target_z: float
+) -> "list[tuple[int, tuple[float, ...]]]":
+    """
+    Returns the MAV_CMD ID and COMMAND_LONG parameters of each axis outside its tolerance,
+    altitude first.
+    """
+    commands = []
+    if abs(delta_height) > ALTITUDE_TOLERANCE:
+        commands.append(
+            (mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT, (1, 0, 0, 0, 0, 0, target_z))
+        )
+
+    if abs(delta_yaw) > YAW_TOLERANCE:
+        commands.append(
+            (
+                mavutil.mavlink.MAV_CMD_CONDITION_YAW,
+                (abs(delta_yaw), YAW_SPEED, direction, 1, 0, 0, 0),
+            )
+        )
+
+    return commands
+
+
+class SwarmDecision:
+    """
+    Decisions for many vehicles as arrays, element `i` is vehicle `i`. Same as decide() and
+    get_commands() for each vehicle.
+    """
+
+    def __init__(
+        self,
+        delta_heights: np.ndarray,
+        delta_yaws: np.ndarray,
+        directions: np.ndarray,
+        target_zs: np.ndarray,
+    ) -> None:
+        """
+        delta_heights: Change in height of each vehicle in m.
+        delta_yaws: Change in yaw of each vehicle in degrees in the range [-180, 180].
+        directions: Yaw direction parameter of each vehicle.
+        target_zs: Target height of each vehicle in m.
+        """
+        self.delta_heights = delta_heights
+        self.delta_yaws = delta_yaws
+        self.directions = directions
+        self.target_zs = target_zs
+
+        # Command set, whether each vehicle needs each command
+        self.is_altitude_changed = np.abs(delta_heights) > ALTITUDE_TOLERANCE
+        self.is_yaw_changed = np.abs(delta_yaws) > YAW_TOLERANCE
+
+    def __len__(self) -> int:
+        return len(self.delta_heights)
+
+    def get_commands(self, index: int) -> "list[tuple[int, tuple[float, ...]]]":
+        """
+        Returns the commands of the vehicle, see get_commands() .
+        """
+        commands = []
+        if self.is_altitude_changed[index]:
+            commands.append(
+                (
+                    mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT,
+                    (1, 0, 0, 0, 0, 0, float(self.target_zs[index])),
+                )
+            )
+
+        if self.is_yaw_changed[index]:
+            commands.append(
+                (
+                    mavutil.mavlink.MAV_CMD_CONDITION_YAW,
+                    (
+                        abs(float(self.delta_yaws[index])),
+                        YAW_SPEED,
+                        int(self.directions[index]),
+                        1,
+                        0,
+                        0,
+                        0,
+                    ),
+                )
+            )
+
+        return commands
+
+
+def decide_swarm(positions: np.ndarray, yaws: np.ndarray, targets: np.ndarray) -> SwarmDecision:
+    """
+    Decides for all vehicles at once.
+
+    positions: Position of each vehicle in m, shape (N, 3).
+    yaws: Heading of each vehicle in radians, shape (N,).
+    targets: Target position in m, shape (N, 3), or (3,) for a target shared by all vehicles.
+
+    Returns the decisions.
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    yaws = np.asarray(yaws, dtype=np.float64)
+    targets = np.broadcast_to(np.asarray(targets, dtype=np.float64), positions.shape)
+
+    offsets = targets - positions
+    target_yaws = np.arctan2(offsets[:, 1], offsets[:, 0])
+
+    # Wrap to [-pi, pi]
+    delta_yaws = target_yaws - yaws
+    delta_yaws = np.arctan2(np.sin(delta_yaws), np.cos(delta_yaws))
+    delta_yaws_deg = np.degrees(delta_yaws)
+
+    directions = np.where(delta_yaws_deg >= 0, -1, 1)
+
+    return SwarmDecision(offsets[:, 2], delta_yaws_deg, directions, targets[:, 2])
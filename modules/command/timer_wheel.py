@@ -0,0 +1,111 @@
+"""
+Timeouts for many pending operations.
+"""
+
+import math
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel: timers are kept in a ring of slots by the tick they expire at, so
+    scheduling and cancelling are O(1) and advancing only looks at the slots of the ticks
+    passed. Timers further away than the ring stay in their slot until their tick comes round.
+
+    Expiry is rounded up to the next tick, so a timer never expires early.
+    """
+
+    def __init__(self, tick: float, slot_count: int, start_time: float) -> None:
+        """
+        tick: Resolution in seconds, must be greater than 0 .
+        slot_count: Number of slots, must be greater than 0 . Timeouts up to
+            `tick * slot_count` never share a slot with a later round.
+        start_time: Monotonic time in seconds of tick 0 .
+        """
+        if tick <= 0.0:
+            raise ValueError(f"Tick must be greater than 0, got {tick}")
+
+        if slot_count <= 0:
+            raise ValueError(f"Slot count must be greater than 0, got {slot_count}")
+
+        self.__tick = tick
+        self.__start_time = start_time
+        self.__current_tick = 0
+
+        # Per slot: key to the tick it expires at
+        self.__slots = [{} for _ in range(slot_count)]
+        self.__slot_indices = {}
+
+    def __to_tick(self, time_seconds: float) -> int:
+        """
+        Tick that has passed by the time.
+        """
+        return math.floor((time_seconds - self.__start_time) / self.__tick)
+
+    def schedule(self, key: object, expiry_time: float) -> None:
+        """
+        Starts a timer, replacing any timer with the same key.
+
+        key: Hashable identifier returned when the timer expires.
+        expiry_time: Monotonic time in seconds, no earlier than the next tick.
+        """
+        self.cancel(key)
+
+        expiry_tick = max(
+            math.ceil((expiry_time - self.__start_time) / self.__tick),
+            self.__current_tick + 1,
+        )
+        slot_index = expiry_tick % len(self.__slots)
+        self.__slots[slot_index][key] = expiry_tick
+        self.__slot_indices[key] = slot_index
+
+    def cancel(self, key: object) -> bool:
+        """
+        Stops the timer.
+
+        Returns whether there was a timer with the key.
+        """
+        slot_index = self.__slot_indices.pop(key, None)
+        if slot_index is None:
+            return False
+
+        del self.__slots[slot_index][key]
+        return True
+
+    def advance(self, now: float) -> "list[object]":
+        """
+        Moves to the tick at the time.
+
+        now: Monotonic time in seconds, earlier than the current tick does nothing.
+
+        Returns the keys of the timers that expired, which are removed.
+        """
+        target_tick = self.__to_tick(now)
+        if target_tick <= self.__current_tick:
+            return []
+
+        # Each slot only needs visiting once however far behind
+        visit_count = min(target_tick - self.__current_tick, len(self.__slots))
+        expired = []
+        for tick in range(self.__current_tick + 1, self.__current_tick + visit_count + 1):
+            slot = self.__slots[tick % len(self.__slots)]
+            slot_expired = [key for key, expiry_tick in slot.items() if expiry_tick <= target_tick]
+            for key in slot_expired:
+                del slot[key]
+                del self.__slot_indices[key]
+
+            expired += slot_expired
+
+        self.__current_tick = target_tick
+        return expired
+
+    def __len__(self) -> int:
+        """
+        Number of pending timers.
+        """
+        return len(self.__slot_indices)
+
+    def __contains__(self, key: object) -> bool:
+        """
+        Whether there is a pending timer with the key.
+        """
+        return key in self.__slot_indices
@@ -13,10 +13,14 @@ from ..common.modules.logger import logger
 class HeartbeatReceiver:
     """
     HeartbeatReceiver class to send a heartbeat
+
+    Tracks each vehicle on the connection separately by the system ID of its heartbeats.
     """
 
     __private_key = object()
 
+    __DISCONNECT_MISSED_COUNT = 5
+
     @classmethod
     def create(
         cls,
@@ -41,31 +45,69 @@ class HeartbeatReceiver:
 
         self.connection = connection
         self.main_logger = main_logger
-        self.missed_heartbeats = 0
+        # System ID to the number of runs in a row without a heartbeat from the vehicle, up to
+        # the disconnect count
+        self.missed_heartbeats: "dict[int, int]" = {}
         self.state = "Disconnected"
         # Do any intializiation here
 
     def run(
         self,
     ) -> tuple:
-        "Runs Code"
+        """
+        Receives every heartbeat that has arrived since the last run, call once per heartbeat
+        period.
+
+        Returns "Connected" while any vehicle is connected, otherwise "Disconnected".
+        """
+        received = set()
+        while True:
+            msg = self.connection.recv_match(type="HEARTBEAT", blocking=False)
+            if msg is None:
+                break
+
+            received.add(msg.get_srcSystem())
 
-        msg = self.connection.recv_match(type="HEARTBEAT", blocking=False)
+        for system_id in received:
+            if self.missed_heartbeats.get(system_id, self.__DISCONNECT_MISSED_COUNT) > 0:
+                self.main_logger.info(f"Heartbeat Received from system {system_id}")
 
-        if msg is not None:
-            self.missed_heartbeats = 0
-            self.state = "Connected"
-            self.main_logger.info("Heartbeat Received")
+            self.missed_heartbeats[system_id] = 0
 
-        else:
-            self.missed_heartbeats += 1
+        for system_id, missed_count in self.missed_heartbeats.items():
+            # Disconnected vehicles stay quiet until heard from again
+            if system_id in received or missed_count >= self.__DISCONNECT_MISSED_COUNT:
+                continue
+
+            missed_count += 1
+            self.missed_heartbeats[system_id] = missed_count
+            if missed_count < self.__DISCONNECT_MISSED_COUNT:
+                self.main_logger.warning(f"Missed Heartbeat from system {system_id}")
+            else:
+                self.main_logger.warning(f"Disconnected from system {system_id}")
+
+        if len(self.missed_heartbeats) == 0:
             self.main_logger.warning("Missed Heartbeat")
 
-        if self.missed_heartbeats >= 5:
-            self.state = "Disconnected"
+        is_connected = any(
+            missed_count < self.__DISCONNECT_MISSED_COUNT
+            for missed_count in self.missed_heartbeats.values()
+        )
+        self.state = "Connected" if is_connected else "Disconnected"
 
         return self.state
 
+    def get_states(self) -> "dict[int, str]":
+        """
+        Returns the state of each vehicle heard from, by system ID.
+        """
+        return {
+            system_id: (
+                "Connected" if missed_count < self.__DISCONNECT_MISSED_COUNT else "Disconnected"
+            )
+            for system_id, missed_count in self.missed_heartbeats.items()
+        }
+
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -25,7 +25,10 @@ def heartbeat_receiver_worker(
     """
     Worker process.
 
-    args... describe what the arguments are
+    connection is the MAVLink connection to receive heartbeats from.
+    output_queue is where the connection state, "Connected" or "Disconnected", is put once a
+        second.
+    controller is how the main process communicates to this worker process.
     """
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -58,6 +61,8 @@ def heartbeat_receiver_worker(
         return
 
     while not controller.is_exit_requested():
+        # Method blocks worker if pause has been requested
+        controller.check_pause()
 
         result = heartbeat_receiver_instance.run()
         output_queue.queue.put(result)
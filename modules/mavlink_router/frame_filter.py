@@ -0,0 +1,117 @@
+"""
+Splits raw MAVLink bytes into frames and filters them by message ID from the header alone.
+"""
+
+
+class MessageIdFilter:
+    """
+    Finds MAVLink v1 and v2 frames in a byte stream and only passes on frames with a subscribed
+    message ID, so that unsubscribed frames are never CRC checked or decoded.
+
+    The CRC of skipped frames is not checked, so the stream is assumed to be mostly clean.
+    Bytes that are not the start of a plausible frame are discarded one at a time until the
+    next start marker, as pymavlink does.
+    """
+
+    V1_MAGIC = 0xFE
+    V2_MAGIC = 0xFD
+
+    # Start marker, length, sequence, system, component, message ID (1 byte)
+    V1_HEADER_SIZE = 6
+    # Start marker, length, incompatible flags, compatible flags, sequence, system, component,
+    # message ID (3 bytes)
+    V2_HEADER_SIZE = 10
+    CHECKSUM_SIZE = 2
+    SIGNATURE_SIZE = 13
+    V2_SIGNED_FLAG = 0x01
+
+    def __init__(self, message_ids: "set[int]") -> None:
+        """
+        message_ids: Message IDs to pass on.
+        """
+        self.__message_ids = frozenset(message_ids)
+        self.__buffer = bytearray()
+
+        self.__passed_count = 0
+        self.__skipped_count = 0
+        self.__discarded_byte_count = 0
+
+    def __next_frame(self) -> "tuple[bool, int, int]":
+        """
+        Locates the frame at the start of the buffer, discarding bytes until a start marker.
+
+        Returns whether a complete frame is in the buffer, its total size, and its message ID.
+        """
+        while len(self.__buffer) > 0:
+            magic = self.__buffer[0]
+            if magic == self.V1_MAGIC:
+                if len(self.__buffer) < self.V1_HEADER_SIZE:
+                    return False, 0, 0
+
+                payload_length = self.__buffer[1]
+                message_id = self.__buffer[5]
+                frame_size = self.V1_HEADER_SIZE + payload_length + self.CHECKSUM_SIZE
+            elif magic == self.V2_MAGIC:
+                if len(self.__buffer) < self.V2_HEADER_SIZE:
+                    return False, 0, 0
+
+                payload_length = self.__buffer[1]
+                incompatible_flags = self.__buffer[2]
+                if incompatible_flags & ~self.V2_SIGNED_FLAG:
+                    # Unknown flags mean this is not really a frame start
+                    self.__discard(1)
+                    continue
+
+                message_id = int.from_bytes(self.__buffer[7:10], "little")
+                frame_size = self.V2_HEADER_SIZE + payload_length + self.CHECKSUM_SIZE
+                if incompatible_flags & self.V2_SIGNED_FLAG:
+                    frame_size += self.SIGNATURE_SIZE
+            else:
+                self.__discard(1)
+                continue
+
+            if len(self.__buffer) < frame_size:
+                return False, 0, 0
+
+            return True, frame_size, message_id
+
+        return False, 0, 0
+
+    def __discard(self, byte_count: int) -> None:
+        """
+        Removes bytes from the start of the buffer.
+        """
+        del self.__buffer[:byte_count]
+        self.__discarded_byte_count += byte_count
+
+    def feed(self, data: bytes) -> "list[bytes]":
+        """
+        Adds received bytes and extracts all complete frames.
+
+        data: Bytes from the link, may contain partial frames.
+
+        Returns the complete frames with a subscribed message ID, in order.
+        """
+        self.__buffer.extend(data)
+
+        frames = []
+        while True:
+            result, frame_size, message_id = self.__next_frame()
+            if not result:
+                break
+
+            if message_id in self.__message_ids:
+                frames.append(bytes(self.__buffer[:frame_size]))
+                self.__passed_count += 1
+            else:
+                self.__skipped_count += 1
+
+            del self.__buffer[:frame_size]
+
+        return frames
+
+    def get_counts(self) -> "tuple[int, int, int]":
+        """
+        Returns the number of frames passed on, frames skipped, and bytes discarded.
+        """
+        return self.__passed_count, self.__skipped_count, self.__discarded_byte_count
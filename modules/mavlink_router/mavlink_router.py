@@ -0,0 +1,186 @@
+"""
+Owns the MAVLink connection and routes received messages by type.
+"""
+
+import queue
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import sharded_queue
+from . import frame_filter
+from ..common.modules.logger import logger
+
+
+class MavlinkRouter:
+    """
+    Reads the link once, decodes each frame once, and puts the message into every queue
+    subscribed to its type. Also writes outbound bytes from other workers to the link,
+    so that this is the only user of the connection.
+
+    For a sharded subscriber queue, the message goes into the shard of the system ID of the
+    vehicle that sent it, so each vehicle is always handled by the same worker.
+
+    In filtered mode frames are split from the raw bytes and the message ID is read from the
+    header, so frames of unsubscribed types are skipped without being CRC checked or decoded.
+    """
+
+    __create_key = object()
+
+    __RECEIVE_TIMEOUT = 0.01  # seconds
+    __READ_SIZE = 4096  # bytes
+    __MAX_READS = 64  # Per run
+
+    @classmethod
+    def create(
+        cls,
+        connection: mavutil.mavfile,
+        routes: "dict[str, list[queue_proxy_wrapper.QueueProxyWrapper | sharded_queue.ShardedQueue]]",
+        is_filtered: bool,
+        local_logger: logger.Logger,
+    ) -> "tuple[bool, MavlinkRouter | None]":
+        """
+        connection: MAVLink connection, owned by the router from now on.
+        routes: Message type (e.g. "HEARTBEAT") to subscriber queues.
+        is_filtered: Whether to skip unsubscribed frames before decoding.
+        local_logger: Existing logger from process.
+
+        Returns whether the router was created and the router.
+        """
+        message_ids = set()
+        for message_type, subscriber_queues in routes.items():
+            if len(subscriber_queues) == 0:
+                local_logger.error(f"No subscriber queues for message type {message_type}", True)
+                return False, None
+
+            message_id = getattr(mavutil.mavlink, f"MAVLINK_MSG_ID_{message_type}", None)
+            if message_id is None:
+                local_logger.error(f"Unknown message type {message_type}", True)
+                return False, None
+
+            message_ids.add(message_id)
+
+        message_filter = None
+        if is_filtered:
+            message_filter = frame_filter.MessageIdFilter(message_ids)
+
+        return True, MavlinkRouter(
+            cls.__create_key,
+            connection,
+            routes,
+            message_filter,
+            local_logger,
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        connection: mavutil.mavfile,
+        routes: "dict[str, list[queue_proxy_wrapper.QueueProxyWrapper | sharded_queue.ShardedQueue]]",
+        message_filter: "frame_filter.MessageIdFilter | None",
+        local_logger: logger.Logger,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is MavlinkRouter.__create_key, "Use create() method"
+
+        self.__connection = connection
+        self.__routes = routes
+        self.__message_filter = message_filter
+        self.__logger = local_logger
+
+        self.__decoded_count = 0
+        self.__routed_count = 0
+        self.__dropped_count = 0
+
+    def __receive(self) -> "list[mavutil.mavlink.MAVLink_message]":
+        """
+        Waits briefly for data and decodes it.
+
+        Returns the decoded messages, unsubscribed types are included unless filtered.
+        """
+        if self.__message_filter is None:
+            message = self.__connection.recv_match(blocking=True, timeout=self.__RECEIVE_TIMEOUT)
+            if message is None:
+                return []
+
+            return [message]
+
+        # Keep reading while data is ready, as a datagram link returns 1 datagram per read
+        messages = []
+        timeout = self.__RECEIVE_TIMEOUT
+        for _ in range(self.__MAX_READS):
+            if not self.__connection.select(timeout):
+                break
+
+            timeout = 0.0
+            data = self.__connection.recv(self.__READ_SIZE)
+            if not data:
+                break
+
+            for frame in self.__message_filter.feed(data):
+                # Returns None if the CRC check fails
+                frame_messages = self.__connection.mav.parse_buffer(frame)
+                if frame_messages is None:
+                    continue
+
+                for message in frame_messages:
+                    # Connection bookkeeping that recv_match() would otherwise do
+                    self.__connection.post_message(message)
+                    messages.append(message)
+
+        return messages
+
+    def run(self) -> "tuple[bool, int]":
+        """
+        Receives messages and puts each into the subscriber queues for its type,
+        never blocking on a full subscriber queue.
+
+        Returns whether any message was received and the number of messages received.
+        """
+        messages = self.__receive()
+        self.__decoded_count += len(messages)
+
+        for message in messages:
+            message_type = message.get_type()
+            for subscriber_queue in self.__routes.get(message_type, []):
+                if isinstance(subscriber_queue, sharded_queue.ShardedQueue):
+                    subscriber_queue = subscriber_queue.get_shard(message.get_srcSystem())
+
+                try:
+                    subscriber_queue.queue.put_nowait(message)
+                    self.__routed_count += 1
+                except queue.Full:
+                    self.__dropped_count += 1
+                    self.__logger.warning(f"Subscriber queue full, dropped {message_type}")
+
+        return len(messages) > 0, len(messages)
+
+    def send(self, buffers: "list[bytes]") -> None:
+        """
+        Writes packed messages to the link in a single write.
+
+        buffers: Packed MAVLink messages.
+        """
+        if len(buffers) == 0:
+            return
+
+        self.__connection.write(b"".join(buffers))
+
+    def get_counts(self) -> "dict[str, int]":
+        """
+        Returns message counters: decoded, routed to subscriber queues, dropped from full
+        subscriber queues, and in filtered mode, frames skipped without decoding.
+        """
+        counts = {
+            "decoded": self.__decoded_count,
+            "routed": self.__routed_count,
+            "dropped": self.__dropped_count,
+        }
+        if self.__message_filter is not None:
+            _, skipped_count, discarded_byte_count = self.__message_filter.get_counts()
+            counts["skipped"] = skipped_count
+            counts["discarded_bytes"] = discarded_byte_count
+
+        return counts
@@ -0,0 +1,80 @@
+"""
+MAVLink router worker that owns the connection.
+"""
+
+import os
+import pathlib
+import time
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import sharded_queue
+from utilities.workers import worker_controller
+from . import mavlink_router
+from ..common.modules.logger import logger
+
+
+# Maximum number of outbound messages written per loop iteration
+MAX_OUTBOUND_BATCH_SIZE = 32
+COUNT_REPORT_PERIOD = 10  # seconds
+
+
+def mavlink_router_worker(
+    connection: mavutil.mavfile,
+    routes: "dict[str, list[queue_proxy_wrapper.QueueProxyWrapper | sharded_queue.ShardedQueue]]",
+    is_filtered: bool,
+    outbound_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker process. There must only be 1 of these per connection.
+
+    connection is the MAVLink connection, no other worker may use it.
+    routes is message type to the subscriber queues for that type, sharded by system ID.
+    is_filtered is whether to skip unsubscribed frames from the header before decoding.
+    outbound_queue holds packed messages from other workers to write to the link.
+    controller is how the main process communicates to this worker process.
+    """
+    # Instantiate logger
+    worker_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{worker_name}_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create logger")
+        return
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    local_logger.info("Logger initialized", True)
+
+    # Instantiate class object
+    result, router = mavlink_router.MavlinkRouter.create(
+        connection,
+        routes,
+        is_filtered,
+        local_logger,
+    )
+    if not result:
+        local_logger.error("Failed to create MAVLink router", True)
+        return
+
+    # Get Pylance to stop complaining
+    assert router is not None
+
+    # Loop forever until exit has been requested
+    last_report_time = time.time()
+    while not controller.is_exit_requested():
+        # Method blocks worker if pause has been requested
+        controller.check_pause()
+
+        # Receiving waits briefly, so outbound messages are written at least that often
+        router.run()
+        router.send(outbound_queue.get_many(MAX_OUTBOUND_BATCH_SIZE, 0.0))
+
+        if time.time() - last_report_time > COUNT_REPORT_PERIOD:
+            local_logger.info(f"Message counts: {router.get_counts()}")
+            last_report_time = time.time()
+
+    local_logger.info(f"Router stopped, message counts: {router.get_counts()}", True)
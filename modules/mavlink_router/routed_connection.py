@@ -0,0 +1,135 @@
+"""
+Connection stand in for workers that receive messages from the MAVLink router.
+"""
+
+import collections
+import time
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+
+
+class RoutedConnection:
+    """
+    Provides the parts of `mavutil.mavfile` that workers use, `recv_match()` and `mav`,
+    without touching the link. Received messages come from a subscriber queue filled by the
+    router, and sent messages are packed into bytes and put into the router's outbound queue.
+
+    Messages of a type other than the one requested are kept for a later `recv_match()` rather
+    than discarded. Once too many are kept, no more are taken from the subscriber queue until
+    some are received, so the backlog fills the subscriber queue and the router logs its drops.
+
+    A sentinel in the subscriber queue (at shutdown) ends the wait of a blocking `recv_match()`.
+    """
+
+    __MAX_BATCH_SIZE = 32
+    __MAX_PENDING = 64
+
+    def __init__(
+        self,
+        input_queue: queue_proxy_wrapper.QueueProxyWrapper | None,
+        outbound_queue: queue_proxy_wrapper.QueueProxyWrapper | None,
+        source_system: int = 255,
+        source_component: int = 0,
+    ) -> None:
+        """
+        input_queue: Subscriber queue from the router, None if this worker only sends.
+        outbound_queue: Router outbound queue, None if this worker only receives.
+        source_system: MAVLink system ID for sent messages, 255 is groundside.
+        source_component: MAVLink component ID for sent messages, 0 is ground control station.
+        """
+        self.__input_queue = input_queue
+        self.__outbound_queue = outbound_queue
+        self.__source_system = source_system
+        self.__source_component = source_component
+
+        self.__pending = collections.deque()
+
+        # Created on first use so that it is created in the worker process
+        self.__mav = None
+
+    @property
+    def mav(self) -> mavutil.mavlink.MAVLink:
+        """
+        MAVLink encoder, messages sent with it go to the router.
+        """
+        if self.__mav is None:
+            assert self.__outbound_queue is not None, "Connection has no outbound queue"
+            self.__mav = mavutil.mavlink.MAVLink(
+                self,
+                srcSystem=self.__source_system,
+                srcComponent=self.__source_component,
+            )
+
+        return self.__mav
+
+    def write(self, buffer: bytes) -> None:
+        """
+        Passes a packed message to the router.
+        """
+        self.__outbound_queue.queue.put(bytes(buffer))
+
+    def __pop_pending(self, types: "set[str] | None") -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Removes and returns the oldest pending message of the types.
+        """
+        for message in self.__pending:
+            if types is None or message.get_type() in types:
+                self.__pending.remove(message)
+                return message
+
+        return None
+
+    # Same signature as mavutil.mavfile
+    def recv_match(
+        self,
+        type: "str | list[str] | None" = None,  # pylint: disable=redefined-builtin
+        blocking: bool = False,
+        timeout: "float | None" = None,
+    ) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Receives the next message of the type.
+
+        type: Message type or types, None is any type.
+        blocking: Whether to wait for a message.
+        timeout: Time waiting in seconds when blocking, None is forever.
+
+        Returns the message, or None if there is none in time, the wait was ended by a
+        sentinel, or too many messages of other types are kept.
+        """
+        types = None
+        if type is not None:
+            types = {type} if isinstance(type, str) else set(type)
+
+        message = self.__pop_pending(types)
+        if message is not None or self.__input_queue is None:
+            return message
+
+        deadline = None
+        if blocking and timeout is not None:
+            deadline = time.monotonic() + timeout
+
+        while True:
+            wait = 0.0
+            if blocking:
+                wait = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+            # Backpressure, leave the rest in the subscriber queue
+            room = self.__MAX_PENDING - len(self.__pending)
+            if room <= 0:
+                return None
+
+            messages = self.__input_queue.get_many(min(room, self.__MAX_BATCH_SIZE), wait)
+            if len(messages) == 0:
+                return None
+
+            # Sentinels from shutdown are not messages
+            self.__pending.extend(message for message in messages if message is not None)
+
+            message = self.__pop_pending(types)
+            if message is not None:
+                return message
+
+            if not blocking or any(message is None for message in messages):
+                return None
@@ -0,0 +1,124 @@
+"""
+Static k-d tree for nearest point and radius queries.
+"""
+
+import math
+
+import numpy as np
+
+
+class KdTree:
+    """
+    Balanced k-d tree over a fixed set of points, built once in O(N log N). Each node holds
+    1 point and splits the others at the median along the axis of largest spread, so the
+    depth is about log2(N) and a nearest point query visits O(log N) nodes on average.
+
+    Nodes are kept in flat lists rather than node objects, as queries run in Python.
+    """
+
+    def __init__(self, points: np.ndarray) -> None:
+        """
+        points: Points of shape (N, D), must have at least 1 point.
+        """
+        points = np.array(points, dtype=np.float64)
+        if points.ndim != 2 or len(points) == 0:
+            raise ValueError(f"Points must be of shape (N, D) with N > 0, got {points.shape}")
+
+        point_count = len(points)
+        self.__points = [tuple(point) for point in points.tolist()]
+        # Point index, split axis, and left and right child of each node, -1 for no child
+        self.__node_points = [0] * point_count
+        self.__axes = [0] * point_count
+        self.__lefts = [-1] * point_count
+        self.__rights = [-1] * point_count
+
+        # Node is allocated when popped, and linked to its parent through its slot
+        next_node = 0
+        pending = [(np.arange(point_count), None, None)]
+        while len(pending) > 0:
+            indices, parent, children = pending.pop()
+            node = next_node
+            next_node += 1
+            if parent is not None:
+                children[parent] = node
+
+            subset = points[indices]
+            axis = int(np.argmax(subset.max(axis=0) - subset.min(axis=0)))
+            median = len(indices) // 2
+            order = np.argpartition(subset[:, axis], median)
+
+            self.__node_points[node] = int(indices[order[median]])
+            self.__axes[node] = axis
+            if median > 0:
+                pending.append((indices[order[:median]], node, self.__lefts))
+
+            if median + 1 < len(indices):
+                pending.append((indices[order[median + 1 :]], node, self.__rights))
+
+    def __len__(self) -> int:
+        return len(self.__points)
+
+    def nearest(self, point: "tuple[float, ...]") -> "tuple[int, float]":
+        """
+        Finds the point closest to the point.
+
+        Returns the index of the closest point and its distance.
+        """
+        best_index = -1
+        best_distance = math.inf
+
+        # Nodes to visit with the distance to their side of the split
+        pending = [(0, 0.0)]
+        while len(pending) > 0:
+            node, bound = pending.pop()
+            if bound >= best_distance:
+                continue
+
+            index = self.__node_points[node]
+            node_point = self.__points[index]
+            distance = math.dist(point, node_point)
+            if distance < best_distance:
+                best_index = index
+                best_distance = distance
+
+            axis = self.__axes[node]
+            offset = point[axis] - node_point[axis]
+            near, far = self.__lefts[node], self.__rights[node]
+            if offset >= 0.0:
+                near, far = far, near
+
+            # Near side last so that it is visited first
+            if far != -1:
+                pending.append((far, abs(offset)))
+
+            if near != -1:
+                pending.append((near, 0.0))
+
+        return best_index, best_distance
+
+    def within(self, point: "tuple[float, ...]", radius: float) -> "list[int]":
+        """
+        Finds the points within the radius of the point, inclusive.
+
+        Returns the indices of the points, in no particular order.
+        """
+        indices = []
+
+        pending = [0]
+        while len(pending) > 0:
+            node = pending.pop()
+            index = self.__node_points[node]
+            node_point = self.__points[index]
+            if math.dist(point, node_point) <= radius:
+                indices.append(index)
+
+            axis = self.__axes[node]
+            offset = point[axis] - node_point[axis]
+            # Points on the left are at most the split, and on the right at least the split
+            if self.__lefts[node] != -1 and offset <= radius:
+                pending.append(self.__lefts[node])
+
+            if self.__rights[node] != -1 and offset >= -radius:
+                pending.append(self.__rights[node])
+
+        return indices
@@ -0,0 +1,111 @@
+"""
+Waypoint mission with a spatial index of its waypoints.
+"""
+
+import math
+
+import numpy as np
+
+from . import kd_tree
+
+
+class Mission:
+    """
+    Waypoints flown in order. A waypoint is reached once a vehicle is within the acceptance
+    radius of it, and the last waypoint is held.
+
+    Waypoints are indexed in a k-d tree when the mission is loaded, so finding the waypoints
+    reached from a position is O(log N) per telemetry sample regardless of the number of
+    waypoints. Progress is kept by the caller as a waypoint index per
+    vehicle, so a mission can be shared by any number of vehicles.
+    """
+
+    def __init__(self, waypoints: np.ndarray, acceptance_radius: float) -> None:
+        """
+        waypoints: Positions in m in flying order, of shape (N, 3) with N > 0 .
+        acceptance_radius: Distance in m at which a waypoint is reached, must be greater
+            than 0 .
+        """
+        waypoints = np.array(waypoints, dtype=np.float64)
+        if waypoints.ndim != 2 or waypoints.shape[1] != 3 or len(waypoints) == 0:
+            raise ValueError(f"Waypoints must be of shape (N, 3) with N > 0, got {waypoints.shape}")
+
+        if acceptance_radius <= 0.0:
+            raise ValueError(f"Acceptance radius must be greater than 0, got {acceptance_radius}")
+
+        self.__waypoints = [tuple(waypoint) for waypoint in waypoints.tolist()]
+        self.__acceptance_radius = acceptance_radius
+        self.__index = kd_tree.KdTree(waypoints)
+
+    @classmethod
+    def load(cls, path: str, acceptance_radius: float) -> "Mission":
+        """
+        Loads waypoints from a CSV file with a line of x,y,z in m per waypoint. Lines starting
+        with # are comments.
+
+        path: Path of the file.
+        acceptance_radius: Distance in m at which a waypoint is reached.
+        """
+        waypoints = np.loadtxt(path, delimiter=",", comments="#", ndmin=2)
+        return cls(waypoints, acceptance_radius)
+
+    def __len__(self) -> int:
+        return len(self.__waypoints)
+
+    def get_waypoint(self, index: int) -> "tuple[float, float, float]":
+        """
+        Returns the position of the waypoint.
+        """
+        return self.__waypoints[index]
+
+    def get_acceptance_radius(self) -> float:
+        """
+        Returns the distance in m at which a waypoint is reached.
+        """
+        return self.__acceptance_radius
+
+    def get_nearest(self, position: "tuple[float, float, float]") -> "tuple[int, float]":
+        """
+        Returns the index of the waypoint nearest to the position, and its distance in m.
+        """
+        return self.__index.nearest(position)
+
+    def get_accepted(self, position: "tuple[float, float, float]") -> "list[int]":
+        """
+        Returns the indices of the waypoints whose acceptance radius contains the position,
+        in flying order.
+        """
+        return sorted(self.__index.within(position, self.__acceptance_radius))
+
+    def is_reached(self, index: int, position: "tuple[float, float, float]") -> bool:
+        """
+        Returns whether the position is within the acceptance radius of the waypoint.
+        """
+        return math.dist(self.__waypoints[index], position) <= self.__acceptance_radius
+
+    def get_next_target(
+        self,
+        index: "int | None",
+        position: "tuple[float, float, float]",
+        resume: bool = False,
+    ) -> int:
+        """
+        Advances past the waypoints reached.
+
+        index: Waypoint the vehicle is flying to, None for a vehicle without progress.
+        position: Position of the vehicle in m.
+        resume: Whether a vehicle without progress starts at the nearest waypoint rather than
+            the first, only for a vehicle already flying the mission (e.g. after a restart).
+
+        Returns the index of the waypoint to fly to.
+        """
+        if index is None:
+            index = 0
+            if resume:
+                index, _ = self.get_nearest(position)
+
+        accepted = set(self.get_accepted(position))
+        while index < len(self.__waypoints) - 1 and index in accepted:
+            index += 1
+
+        return index
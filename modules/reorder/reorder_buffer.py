@@ -0,0 +1,121 @@
+"""
+Restores sequence order of items from parallel workers.
+"""
+
+import heapq
+
+from . import sequenced_item
+
+
+class ReorderBuffer:
+    """
+    Holds items that arrive ahead of a missing sequence, and releases them in sequence order
+    once the missing sequence arrives.
+
+    At most `window` items are held. When the window is full, the missing sequences are given
+    up on as skipped, so a lost item (e.g. from a restarted worker) delays the stream by at
+    most a window rather than stalling it. Items arriving after their sequence was released
+    or skipped are late and dropped.
+    """
+
+    def __init__(self, window: int, first_sequence: "int | None" = 0) -> None:
+        """
+        window: Maximum number of items held, must be greater than 0 .
+        first_sequence: Sequence of the first item to release, None to start from the first
+            item pushed (e.g. for a restarted worker, which should not wait for the items
+            before it).
+        """
+        if window <= 0:
+            raise ValueError(f"Window must be greater than 0, got {window}")
+
+        self.__window = window
+        self.__next_sequence = first_sequence
+        self.__pending = {}
+        self.__pending_sequences = []
+
+        self.__max_depth = 0
+        self.__late_count = 0
+        self.__skipped_count = 0
+
+    def push(self, item: sequenced_item.SequencedItem) -> "list[sequenced_item.SequencedItem]":
+        """
+        Adds the item.
+
+        item: Item to reorder.
+
+        Returns the items now in order, oldest first, possibly empty.
+        """
+        if self.__next_sequence is None:
+            self.__next_sequence = item.sequence
+
+        if item.sequence < self.__next_sequence or item.sequence in self.__pending:
+            self.__late_count += 1
+            return []
+
+        self.__pending[item.sequence] = item
+        heapq.heappush(self.__pending_sequences, item.sequence)
+        self.__max_depth = max(self.__max_depth, len(self.__pending))
+
+        released = self.__release()
+        while len(self.__pending) > self.__window:
+            self.__skip()
+            released += self.__release()
+
+        return released
+
+    def flush(self) -> "list[sequenced_item.SequencedItem]":
+        """
+        Gives up on every missing sequence, e.g. when the input has gone quiet.
+
+        Returns all held items in order, oldest first.
+        """
+        released = []
+        while len(self.__pending) > 0:
+            self.__skip()
+            released += self.__release()
+
+        return released
+
+    def __release(self) -> "list[sequenced_item.SequencedItem]":
+        """
+        Removes the held items that are next in order.
+        """
+        released = []
+        while self.__next_sequence in self.__pending:
+            released.append(self.__pending.pop(self.__next_sequence))
+            heapq.heappop(self.__pending_sequences)
+            self.__next_sequence += 1
+
+        return released
+
+    def __skip(self) -> None:
+        """
+        Gives up on the missing sequences before the oldest held item.
+        """
+        oldest_sequence = self.__pending_sequences[0]
+        self.__skipped_count += oldest_sequence - self.__next_sequence
+        self.__next_sequence = oldest_sequence
+
+    def get_depth(self) -> int:
+        """
+        Returns the number of items held.
+        """
+        return len(self.__pending)
+
+    def get_max_depth(self) -> int:
+        """
+        Returns the largest number of items held at once.
+        """
+        return self.__max_depth
+
+    def get_late_count(self) -> int:
+        """
+        Returns the number of items dropped for arriving late.
+        """
+        return self.__late_count
+
+    def get_skipped_count(self) -> int:
+        """
+        Returns the number of sequences given up on.
+        """
+        return self.__skipped_count
@@ -0,0 +1,86 @@
+"""
+Reorder worker that restores sequence order after a stage with parallel workers.
+"""
+
+import os
+import pathlib
+import time
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from . import reorder_buffer
+from . import sequenced_item
+from ..common.modules.logger import logger
+
+
+# Maximum number of items handled per loop iteration
+MAX_BATCH_SIZE = 32
+# Give up on missing sequences once the input has been quiet this long
+QUEUE_TIMEOUT = 0.5  # seconds
+STATS_REPORT_PERIOD = 10  # seconds
+
+
+def reorder_worker(
+    window: int,
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker process. There must only be 1 of these per sequenced stream.
+
+    window is the maximum number of items held waiting for a missing sequence, at least the
+        number of items the upstream workers can have in flight.
+    input_queue holds sequenced items from the upstream workers, in any order.
+    output_queue is where the items are put in sequence order, without their sequence.
+        Items that are None are dropped after ordering.
+    controller is how the main process communicates to this worker process.
+    """
+    # Instantiate logger
+    worker_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{worker_name}_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create logger")
+        return
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    local_logger.info("Logger initialized", True)
+
+    # Start from the first item received rather than 0, so a restarted worker does not hold
+    # its window waiting for items released before it started
+    buffer = reorder_buffer.ReorderBuffer(window, None)
+
+    # Loop forever until exit has been requested
+    last_report_time = time.time()
+    while not controller.is_exit_requested():
+        # Method blocks worker if pause has been requested
+        controller.check_pause()
+
+        batch = input_queue.get_many(MAX_BATCH_SIZE, QUEUE_TIMEOUT)
+        released = []
+        if len(batch) == 0:
+            released = buffer.flush()
+
+        # Sentinel at shutdown
+        items = [item for item in batch if isinstance(item, sequenced_item.SequencedItem)]
+        # Oldest first, so the first item received does not make the rest of the batch late
+        for item in sorted(items, key=lambda item: item.sequence):
+            released += buffer.push(item)
+
+        output_queue.put_many([item.item for item in released if item.item is not None])
+
+        if time.time() - last_report_time > STATS_REPORT_PERIOD:
+            local_logger.info(
+                f"Reorder depth {buffer.get_depth()} (maximum {buffer.get_max_depth()}), "
+                f"late {buffer.get_late_count()}, skipped {buffer.get_skipped_count()}"
+            )
+            last_report_time = time.time()
+
+    local_logger.info(
+        f"Reorder stopped, maximum depth {buffer.get_max_depth()}, "
+        f"late {buffer.get_late_count()}, skipped {buffer.get_skipped_count()}",
+        True,
+    )
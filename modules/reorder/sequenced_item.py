@@ -0,0 +1,51 @@
+"""
+Sequence numbers for restoring order after a stage with parallel workers.
+"""
+
+import multiprocessing as mp
+
+
+class SequencedItem:
+    """
+    Item tagged with its position in the stream.
+    """
+
+    __slots__ = ("sequence", "item")
+
+    def __init__(self, sequence: int, item: object) -> None:
+        """
+        sequence: Position in the stream, from a SequenceCounter .
+        item: Payload, None if the item produced nothing but its position must still be
+            accounted for.
+        """
+        self.sequence = sequence
+        self.item = item
+
+    def __reduce__(self) -> "tuple":
+        """
+        Pickle as a tuple rather than as attributes.
+        """
+        return SequencedItem, (self.sequence, self.item)
+
+    def __str__(self) -> str:
+        return f"{self.sequence}: {self.item}"
+
+
+class SequenceCounter:
+    """
+    Source of consecutive sequence numbers, shared by all the workers of the source stage.
+    Pass it to the workers as a work argument.
+    """
+
+    def __init__(self) -> None:
+        self.__value = mp.Value("Q", 0)
+
+    def next(self) -> int:
+        """
+        Returns the next sequence number, starting from 0 .
+        """
+        with self.__value.get_lock():
+            sequence = self.__value.value
+            self.__value.value = sequence + 1
+
+        return sequence
@@ -0,0 +1,119 @@
+"""
+Short history of a telemetry stream, for sampling it at any recent time.
+"""
+
+import collections
+import math
+
+
+def interpolate_angle(start: float, end: float, fraction: float) -> float:
+    """
+    Interpolates along the shorter arc between two angles.
+
+    start: Angle at fraction 0 in radians.
+    end: Angle at fraction 1 in radians.
+    fraction: Position between the angles, 0 to 1 .
+
+    Returns the angle in radians in the range [-pi, pi] .
+    """
+    difference = math.atan2(math.sin(end - start), math.cos(end - start))
+    angle = start + difference * fraction
+    return math.atan2(math.sin(angle), math.cos(angle))
+
+
+class StreamHistory:
+    """
+    Fixed capacity ring buffer of timestamped samples of a stream, oldest first.
+
+    Sampling at a time between two samples interpolates linearly, except for angle values
+    which are interpolated on the circle so that -pi and pi are treated as adjacent.
+    Sampling outside the history holds the nearest sample.
+    """
+
+    def __init__(self, value_count: int, angle_indices: "set[int]", capacity: int) -> None:
+        """
+        value_count: Number of values in each sample.
+        angle_indices: Indices of values that are angles in radians.
+        capacity: Maximum number of samples kept, must be greater than 0 .
+        """
+        if capacity <= 0:
+            raise ValueError(f"Capacity must be greater than 0, got {capacity}")
+
+        self.__value_count = value_count
+        self.__angle_indices = frozenset(angle_indices)
+        self.__samples = collections.deque(maxlen=capacity)
+
+    def append(self, sample_time: int, values: "tuple[float, ...]") -> bool:
+        """
+        Adds a sample, replacing the oldest if full.
+
+        sample_time: Time of the sample in ms, not older than the newest sample.
+        values: Values of the sample.
+
+        Returns whether the sample was added, samples older than the newest are not.
+        """
+        if len(values) != self.__value_count:
+            raise ValueError(f"Expected {self.__value_count} values, got {len(values)}")
+
+        if len(self.__samples) > 0 and sample_time < self.__samples[-1][0]:
+            return False
+
+        self.__samples.append((sample_time, tuple(values)))
+        return True
+
+    def clear(self) -> None:
+        """
+        Removes all samples, e.g. when the clock of the stream restarts.
+        """
+        self.__samples.clear()
+
+    def get_newest_time(self) -> "int | None":
+        """
+        Returns the time of the newest sample, None if empty.
+        """
+        if len(self.__samples) == 0:
+            return None
+
+        return self.__samples[-1][0]
+
+    def sample(self, sample_time: float) -> "tuple[bool, tuple[float, ...] | None]":
+        """
+        Values of the stream at the time.
+
+        sample_time: Time in ms.
+
+        Returns whether there are any samples and the values.
+        """
+        if len(self.__samples) == 0:
+            return False, None
+
+        # Aligned times are usually at or near the newest sample, so search from the newest
+        later_time, later_values = self.__samples[-1]
+        if sample_time >= later_time:
+            return True, later_values
+
+        for earlier_time, earlier_values in reversed(self.__samples):
+            if earlier_time <= sample_time:
+                break
+
+            later_time, later_values = earlier_time, earlier_values
+        else:
+            # Older than the whole history
+            return True, later_values
+
+        if later_time == earlier_time:
+            return True, later_values
+
+        fraction = (sample_time - earlier_time) / (later_time - earlier_time)
+        values = tuple(
+            (
+                interpolate_angle(earlier, later, fraction)
+                if i in self.__angle_indices
+                else earlier + (later - earlier) * fraction
+            )
+            for i, (earlier, later) in enumerate(zip(earlier_values, later_values))
+        )
+        return True, values
+
+    def __len__(self) -> int:
+        return len(self.__samples)
@@ -2,18 +2,27 @@
 Telemetry gathering logic.
 """
 
+import enum
 import time
 
 from pymavlink import mavutil
 
+from . import stream_history
+from . import telemetry_record
 from ..common.modules.logger import logger
 
 
 class TelemetryData:  # pylint: disable=too-many-instance-attributes
     """
     Python struct to represent Telemtry Data. Contains the most recent attitude and position reading.
+
+    Pickles as a fixed size binary record (see telemetry_record), which is smaller and faster
+    to pickle than the attributes. The system ID of the vehicle is kept alongside the record
+    rather than in it.
     """
 
+    __slots__ = telemetry_record.FIELD_NAMES + ("system_id",)
+
     def __init__(
         self,
         time_since_boot: int | None = None,  # ms
@@ -29,6 +38,7 @@ class TelemetryData:  # pylint: disable=too-many-instance-attributes
         roll_speed: float | None = None,  # rad/s
         pitch_speed: float | None = None,  # rad/s
         yaw_speed: float | None = None,  # rad/s
+        system_id: int | None = None,
     ) -> None:
         self.time_since_boot = time_since_boot
         self.x = x
@@ -43,9 +53,56 @@ class TelemetryData:  # pylint: disable=too-many-instance-attributes
         self.roll_speed = roll_speed
         self.pitch_speed = pitch_speed
         self.yaw_speed = yaw_speed
+        self.system_id = system_id
+
+    @classmethod
+    def from_buffer(
+        cls,
+        buffer: "memoryview | bytes | bytearray",
+        offset: int = 0,
+        system_id: "int | None" = None,
+    ) -> "TelemetryData":
+        """
+        Decodes a record written by pack_into() or to_bytes() .
+
+        buffer: Buffer containing the record.
+        offset: Byte offset of the record within the buffer.
+        system_id: System ID of the vehicle, not part of the record.
+        """
+        return cls(*telemetry_record.unpack_from(buffer, offset), system_id=system_id)
+
+    def values(self) -> "tuple":
+        """
+        Returns all values in telemetry_record.FIELD_NAMES order.
+        """
+        return tuple(getattr(self, name) for name in telemetry_record.FIELD_NAMES)
+
+    def pack_into(self, buffer: "memoryview | bytearray", offset: int = 0) -> None:
+        """
+        Writes this as a record of telemetry_record.RECORD_SIZE bytes.
+
+        buffer: Writable buffer.
+        offset: Byte offset of the record within the buffer.
+        """
+        telemetry_record.pack_into(buffer, offset, self.values())
+
+    def to_bytes(self) -> bytes:
+        """
+        Returns this as a record.
+        """
+        buffer = bytearray(telemetry_record.RECORD_SIZE)
+        self.pack_into(buffer)
+        return bytes(buffer)
+
+    def __reduce__(self) -> "tuple":
+        """
+        Pickle as the binary record rather than as attributes.
+        """
+        return TelemetryData.from_buffer, (self.to_bytes(), 0, self.system_id)
 
     def __str__(self) -> str:
         return f"""{{
+            system_id: {self.system_id},
             time_since_boot: {self.time_since_boot},
             x: {self.x},
             y: {self.y},
@@ -62,82 +119,317 @@ class TelemetryData:  # pylint: disable=too-many-instance-attributes
         }}"""
 
 
+class EmitPolicy(enum.Enum):
+    """
+    When Telemetry emits fused data.
+    """
+
+    # Every newer message of either stream
+    ON_ANY_UPDATE = 0
+    # Once both streams have newer messages since the last emit
+    ON_BOTH = 1
+    # Every emit period, with whatever is latest
+    FIXED_RATE = 2
+
+
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
+class VehicleTelemetry:  # pylint: disable=too-many-instance-attributes
+    """
+    Latest state of the position and attitude streams of 1 vehicle.
+
+    A message much older than the newest of its stream means the time since boot restarted
+    (the vehicle rebooted or the counter wrapped), so both streams start over from it rather
+    than rejecting the vehicle's messages from then on.
+    """
+
+    # Samples kept per stream, enough to span the other stream's message interval
+    __HISTORY_CAPACITY = 16
+    # Going back further than this is a restart of the time since boot, not reordering
+    __RESTART_JUMP = 5000  # ms
+
+    def __init__(self, system_id: int, next_emit_time: float) -> None:
+        """
+        system_id: System ID of the vehicle.
+        next_emit_time: Monotonic time in seconds of the first emit, only used by FIXED_RATE .
+        """
+        self.system_id = system_id
+
+        # Short history of each stream so that both can be sampled at the same time
+        self.position_history = stream_history.StreamHistory(6, set(), self.__HISTORY_CAPACITY)
+        self.attitude_history = stream_history.StreamHistory(
+            6,
+            {0, 1, 2},
+            self.__HISTORY_CAPACITY,
+        )
+        # Whether each stream has updated since the last emit
+        self.is_position_fresh = False
+        self.is_attitude_fresh = False
+        self.next_emit_time = next_emit_time
+        # Aligned timestamp of the last emit, in ms
+        self.last_emit_aligned_time: "int | None" = None
+        # Number of restarts of the time since boot
+        self.restart_count = 0
+
+    def __check_restart(self, history: stream_history.StreamHistory, sample_time: int) -> None:
+        """
+        Clears both streams if the sample is from a restart of the time since boot.
+        """
+        newest_time = history.get_newest_time()
+        if newest_time is None or newest_time - sample_time <= self.__RESTART_JUMP:
+            return
+
+        self.position_history.clear()
+        self.attitude_history.clear()
+        self.is_position_fresh = False
+        self.is_attitude_fresh = False
+        self.last_emit_aligned_time = None
+        self.restart_count += 1
+
+    def __update_position(self, message: mavutil.mavlink.MAVLink_message) -> bool:
+        """
+        Returns whether the message was newer than the latest position.
+        """
+        self.__check_restart(self.position_history, message.time_boot_ms)
+        values = (message.x, message.y, message.z, message.vx, message.vy, message.vz)
+        if not self.position_history.append(message.time_boot_ms, values):
+            return False
+
+        self.is_position_fresh = True
+        return True
+
+    def __update_attitude(self, message: mavutil.mavlink.MAVLink_message) -> bool:
+        """
+        Returns whether the message was newer than the latest attitude.
+        """
+        self.__check_restart(self.attitude_history, message.time_boot_ms)
+        values = (
+            message.roll,
+            message.pitch,
+            message.yaw,
+            message.rollspeed,
+            message.pitchspeed,
+            message.yawspeed,
+        )
+        if not self.attitude_history.append(message.time_boot_ms, values):
+            return False
+
+        self.is_attitude_fresh = True
+        return True
+
+    def update(self, message: mavutil.mavlink.MAVLink_message) -> bool:
+        """
+        Updates the latest state of the stream of the message.
+
+        Returns whether the state changed.
+        """
+        message_type = message.get_type()
+        if message_type == "LOCAL_POSITION_NED":
+            return self.__update_position(message)
+
+        if message_type == "ATTITUDE":
+            return self.__update_attitude(message)
+
+        return False
+
+    def should_emit(
+        self, emit_policy: EmitPolicy, emit_period: float, is_updated: bool, now: float
+    ) -> bool:
+        """
+        Applies the emit policy, nothing is emitted until both streams have been received.
+        """
+        if len(self.position_history) == 0 or len(self.attitude_history) == 0:
+            return False
+
+        if emit_policy == EmitPolicy.ON_ANY_UPDATE:
+            # Only the stream that is behind moves the aligned time, so an update of the stream
+            # that is ahead would emit the same sample again
+            if not is_updated:
+                return False
+
+            aligned_time = min(
+                self.position_history.get_newest_time(),
+                self.attitude_history.get_newest_time(),
+            )
+            return self.last_emit_aligned_time is None or aligned_time > self.last_emit_aligned_time
+
+        if emit_policy == EmitPolicy.ON_BOTH:
+            return self.is_position_fresh and self.is_attitude_fresh
+
+        if now < self.next_emit_time:
+            return False
+
+        # Skip missed periods rather than emitting a burst
+        missed_periods = (now - self.next_emit_time) // emit_period
+        self.next_emit_time += (missed_periods + 1) * emit_period
+        return True
+
+    def emit(self) -> "TelemetryData | None":
+        """
+        Samples both streams, see sample_aligned(), and starts waiting for fresh data again.
+        """
+        self.is_position_fresh = False
+        self.is_attitude_fresh = False
+
+        telemetry_data = self.sample_aligned()
+        if telemetry_data is not None:
+            self.last_emit_aligned_time = telemetry_data.time_since_boot
+
+        return telemetry_data
+
+    def sample_aligned(self) -> "TelemetryData | None":
+        """
+        Samples both streams at the newest time that both have reached, interpolating the
+        stream that is ahead between its samples on either side.
+
+        Returns the aligned data, or None if a stream has no samples yet.
+        """
+        position_time = self.position_history.get_newest_time()
+        attitude_time = self.attitude_history.get_newest_time()
+        if position_time is None or attitude_time is None:
+            return None
+
+        aligned_time = min(position_time, attitude_time)
+        _, position_values = self.position_history.sample(aligned_time)
+        _, attitude_values = self.attitude_history.sample(aligned_time)
+
+        return TelemetryData(
+            aligned_time,
+            *position_values,
+            *attitude_values,
+            system_id=self.system_id,
+        )
+
+
 class Telemetry:
     """
     Telemetry class to read position and attitude (orientation).
+
+    Fuses the streams incrementally: each run() receives a single message, updates the latest
+    state of its stream, and emits according to the emit policy. Messages are handled in the
+    order they arrive, and a message older than the latest of its stream is ignored unless it
+    is from a restart of the vehicle's time since boot, see VehicleTelemetry .
+
+    Streams are kept per vehicle by the system ID of the message, so any number of vehicles
+    can share the connection. Emitted data is aligned to a single timestamp, see
+    VehicleTelemetry.sample_aligned() .
     """
 
     __private_key = object()
 
+    __MESSAGE_TYPES = ["LOCAL_POSITION_NED", "ATTITUDE"]
+    __RECEIVE_TIMEOUT = 0.1  # seconds
+
     @classmethod
     def create(
         cls,
         connection: mavutil.mavfile,
         local_logger: logger.Logger,
-    ) -> tuple:
+        emit_policy: EmitPolicy = EmitPolicy.ON_BOTH,
+        emit_period: float = 0.0,
+    ) -> "tuple[bool, Telemetry | None]":
         """
         Falliable create (instantiation) method to create a Telemetry object.
-        """
 
-        return True, Telemetry(cls.__private_key, connection, local_logger)
+        emit_policy: When to emit fused data.
+        emit_period: Time between emits in seconds, only used by FIXED_RATE .
+        """
+        if emit_policy == EmitPolicy.FIXED_RATE and emit_period <= 0.0:
+            local_logger.error(f"Emit period must be greater than 0, got {emit_period}", True)
+            return False, None
 
-        # Create a Telemetry object
+        return True, Telemetry(
+            cls.__private_key, connection, local_logger, emit_policy, emit_period
+        )
 
     def __init__(
         self,
         key: object,
         connection: mavutil.mavfile,
         local_logger: logger.Logger,
+        emit_policy: EmitPolicy,
+        emit_period: float,
     ) -> None:
         assert key is Telemetry.__private_key, "Use create() method"
 
         self.connection = connection
         self.local_logger = local_logger
-        self.telemetry_data = TelemetryData()
-        # Do any intializiation here
+        self.emit_policy = emit_policy
+        self.emit_period = emit_period
+
+        # System ID to the streams of the vehicle, added when it is first heard from
+        self.vehicles: "dict[int, VehicleTelemetry]" = {}
+
+    def update(self, message: mavutil.mavlink.MAVLink_message) -> bool:
+        """
+        Updates the latest state of the stream of the message, for the vehicle that sent it.
+
+        Returns whether the state changed.
+        """
+        system_id = message.get_srcSystem()
+        vehicle = self.vehicles.get(system_id)
+        if vehicle is None:
+            vehicle = VehicleTelemetry(system_id, time.monotonic() + self.emit_period)
+            self.vehicles[system_id] = vehicle
+            self.local_logger.info(f"Receiving telemetry from system {system_id}")
+
+        restart_count = vehicle.restart_count
+        is_updated = vehicle.update(message)
+        if vehicle.restart_count != restart_count:
+            self.local_logger.warning(
+                f"Time since boot of system {system_id} went back, restarting its telemetry"
+            )
+
+        return is_updated
+
+    def __get_timeout(self) -> float:
+        """
+        Time to wait for a message, at most until the next emit of the FIXED_RATE policy.
+        """
+        if self.emit_policy != EmitPolicy.FIXED_RATE or len(self.vehicles) == 0:
+            return self.__RECEIVE_TIMEOUT
+
+        next_emit_time = min(vehicle.next_emit_time for vehicle in self.vehicles.values())
+        return min(self.__RECEIVE_TIMEOUT, max(next_emit_time - time.monotonic(), 0.0))
 
     def run(
         self,
-    ) -> TelemetryData:
-        """
-        Receive LOCAL_POSITION_NED and ATTITUDE messages from the drone,
-        combining them together to form a single TelemetryData object.
-        """
-        # Read MAVLink message LOCAL_POSITION_NED (32)
-        # Read MAVLink message ATTITUDE (30)
-        # Return the most recent of both, and use the most recent message's timestamp
-
-        initial_time = time.time()
-        while (time.time() - initial_time) < 1:
-            position_msg = self.connection.recv_match(type="LOCAL_POSITION_NED", blocking=True)
-            attitude_msg = self.connection.recv_match(type="ATTITUDE", blocking=True)
-
-            if position_msg is not None:
-                self.telemetry_data.x = position_msg.x
-                self.telemetry_data.y = position_msg.y
-                self.telemetry_data.z = position_msg.z
-                self.telemetry_data.x_velocity = position_msg.vx
-                self.telemetry_data.y_velocity = position_msg.vy
-                self.telemetry_data.z_velocity = position_msg.vz
-
-            if attitude_msg is not None:
-                self.telemetry_data.roll = attitude_msg.roll
-                self.telemetry_data.pitch = attitude_msg.pitch
-                self.telemetry_data.yaw = attitude_msg.yaw
-                self.telemetry_data.roll_speed = attitude_msg.rollspeed
-                self.telemetry_data.pitch_speed = attitude_msg.pitchspeed
-                self.telemetry_data.yaw_speed = attitude_msg.yawspeed
-
-            if attitude_msg is not None and position_msg is not None:
-                self.telemetry_data.time_since_boot = max(
-                    attitude_msg.time_boot_ms, position_msg.time_boot_ms
-                )
-                return f"Telemetry Data: {self.telemetry_data}"
-
-        return "Failed to Receive Data"
+    ) -> "TelemetryData | None":
+        """
+        Receive a LOCAL_POSITION_NED or ATTITUDE message from a drone, and combine it with
+        the latest of the other from the same drone to form a single TelemetryData object.
+
+        Returns a copy of the combined data if the emit policy emits, otherwise None.
+        The timestamp is the older of the two streams' newest messages.
+        With FIXED_RATE, at most 1 vehicle that is due is emitted per run.
+        """
+        message = self.connection.recv_match(
+            type=self.__MESSAGE_TYPES,
+            blocking=True,
+            timeout=self.__get_timeout(),
+        )
+
+        now = time.monotonic()
+        if self.emit_policy == EmitPolicy.FIXED_RATE:
+            if message is not None:
+                self.update(message)
+
+            for vehicle in self.vehicles.values():
+                if vehicle.should_emit(self.emit_policy, self.emit_period, False, now):
+                    return vehicle.emit()
+
+            return None
+
+        if message is None:
+            return None
+
+        is_updated = self.update(message)
+        vehicle = self.vehicles[message.get_srcSystem()]
+        if not vehicle.should_emit(self.emit_policy, self.emit_period, is_updated, now):
+            return None
+
+        return vehicle.emit()
 
 
 # =================================================================================================
@@ -0,0 +1,185 @@
+"""
+Fixed capacity history of telemetry with windowed statistics.
+"""
+
+import math
+
+import numpy as np
+
+from . import telemetry_record
+
+
+# Values are every telemetry field except the timestamp, in telemetry_record.FIELD_NAMES order
+VALUE_NAMES = telemetry_record.FIELD_NAMES[1:]
+VALUE_INDEX = {name: i for i, name in enumerate(VALUE_NAMES)}
+
+
+class TelemetryHistory:  # pylint: disable=too-many-instance-attributes
+    """
+    Ring buffer of telemetry samples in NumPy arrays, oldest first.
+
+    Every sample is written twice, at its slot and at its slot plus the capacity, so the
+    samples are always a contiguous slice and queries return views without copying.
+    Running sums are kept per sample, so a windowed mean is 2 lookups regardless of the
+    window length, and the exponential moving average is updated on append.
+
+    Samples must have increasing timestamps and no missing values.
+    Arrays returned by queries are views, and are overwritten by later appends.
+    """
+
+    def __init__(self, capacity: int, ema_time_constant: float) -> None:
+        """
+        capacity: Maximum number of samples kept, must be greater than 0 .
+        ema_time_constant: Time constant of the exponential moving average in ms,
+            must be greater than 0 .
+        """
+        if capacity <= 0:
+            raise ValueError(f"Capacity must be greater than 0, got {capacity}")
+
+        if ema_time_constant <= 0.0:
+            raise ValueError(f"EMA time constant must be greater than 0, got {ema_time_constant}")
+
+        self.__capacity = capacity
+        self.__ema_time_constant = ema_time_constant
+
+        value_count = len(VALUE_NAMES)
+        self.__times = np.zeros(2 * capacity, dtype=np.int64)
+        self.__values = np.zeros((2 * capacity, value_count), dtype=np.float64)
+        # Sum of all values appended so far, up to and including each sample
+        self.__sums = np.zeros((2 * capacity, value_count), dtype=np.float64)
+        self.__total = np.zeros(value_count, dtype=np.float64)
+        self.__ema = np.zeros(value_count, dtype=np.float64)
+
+        # Slot of the oldest sample, and number of samples
+        self.__start = 0
+        self.__count = 0
+
+    def append(self, sample_time: int, values: "tuple[float | None, ...]") -> bool:
+        """
+        Adds a sample, replacing the oldest if full.
+
+        sample_time: Time of the sample in ms, later than the newest sample.
+        values: Values in VALUE_NAMES order.
+
+        Returns whether the sample was added, samples that are not newer or have a missing
+        value are not.
+        """
+        if len(values) != len(VALUE_NAMES):
+            raise ValueError(f"Expected {len(VALUE_NAMES)} values, got {len(values)}")
+
+        if sample_time is None or any(value is None for value in values):
+            return False
+
+        newest_time = self.get_newest_time()
+        if newest_time is not None and sample_time <= newest_time:
+            return False
+
+        if self.__count == self.__capacity:
+            self.__start = (self.__start + 1) % self.__capacity
+            self.__count -= 1
+
+        slot = (self.__start + self.__count) % self.__capacity
+        self.__count += 1
+
+        self.__total += values
+        for index in (slot, slot + self.__capacity):
+            self.__times[index] = sample_time
+            self.__values[index] = values
+            self.__sums[index] = self.__total
+
+        if newest_time is None:
+            self.__ema[:] = values
+        else:
+            # Weight depends on the time since the last sample, so irregular rates are fine
+            weight = 1.0 - math.exp(-(sample_time - newest_time) / self.__ema_time_constant)
+            self.__ema += weight * (self.__values[slot] - self.__ema)
+
+        return True
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def get_newest_time(self) -> "int | None":
+        """
+        Returns the time of the newest sample, None if empty.
+        """
+        if self.__count == 0:
+            return None
+
+        return int(self.__times[self.__start + self.__count - 1])
+
+    def __window(self, start_time: float, end_time: float) -> "tuple[int, int]":
+        """
+        Returns the buffer slice bounds of the samples within the time range, inclusive.
+        """
+        times = self.__times[self.__start : self.__start + self.__count]
+        first = int(np.searchsorted(times, start_time, side="left"))
+        last = int(np.searchsorted(times, end_time, side="right"))
+        return self.__start + first, self.__start + last
+
+    def get_window(self, start_time: float, end_time: float) -> "tuple[np.ndarray, np.ndarray]":
+        """
+        Samples within the time range, inclusive.
+
+        Returns the times and values (one row per sample), as views.
+        """
+        first, last = self.__window(start_time, end_time)
+        return self.__times[first:last], self.__values[first:last]
+
+    def mean(self, start_time: float, end_time: float) -> "tuple[bool, np.ndarray | None]":
+        """
+        Mean of each value over the samples within the time range, inclusive.
+
+        Returns whether there are any samples in the range and the means in VALUE_NAMES order.
+        """
+        first, last = self.__window(start_time, end_time)
+        if first == last:
+            return False, None
+
+        window_sum = self.__sums[last - 1] - self.__sums[first] + self.__values[first]
+        return True, window_sum / (last - first)
+
+    def minimum(self, start_time: float, end_time: float) -> "tuple[bool, np.ndarray | None]":
+        """
+        Minimum of each value over the samples within the time range, inclusive.
+
+        Returns whether there are any samples in the range and the minimums.
+        """
+        first, last = self.__window(start_time, end_time)
+        if first == last:
+            return False, None
+
+        return True, self.__values[first:last].min(axis=0)
+
+    def maximum(self, start_time: float, end_time: float) -> "tuple[bool, np.ndarray | None]":
+        """
+        Maximum of each value over the samples within the time range, inclusive.
+
+        Returns whether there are any samples in the range and the maximums.
+        """
+        first, last = self.__window(start_time, end_time)
+        if first == last:
+            return False, None
+
+        return True, self.__values[first:last].max(axis=0)
+
+    def ema(self) -> "tuple[bool, np.ndarray | None]":
+        """
+        Exponential moving average of each value, weighted by time between samples.
+
+        Returns whether there are any samples and a copy of the averages.
+        """
+        if self.__count == 0:
+            return False, None
+
+        return True, self.__ema.copy()
+
+    def last(self, count: int) -> "tuple[np.ndarray, np.ndarray]":
+        """
+        Newest samples, at most count of them.
+
+        Returns the times and values (one row per sample), oldest first, as views.
+        """
+        count = max(min(count, self.__count), 0)
+        end = self.__start + self.__count
+        return self.__times[end - count : end], self.__values[end - count : end]
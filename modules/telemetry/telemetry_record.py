@@ -0,0 +1,64 @@
+"""
+Fixed layout binary record of telemetry data.
+"""
+
+import struct
+
+
+# Order of the fields in the record, matches the TelemetryData constructor
+FIELD_NAMES = (
+    "time_since_boot",
+    "x",
+    "y",
+    "z",
+    "x_velocity",
+    "y_velocity",
+    "z_velocity",
+    "roll",
+    "pitch",
+    "yaw",
+    "roll_speed",
+    "pitch_speed",
+    "yaw_speed",
+)
+
+# Little endian, no padding:
+# None mask (bit i set means field i is None), time since boot (ms), 12 floats
+RECORD_FORMAT = struct.Struct("<Hq12d")
+# Bytes, 2 + 8 + 12 * 8
+RECORD_SIZE = 106
+assert RECORD_SIZE == RECORD_FORMAT.size, "Record size does not match the record format"
+
+
+def pack_into(buffer: "memoryview | bytearray", offset: int, values: "tuple") -> None:
+    """
+    Writes the values into the buffer as a record.
+
+    buffer: Writable buffer.
+    offset: Byte offset of the record within the buffer.
+    values: One value per field in FIELD_NAMES order, None is allowed.
+    """
+    mask = 0
+    raw_values = []
+    for i, value in enumerate(values):
+        if value is None:
+            mask |= 1 << i
+            raw_values.append(0)
+        else:
+            raw_values.append(value)
+
+    raw_values[0] = int(raw_values[0])
+    RECORD_FORMAT.pack_into(buffer, offset, mask, *raw_values)
+
+
+def unpack_from(buffer: "memoryview | bytes | bytearray", offset: int = 0) -> "tuple":
+    """
+    Reads a record from the buffer.
+
+    buffer: Buffer containing the record.
+    offset: Byte offset of the record within the buffer.
+
+    Returns one value per field in FIELD_NAMES order, None where the mask is set.
+    """
+    mask, *raw_values = RECORD_FORMAT.unpack_from(buffer, offset)
+    return tuple(None if mask & (1 << i) else value for i, value in enumerate(raw_values))
@@ -4,28 +4,43 @@ Telemtry worker that gathers GPS data.
 
 import os
 import pathlib
+import time
 
 from pymavlink import mavutil
 
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
 from . import telemetry
+from ..reorder import sequenced_item
 from ..common.modules.logger import logger
 
 
+# Warn if nothing has been emitted for this long
+EMIT_WARNING_PERIOD = 1  # seconds
+
+
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
 def telemetry_worker(
     connection: mavutil.mavfile,
-    local_logger: logger,
+    emit_policy: telemetry.EmitPolicy,
+    emit_period: float,
+    sequence_counter: "sequenced_item.SequenceCounter | None",
     output_queue: queue_proxy_wrapper.QueueProxyWrapper,
     controller: worker_controller.WorkerController,
 ) -> None:
     """
     Worker process.
 
-    args... describe what the arguments are
+    connection is the MAVLink connection to receive position and attitude from, of any number
+        of vehicles.
+    emit_policy is when to emit fused telemetry, see telemetry.EmitPolicy .
+    emit_period is the time between emits in seconds for the FIXED_RATE policy.
+    sequence_counter tags emitted telemetry with its order across all telemetry workers,
+        so a later reorder stage can restore it, None to emit untagged telemetry.
+    output_queue is where fused telemetry is put.
+    controller is how the main process communicates to this worker process.
     """
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -48,7 +63,12 @@ def telemetry_worker(
     #                          ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
     # =============================================================================================
     # Instantiate class object (telemetry.Telemetry)
-    result, telemetry_instance = telemetry.Telemetry.create(connection, local_logger)
+    result, telemetry_instance = telemetry.Telemetry.create(
+        connection,
+        local_logger,
+        emit_policy,
+        emit_period,
+    )
 
     # Main loop: do work.
 
@@ -56,13 +76,33 @@ def telemetry_worker(
         local_logger.error("Failed to have telemetry data", True)
         return
 
+    # Get Pylance to stop complaining
+    assert telemetry_instance is not None
+
+    last_emit_time = time.time()
     while not controller.is_exit_requested():
         controller.check_pause()
         telemetry_data = telemetry_instance.run()
 
-        if telemetry_data is not None:
+        # Most messages do not emit, depending on the policy
+        if telemetry_data is None:
+            if time.time() - last_emit_time > EMIT_WARNING_PERIOD:
+                local_logger.warning("Failed to receive telemetry")
+                last_emit_time = time.time()
+
+            continue
+
+        last_emit_time = time.time()
+
+        if sequence_counter is None:
             output_queue.queue.put(telemetry_data)
-            local_logger.info(f"Queued telemetry: {telemetry_data}")
+        else:
+            output_queue.queue.put(
+                sequenced_item.SequencedItem(sequence_counter.next(), telemetry_data)
+            )
+
+        # Consumers render the full data with str() only if they log it
+        local_logger.debug(f"Queued telemetry at {telemetry_data.time_since_boot} ms")
 
 
 # =================================================================================================
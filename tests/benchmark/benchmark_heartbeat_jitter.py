@@ -0,0 +1,162 @@
+"""
+Benchmark heartbeat sender timing jitter under CPU load, with and without pinning the sender
+to a CPU that the load is kept off.
+To run:
+```
+python -m tests.benchmark.benchmark_heartbeat_jitter
+```
+"""
+
+import multiprocessing as mp
+import os
+import queue
+import statistics
+import time
+
+from pymavlink import mavutil
+
+from modules.common.modules.logger import logger
+from modules.heartbeat import heartbeat_sender_worker
+from utilities.workers import worker_controller
+from utilities.workers import worker_manager
+
+
+DURATION = 10  # seconds per run
+LOAD_PROCESSES_PER_CPU = 2
+# Sender runs the same way as in bootcamp_main
+SENDER_BACKEND = worker_manager.WorkerBackend.THREAD
+
+
+class TimedConnection:
+    """
+    Connection stand in that records when each message is written.
+    """
+
+    def __init__(self, write_times: "queue.Queue[float]") -> None:
+        """
+        write_times: Output of the write times, monotonic in seconds.
+        """
+        self.__write_times = write_times
+        self.mav = mavutil.mavlink.MAVLink(self)
+
+    def write(self, _: bytes) -> None:
+        """
+        Records the time.
+        """
+        self.__write_times.put(time.monotonic())
+
+
+def load(cpu_affinity: "set[int] | None", stop_event: "mp.synchronize.Event") -> None:
+    """
+    Keeps a CPU busy until stopped.
+    """
+    worker_manager.set_scheduling(cpu_affinity, None)
+    while not stop_event.is_set():
+        for _ in range(10000):
+            pass
+
+
+def measure_jitter(
+    sender_cpu_affinity: "set[int] | None",
+    load_cpu_affinity: "set[int] | None",
+    local_logger: logger.Logger,
+) -> "tuple[bool, tuple[float, float, float] | None]":
+    """
+    Runs the heartbeat sender under load.
+
+    Returns whether it ran and the mean, standard deviation, and maximum of the time between
+    heartbeats in ms.
+    """
+    stop_event = mp.Event()
+    load_processes = [
+        mp.Process(target=load, args=(load_cpu_affinity, stop_event))
+        for _ in range(LOAD_PROCESSES_PER_CPU * len(os.sched_getaffinity(0)))
+    ]
+    for process in load_processes:
+        process.start()
+
+    write_times = queue.Queue()
+    controller = worker_controller.WorkerController()
+    result, properties = worker_manager.WorkerProperties.create(
+        count=1,
+        target=heartbeat_sender_worker.heartbeat_sender_worker,
+        work_arguments=(TimedConnection(write_times),),
+        input_queues=[],
+        output_queues=[],
+        controller=controller,
+        local_logger=local_logger,
+        backend=SENDER_BACKEND,
+        cpu_affinity=sender_cpu_affinity,
+    )
+    if not result:
+        return False, None
+
+    # Get Pylance to stop complaining
+    assert properties is not None
+
+    result, manager = worker_manager.WorkerManager.create(properties, local_logger)
+    if not result:
+        return False, None
+
+    # Get Pylance to stop complaining
+    assert manager is not None
+
+    manager.start_workers()
+    time.sleep(DURATION)
+    controller.request_exit()
+    manager.join_workers()
+
+    stop_event.set()
+    for process in load_processes:
+        process.join()
+
+    times = list(write_times.queue)
+    intervals = [(end - start) * 1e3 for start, end in zip(times, times[1:])]
+    if len(intervals) < 2:
+        return False, None
+
+    return True, (statistics.mean(intervals), statistics.stdev(intervals), max(intervals))
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    result, local_logger = logger.Logger.create("benchmark_heartbeat_jitter", False)
+    if not result:
+        print("ERROR: Failed to create logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    cpus = sorted(os.sched_getaffinity(0))
+    runs = {"unpinned": (None, None)}
+    if len(cpus) > 1:
+        # Sender gets the first CPU to itself
+        runs["pinned"] = ({cpus[0]}, set(cpus[1:]))
+
+    for name, (sender_cpu_affinity, load_cpu_affinity) in runs.items():
+        result, intervals = measure_jitter(sender_cpu_affinity, load_cpu_affinity, local_logger)
+        if not result:
+            print(f"ERROR: Failed to measure {name}")
+            return -1
+
+        # Get Pylance to stop complaining
+        assert intervals is not None
+
+        mean, deviation, maximum = intervals
+        print(
+            f"{name:>8}: interval mean {mean:9.3f} ms, "
+            f"standard deviation {deviation:7.3f} ms, maximum {maximum:9.3f} ms"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
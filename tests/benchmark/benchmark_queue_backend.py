@@ -0,0 +1,109 @@
+"""
+Benchmark throughput and latency of the queue backends. To run:
+```
+python -m tests.benchmark.benchmark_queue_backend
+```
+"""
+
+import multiprocessing as mp
+import time
+
+from utilities.workers import queue_proxy_wrapper
+
+
+ITEM_COUNT = 5000
+QUEUE_MAX_SIZE = 64
+BATCH_SIZE = 32
+
+# Roughly the size of a telemetry sample
+PAYLOAD = {
+    "time_since_boot": 123456,
+    "position": (1.0, 2.0, 3.0),
+    "velocity": (0.1, 0.2, 0.3),
+    "attitude": (0.01, 0.02, 0.03),
+    "attitude_speed": (0.001, 0.002, 0.003),
+}
+
+
+def producer(
+    item_count: int,
+    batch_size: int,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+) -> None:
+    """
+    Puts timestamped items into the queue followed by a sentinel.
+    Batch size of 1 uses single item puts.
+    """
+    if batch_size == 1:
+        for _ in range(item_count):
+            output_queue.queue.put((time.perf_counter(), PAYLOAD))
+    else:
+        for _ in range(0, item_count, batch_size):
+            now = time.perf_counter()
+            output_queue.put_many([(now, PAYLOAD)] * batch_size)
+
+    output_queue.queue.put(None)
+
+
+def run_backend(
+    backend: queue_proxy_wrapper.QueueBackend,
+    batch_size: int,
+    mp_manager: "mp.managers.SyncManager",
+) -> "tuple[float, float]":
+    """
+    Runs a producer process against a consumer in this process.
+
+    Returns throughput in items per second and mean latency in milliseconds.
+    """
+    data_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAX_SIZE, backend)
+
+    worker = mp.Process(target=producer, args=(ITEM_COUNT, batch_size, data_queue))
+
+    start = time.perf_counter()
+    worker.start()
+
+    total_latency = 0.0
+    count = 0
+    is_done = False
+    while not is_done:
+        for item in data_queue.get_many(batch_size):
+            if item is None:
+                is_done = True
+                break
+
+            total_latency += time.perf_counter() - item[0]
+            count += 1
+
+    elapsed = time.perf_counter() - start
+    worker.join()
+    data_queue.release()
+
+    return count / elapsed, total_latency / count * 1000
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    mp_manager = mp.Manager()
+
+    print(f"{ITEM_COUNT} items, queue max size {QUEUE_MAX_SIZE}")
+    for backend in queue_proxy_wrapper.QueueBackend:
+        for batch_size in [1, BATCH_SIZE]:
+            throughput, latency = run_backend(backend, batch_size, mp_manager)
+            print(
+                f"{backend.name:>14} batch {batch_size:>3}: "
+                f"{throughput:10.0f} items/s, {latency:8.3f} ms mean latency"
+            )
+
+    mp_manager.shutdown()
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
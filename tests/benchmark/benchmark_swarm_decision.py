@@ -0,0 +1,93 @@
+"""
+Benchmark deciding commands for each vehicle in Python against all at once in NumPy.
+To run:
+```
+python -m tests.benchmark.benchmark_swarm_decision
+```
+"""
+
+import math
+import time
+
+import numpy as np
+
+from modules.command import decision
+
+
+VEHICLE_COUNTS = [1, 100, 10000]
+# Repeat until at least this long, for stable timings of small swarms
+MIN_DURATION = 0.5  # seconds
+TARGET = (10.0, 20.0, 30.0)
+
+
+def decide_each(positions: np.ndarray, yaws: np.ndarray) -> int:
+    """
+    Decides for each vehicle in turn, as Command.run() does.
+
+    Returns the number of commands.
+    """
+    command_count = 0
+    for (x, y, z), yaw in zip(positions.tolist(), yaws.tolist()):
+        delta_height, delta_yaw, direction = decision.decide(x, y, z, yaw, *TARGET)
+        command_count += len(decision.get_commands(delta_height, delta_yaw, direction, TARGET[2]))
+
+    return command_count
+
+
+def decide_all(positions: np.ndarray, yaws: np.ndarray) -> int:
+    """
+    Decides for all vehicles in 1 pass.
+
+    Returns the number of commands.
+    """
+    swarm_decision = decision.decide_swarm(positions, yaws, np.array(TARGET))
+    return int(swarm_decision.is_altitude_changed.sum() + swarm_decision.is_yaw_changed.sum())
+
+
+def measure(
+    decide: "(np.ndarray, np.ndarray) -> int", positions: np.ndarray, yaws: np.ndarray  # type: ignore
+) -> "tuple[float, int]":
+    """
+    Returns the time of a decision for the whole swarm in microseconds, and its command count.
+    """
+    iteration_count = 0
+    command_count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < MIN_DURATION:
+        command_count = decide(positions, yaws)
+        iteration_count += 1
+
+    elapsed = time.perf_counter() - start
+    return elapsed / iteration_count * 1e6, command_count
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    rng = np.random.default_rng(0)
+
+    for vehicle_count in VEHICLE_COUNTS:
+        positions = rng.uniform(-100.0, 100.0, (vehicle_count, 3))
+        yaws = rng.uniform(-math.pi, math.pi, vehicle_count)
+
+        each_time, each_count = measure(decide_each, positions, yaws)
+        all_time, all_count = measure(decide_all, positions, yaws)
+        if each_count != all_count:
+            print(f"ERROR: {each_count} commands for each, {all_count} for all")
+            return -1
+
+        print(
+            f"{vehicle_count:>6} vehicles: each {each_time:10.1f} us, "
+            f"all at once {all_time:10.1f} us, speedup {each_time / all_time:6.1f}x"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
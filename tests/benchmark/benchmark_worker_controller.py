@@ -0,0 +1,130 @@
+"""
+Benchmark per iteration overhead and exit propagation latency of the worker controller.
+To run:
+```
+python -m tests.benchmark.benchmark_worker_controller
+```
+"""
+
+import multiprocessing as mp
+import time
+
+from utilities.workers import worker_controller
+
+
+ITERATION_COUNT = 100000
+EXIT_TRIAL_COUNT = 20
+
+
+class LegacyWorkerController:
+    """
+    Previous implementation for comparison, polls queue emptiness and a semaphore.
+    """
+
+    __QUEUE_DELAY = 0.1  # seconds
+
+    def __init__(self) -> None:
+        self.__pause = mp.BoundedSemaphore(1)
+        self.__exit_queue = mp.Queue(1)
+
+    def check_pause(self) -> None:
+        """
+        Acquires and releases the pause semaphore.
+        """
+        self.__pause.acquire()
+        self.__pause.release()
+
+    def request_exit(self) -> None:
+        """
+        Puts into the exit queue after a delay.
+        """
+        time.sleep(self.__QUEUE_DELAY)
+        if self.__exit_queue.empty():
+            self.__exit_queue.put(None)
+
+    def is_exit_requested(self) -> bool:
+        """
+        Whether the exit queue is not empty.
+        """
+        return not self.__exit_queue.empty()
+
+
+def measure_overhead(
+    controller: "worker_controller.WorkerController | LegacyWorkerController",
+) -> float:
+    """
+    Returns the time of a worker loop check in microseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(ITERATION_COUNT):
+        if controller.is_exit_requested():
+            break
+
+        controller.check_pause()
+
+    return (time.perf_counter() - start) / ITERATION_COUNT * 1e6
+
+
+def worker(
+    controller: "worker_controller.WorkerController | LegacyWorkerController",
+    ready: "mp.synchronize.Event",
+    exit_time: "mp.sharedctypes.Synchronized",
+) -> None:
+    """
+    Loops until exit is requested, then records when it saw the request.
+    """
+    ready.set()
+    while not controller.is_exit_requested():
+        controller.check_pause()
+
+    exit_time.value = time.monotonic()
+
+
+def measure_exit_latency(controller_class: type) -> "tuple[float, float]":
+    """
+    Returns the mean time for request_exit() to return, and for a worker to see the request,
+    both in milliseconds.
+    """
+    total_request = 0.0
+    total_propagation = 0.0
+    for _ in range(EXIT_TRIAL_COUNT):
+        controller = controller_class()
+        ready = mp.Event()
+        exit_time = mp.Value("d", 0.0)
+        process = mp.Process(target=worker, args=(controller, ready, exit_time))
+        process.start()
+        ready.wait()
+
+        start = time.monotonic()
+        controller.request_exit()
+        end = time.monotonic()
+        process.join()
+
+        total_request += end - start
+        total_propagation += exit_time.value - start
+
+    return total_request / EXIT_TRIAL_COUNT * 1000, total_propagation / EXIT_TRIAL_COUNT * 1000
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    for controller_class in [LegacyWorkerController, worker_controller.WorkerController]:
+        overhead = measure_overhead(controller_class())
+        request_latency, propagation_latency = measure_exit_latency(controller_class)
+        print(
+            f"{controller_class.__name__:>22}: {overhead:7.3f} us per check, "
+            f"request_exit() {request_latency:8.3f} ms, "
+            f"seen by worker {propagation_latency:8.3f} ms"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
@@ -0,0 +1,86 @@
+"""
+Benchmark worker process startup per start method: import time of the worker module and time
+from starting the process until its first item arrives.
+To run:
+```
+python -m tests.benchmark.benchmark_worker_startup
+```
+"""
+
+import importlib
+import multiprocessing as mp
+import time
+
+
+TRIAL_COUNT = 5
+
+# Worker type to the module of its worker function
+WORKER_MODULES = {
+    "mavlink_router": "modules.mavlink_router.mavlink_router_worker",
+    "heartbeat_sender": "modules.heartbeat.heartbeat_sender_worker",
+    "heartbeat_receiver": "modules.heartbeat.heartbeat_receiver_worker",
+    "telemetry": "modules.telemetry.telemetry_worker",
+    "command": "modules.command.command_worker",
+}
+
+# Same as bootcamp_main.FORKSERVER_PRELOAD_MODULES, with the worker modules imported by main
+FORKSERVER_PRELOAD_MODULES = ["pymavlink.mavutil", "numpy"] + list(WORKER_MODULES.values())
+
+
+def worker(module_name: str, output_queue: "mp.SimpleQueue") -> None:
+    """
+    Imports the worker module and puts the import time as the first item.
+    """
+    start = time.perf_counter()
+    importlib.import_module(module_name)
+    output_queue.put(time.perf_counter() - start)
+
+
+def measure_startup(context: mp.context.BaseContext, module_name: str) -> "tuple[float, float]":
+    """
+    Returns the mean import time and time to first item in ms.
+    """
+    total_import_time = 0.0
+    total_first_item_time = 0.0
+    output_queue = context.SimpleQueue()
+    for _ in range(TRIAL_COUNT):
+        process = context.Process(target=worker, args=(module_name, output_queue))
+
+        start = time.perf_counter()
+        process.start()
+        import_time = output_queue.get()
+        total_first_item_time += time.perf_counter() - start
+        total_import_time += import_time
+
+        process.join()
+
+    return total_import_time / TRIAL_COUNT * 1e3, total_first_item_time / TRIAL_COUNT * 1e3
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    for start_method in ["spawn", "forkserver", "fork"]:
+        context = mp.get_context(start_method)
+        if start_method == "forkserver":
+            context.set_forkserver_preload(FORKSERVER_PRELOAD_MODULES)
+            # Exclude starting the fork server itself, which happens once in main
+            measure_startup(context, "time")
+
+        for worker_type, module_name in WORKER_MODULES.items():
+            import_time, first_item_time = measure_startup(context, module_name)
+            print(
+                f"{start_method:>10} {worker_type:>18}: import {import_time:8.3f} ms, "
+                f"first item {first_item_time:8.3f} ms"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
@@ -35,6 +35,8 @@ TURNING_SPEED = 5  # deg/s
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
 # Add your own constants here
+# A fixed target has a single waypoint, so there is nothing to resume
+RESUME_FROM_NEAREST = False
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -263,6 +265,7 @@ def main() -> int:
     command_worker.command_worker(
         connection,
         TARGET,
+        RESUME_FROM_NEAREST,
         input_queue,
         output_queue,
         controller,
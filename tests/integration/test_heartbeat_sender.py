@@ -103,7 +103,6 @@ def main() -> int:
 
     heartbeat_sender_worker.heartbeat_sender_worker(
         connection,
-        main_logger,
         controller,
         # Place your own arguments here
     )
@@ -11,6 +11,7 @@ from pymavlink import mavutil
 from modules.common.modules.logger import logger
 from modules.common.modules.logger import logger_main_setup
 from modules.common.modules.read_yaml import read_yaml
+from modules.telemetry import telemetry
 from modules.telemetry import telemetry_worker
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
@@ -28,6 +29,9 @@ NUM_FAILS = 3
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
 # Add your own constants here
+# Emit once both position and attitude are newer, the period is only for FIXED_RATE
+TELEMETRY_EMIT_POLICY = telemetry.EmitPolicy.ON_BOTH
+TELEMETRY_EMIT_PERIOD = 0.0  # seconds
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -141,7 +145,9 @@ def main() -> int:
     # main_logger.info("Worker Summoned")
     telemetry_worker.telemetry_worker(
         connection,
-        main_logger,
+        TELEMETRY_EMIT_POLICY,
+        TELEMETRY_EMIT_PERIOD,
+        None,
         output_queue,
         controller,
         # Put your own arguments here
@@ -0,0 +1,156 @@
+"""
+Test asyncio task workers.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from utilities.workers import asyncio_worker
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+TIMEOUT = 1.0  # seconds
+
+
+@pytest.fixture()
+def loop_thread() -> asyncio_worker.EventLoopThread:  # type: ignore
+    """
+    Running event loop, stopped after the test.
+    """
+    event_loop_thread = asyncio_worker.EventLoopThread("test_loop")
+    yield event_loop_thread  # type: ignore
+    event_loop_thread.stop()
+
+
+async def add(a: int, b: int) -> int:
+    """
+    Returns after yielding to the event loop.
+    """
+    await asyncio.sleep(0)
+    return a + b
+
+
+async def fail() -> None:
+    """
+    Raises after yielding to the event loop.
+    """
+    await asyncio.sleep(0)
+    raise RuntimeError("Worker failed")
+
+
+async def wait(event: threading.Event) -> None:
+    """
+    Runs until the event is set.
+    """
+    while not event.is_set():
+        await asyncio.sleep(0.001)
+
+
+class TestEventLoopThread:
+    """
+    Coroutines submitted from other threads run on the loop.
+    """
+
+    def test_submit(self, loop_thread: asyncio_worker.EventLoopThread) -> None:
+        """
+        Result of the coroutine is returned through the future.
+        """
+        # Run
+        future = loop_thread.submit(add(1, 2))
+
+        # Test
+        assert future.result(TIMEOUT) == 3
+
+    def test_exception(self, loop_thread: asyncio_worker.EventLoopThread) -> None:
+        """
+        Exception of the coroutine is raised through the future, and the loop keeps running.
+        """
+        # Run
+        future = loop_thread.submit(fail())
+
+        # Test
+        with pytest.raises(RuntimeError):
+            future.result(TIMEOUT)
+
+        assert loop_thread.submit(add(2, 2)).result(TIMEOUT) == 4
+
+    def test_stop(self) -> None:
+        """
+        Stopping ends the thread and closes the loop.
+        """
+        # Setup
+        event_loop_thread = asyncio_worker.EventLoopThread("test_loop")
+
+        # Run
+        event_loop_thread.stop()
+
+        # Test
+        assert not event_loop_thread._EventLoopThread__thread.is_alive()
+        assert event_loop_thread._EventLoopThread__loop.is_closed()
+
+
+class TestAsyncioWorker:
+    """
+    Task with the process interface.
+    """
+
+    def test_start_and_join(self, loop_thread: asyncio_worker.EventLoopThread) -> None:
+        """
+        Alive until the task returns, then exits with 0 .
+        """
+        # Setup
+        event = threading.Event()
+        worker = asyncio_worker.AsyncioWorker(loop_thread, wait, (event,), "wait_0")
+
+        # Run
+        is_alive_before_start = worker.is_alive()
+        worker.start()
+        is_alive_while_running = worker.is_alive()
+        exitcode_while_running = worker.exitcode
+        event.set()
+        worker.join(TIMEOUT)
+
+        # Test
+        assert not is_alive_before_start
+        assert is_alive_while_running
+        assert exitcode_while_running is None
+        assert not worker.is_alive()
+        assert worker.exitcode == 0
+        assert worker.pid is None
+
+    def test_exception(self, loop_thread: asyncio_worker.EventLoopThread) -> None:
+        """
+        Task that raises exits with 1 .
+        """
+        # Setup
+        worker = asyncio_worker.AsyncioWorker(loop_thread, fail, (), "fail_0")
+
+        # Run
+        worker.start()
+        worker.join(TIMEOUT)
+
+        # Test
+        assert not worker.is_alive()
+        assert worker.exitcode == 1
+
+    def test_terminate(self, loop_thread: asyncio_worker.EventLoopThread) -> None:
+        """
+        Cancelled task stops at its current await and exits with 1 .
+        """
+        # Setup
+        worker = asyncio_worker.AsyncioWorker(loop_thread, wait, (threading.Event(),), "wait_0")
+        worker.start()
+
+        # Run
+        worker.terminate()
+        worker.join(TIMEOUT)
+
+        # Test
+        assert not worker.is_alive()
+        assert worker.exitcode == 1
@@ -0,0 +1,221 @@
+"""
+Test the broadcast channel.
+"""
+
+import multiprocessing as mp
+import queue
+
+import pytest
+
+from utilities.workers import broadcast_channel
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+CHANNEL_CAPACITY = 4
+SUBSCRIBER_COUNT = 2
+SLOT_SIZE = 256  # bytes
+
+
+@pytest.fixture(params=list(broadcast_channel.LagPolicy))
+def channel(request: pytest.FixtureRequest) -> broadcast_channel.BroadcastChannel:  # type: ignore
+    """
+    Creates a small broadcast channel with each lag policy.
+    """
+    broadcast = broadcast_channel.BroadcastChannel(
+        CHANNEL_CAPACITY, SUBSCRIBER_COUNT, request.param, SLOT_SIZE
+    )
+    yield broadcast  # type: ignore
+    broadcast.close()
+    broadcast.unlink()
+
+
+def create_channel(lag_policy: broadcast_channel.LagPolicy) -> broadcast_channel.BroadcastChannel:
+    """
+    Creates a small broadcast channel, the caller frees it.
+    """
+    return broadcast_channel.BroadcastChannel(
+        CHANNEL_CAPACITY, SUBSCRIBER_COUNT, lag_policy, SLOT_SIZE
+    )
+
+
+def producer(channel: broadcast_channel.BroadcastChannel, count: int) -> None:
+    """
+    Publishes integers.
+    """
+    for i in range(count):
+        channel.put(i)
+
+
+class TestBroadcastChannel:
+    """
+    Publish and subscribe behaviour.
+    """
+
+    def test_every_subscriber(self, channel: broadcast_channel.BroadcastChannel) -> None:
+        """
+        Each subscriber gets every item in order.
+        """
+        # Setup
+        expected = [1, "two", (3.0, None)]
+        subscribers = [channel.subscribe(index) for index in range(SUBSCRIBER_COUNT)]
+
+        # Run
+        channel.put_many(expected)
+
+        # Test
+        for subscriber in subscribers:
+            assert subscriber.qsize() == len(expected)
+            assert subscriber.get_many(CHANNEL_CAPACITY, 0.0) == expected
+            assert subscriber.empty()
+
+    def test_shared_subscriber(self, channel: broadcast_channel.BroadcastChannel) -> None:
+        """
+        Consumers sharing a subscriber split its items.
+        """
+        # Setup
+        first = channel.subscribe(0)
+        second = channel.subscribe(0)
+
+        # Run
+        channel.put_many([0, 1])
+
+        # Test
+        assert [first.get_nowait(), second.get_nowait()] == [0, 1]
+        with pytest.raises(queue.Empty):
+            first.get_nowait()
+
+    def test_get_timeout(self, channel: broadcast_channel.BroadcastChannel) -> None:
+        """
+        Empty batch on timeout.
+        """
+        assert channel.subscribe(0).get_many(CHANNEL_CAPACITY, 0.01) == []
+
+    def test_item_too_large(self, channel: broadcast_channel.BroadcastChannel) -> None:
+        """
+        Items that do not fit in a slot are rejected.
+        """
+        with pytest.raises(ValueError):
+            channel.put(bytes(SLOT_SIZE))
+
+    def test_invalid_subscriber(self, channel: broadcast_channel.BroadcastChannel) -> None:
+        """
+        Subscriber index is within the subscriber count.
+        """
+        with pytest.raises(ValueError):
+            channel.subscribe(SUBSCRIBER_COUNT)
+
+    def test_across_processes(self) -> None:
+        """
+        Items from another process arrive complete and in order.
+        """
+        # Setup
+        count = 100
+        channel = create_channel(broadcast_channel.LagPolicy.BLOCK)
+        subscriber = channel.subscribe(0)
+        other = channel.subscribe(1)
+        worker = mp.Process(target=producer, args=(channel, count))
+
+        # Run
+        worker.start()
+        actual = []
+        while len(actual) < count:
+            actual += subscriber.get_many(count, 5.0)
+            # Keep the other subscriber from blocking the producer
+            other.get_many(count, 0.0)
+
+        worker.join()
+
+        # Test
+        assert actual == list(range(count))
+        channel.close()
+        channel.unlink()
+
+
+class TestLagPolicy:
+    """
+    Slow subscribers.
+    """
+
+    def test_block(self) -> None:
+        """
+        Producer waits for the slowest subscriber.
+        """
+        # Setup
+        channel = create_channel(broadcast_channel.LagPolicy.BLOCK)
+        channel.put_many(list(range(CHANNEL_CAPACITY)))
+        channel.subscribe(0).get_many(CHANNEL_CAPACITY, 0.0)
+
+        # Run
+        with pytest.raises(queue.Full):
+            channel.put(CHANNEL_CAPACITY, timeout=0.01)
+
+        put_count = channel.put_many([CHANNEL_CAPACITY], 0.01)
+        channel.subscribe(1).get()
+        channel.put_nowait(CHANNEL_CAPACITY)
+
+        # Test
+        assert channel.full()
+        assert put_count == 0
+        assert channel.subscribe(1).get_many(CHANNEL_CAPACITY, 0.0) == [1, 2, 3, CHANNEL_CAPACITY]
+        channel.close()
+        channel.unlink()
+
+    def test_drop_oldest(self) -> None:
+        """
+        Slow subscriber continues from the oldest item still held.
+        """
+        # Setup
+        channel = create_channel(broadcast_channel.LagPolicy.DROP_OLDEST)
+        subscriber = channel.subscribe(0)
+
+        # Run
+        channel.put_many(list(range(CHANNEL_CAPACITY + 2)))
+
+        # Test
+        assert subscriber.full()
+        assert subscriber.get_many(CHANNEL_CAPACITY + 2, 0.0) == list(
+            range(2, CHANNEL_CAPACITY + 2)
+        )
+        assert subscriber.get_dropped_count() == 2
+        channel.close()
+        channel.unlink()
+
+    def test_skip_to_latest(self) -> None:
+        """
+        Slow subscriber only gets the newest item.
+        """
+        # Setup
+        channel = create_channel(broadcast_channel.LagPolicy.SKIP_TO_LATEST)
+        subscriber = channel.subscribe(0)
+
+        # Run
+        channel.put_many(list(range(CHANNEL_CAPACITY + 2)))
+
+        # Test
+        assert subscriber.get_many(CHANNEL_CAPACITY + 2, 0.0) == [CHANNEL_CAPACITY + 1]
+        assert subscriber.get_dropped_count() == CHANNEL_CAPACITY + 1
+        channel.close()
+        channel.unlink()
+
+    def test_discard(self) -> None:
+        """
+        Discarding unblocks the producer without counting as dropped.
+        """
+        # Setup
+        channel = create_channel(broadcast_channel.LagPolicy.BLOCK)
+        channel.put_many(list(range(CHANNEL_CAPACITY)))
+
+        # Run
+        discarded_count = channel.discard()
+        channel.put_nowait(None)
+
+        # Test
+        assert discarded_count == CHANNEL_CAPACITY
+        assert channel.subscribe(0).get_nowait() is None
+        assert channel.subscribe(1).get_dropped_count() == 0
+        channel.close()
+        channel.unlink()
@@ -0,0 +1,247 @@
+"""
+Test deciding commands from telemetry.
+"""
+
+import math
+import time
+
+import pytest
+from pymavlink import mavutil
+
+# Logger is a submodule
+logger = pytest.importorskip("modules.common.modules.logger.logger")
+
+# pylint: disable=wrong-import-position
+from modules.command import command
+from modules.mavlink_router import routed_connection
+from modules.telemetry import telemetry
+from utilities.workers import queue_proxy_wrapper
+
+# pylint: enable=wrong-import-position
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+TARGET = command.Position(10, 20, 30)
+# At least the batch size decided in NumPy
+VEHICLE_COUNT = 20
+MISSING_INDICES = {0, 7, 21}
+# Turning towards the target, which is about 63 degrees from the origin
+TURN_YAWS = [math.radians(degrees) for degrees in range(0, 50, 2)]
+SAMPLE_PERIOD = 100  # ms
+
+
+def create_queue() -> queue_proxy_wrapper.QueueProxyWrapper:
+    """
+    Unbounded queue in process.
+    """
+    return queue_proxy_wrapper.QueueProxyWrapper(
+        None, 0, queue_proxy_wrapper.QueueBackend.IN_PROCESS
+    )
+
+
+def create_command(
+    ack_queue: "queue_proxy_wrapper.QueueProxyWrapper | None" = None,
+    outbound_queue: "queue_proxy_wrapper.QueueProxyWrapper | None" = None,
+) -> command.Command:
+    """
+    Creates a command on the queues, by default one that sends into an unread queue.
+    """
+    if outbound_queue is None:
+        outbound_queue = create_queue()
+
+    connection = routed_connection.RoutedConnection(ack_queue, outbound_queue)
+
+    result, local_logger = logger.Logger.create("test_command", False)
+    assert result
+    assert local_logger is not None
+
+    result, command_instance = command.Command.create(connection, TARGET, local_logger)
+    assert result
+    assert command_instance is not None
+
+    return command_instance
+
+
+def create_batch() -> "list[telemetry.TelemetryData | None]":
+    """
+    Telemetry of each vehicle away from the target, with None mixed in.
+    """
+    batch = [
+        telemetry.TelemetryData(
+            1000,
+            float(i),
+            0.0,
+            float(i % 5),
+            0.0,
+            0.0,
+            0.0,
+            0.0,
+            0.0,
+            0.1 * i,
+            0.0,
+            0.0,
+            0.0,
+            system_id=i + 1,
+        )
+        for i in range(VEHICLE_COUNT)
+    ]
+    for index in sorted(MISSING_INDICES):
+        batch.insert(index, None)
+
+    return batch
+
+
+def describe(actions: "list[list[command.Action]]") -> "list[list[tuple]]":
+    """
+    Type, vehicle and amount of each action.
+    """
+    return [
+        [(action.action_type, action.system_id, round(action.amount, 6)) for action in vehicle]
+        for vehicle in actions
+    ]
+
+
+class TestRunMany:
+    """
+    Batches are decided the same as one at a time.
+    """
+
+    def test_missing_telemetry(self) -> None:
+        """
+        None in a large batch gets no actions and does not stop the rest.
+        """
+        # Setup
+        batch = create_batch()
+
+        # Run
+        actions = create_command().run_many(batch)
+        expected_actions = [create_command().run(current_telemetry) for current_telemetry in batch]
+
+        # Test
+        assert len(actions) == len(batch)
+        assert all(len(actions[index]) == 0 for index in MISSING_INDICES)
+        assert describe(actions) == describe(expected_actions)
+
+    def test_small_batch(self) -> None:
+        """
+        Batch below the NumPy batch size with None is decided one at a time.
+        """
+        # Setup
+        batch = create_batch()[:4]
+
+        # Run
+        actions = create_command().run_many(batch)
+
+        # Test
+        assert len(actions[0]) == 0
+        assert all(len(vehicle_actions) > 0 for vehicle_actions in actions[1:])
+
+
+def at_target_altitude(
+    time_since_boot: int, x: float, y: float, yaw: float
+) -> telemetry.TelemetryData:
+    """
+    Telemetry of the vehicle at the height of the target.
+    """
+    return telemetry.TelemetryData(
+        time_since_boot, x, y, TARGET.z, 0.0, 0.0, 0.0, 0.0, 0.0, yaw, 0.0, 0.0, 0.0, system_id=1
+    )
+
+
+def count_yaws_sent(outbound_queue: queue_proxy_wrapper.QueueProxyWrapper) -> int:
+    """
+    Number of MAV_CMD_CONDITION_YAW sent since the last call.
+    """
+    parser = mavutil.mavlink.MAVLink(None)
+    return sum(
+        1
+        for buffer in outbound_queue.get_many(100, 0.0)
+        for message in parser.parse_buffer(buffer) or []
+        if message.command == mavutil.mavlink.MAV_CMD_CONDITION_YAW
+    )
+
+
+def acknowledge_yaw(ack_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+    """
+    Receives the acceptance of the yaw from the vehicle.
+    """
+    vehicle = mavutil.mavlink.MAVLink(None, srcSystem=1)
+    message = vehicle.command_ack_encode(
+        mavutil.mavlink.MAV_CMD_CONDITION_YAW, mavutil.mavlink.MAV_RESULT_ACCEPTED
+    )
+    # Sets the header with the system ID
+    message.pack(vehicle)
+    ack_queue.queue.put(message)
+
+
+class TestYaw:
+    """
+    Relative yaw is not sent again while the vehicle turns to the same heading.
+    """
+
+    def test_turning(self) -> None:
+        """
+        Yaw shrinking as the vehicle turns is sent once, before and after the acknowledgement.
+        """
+        # Setup
+        ack_queue = create_queue()
+        outbound_queue = create_queue()
+        command_instance = create_command(ack_queue, outbound_queue)
+        half = len(TURN_YAWS) // 2
+
+        # Run
+        for tick, yaw in enumerate(TURN_YAWS[:half]):
+            actions = command_instance.run(at_target_altitude(tick * SAMPLE_PERIOD, 0.0, 0.0, yaw))
+            assert [action.action_type for action in actions] == [command.ActionType.CHANGE_YAW]
+
+        sent_before_ack = count_yaws_sent(outbound_queue)
+        acknowledge_yaw(ack_queue)
+        command_instance.run_sender()
+        for tick, yaw in enumerate(TURN_YAWS[half:], half):
+            command_instance.run(at_target_altitude(tick * SAMPLE_PERIOD, 0.0, 0.0, yaw))
+
+        sent_after_ack = count_yaws_sent(outbound_queue)
+
+        # Test
+        assert sent_before_ack == 1
+        assert sent_after_ack == 0
+
+    def test_timeout(self) -> None:
+        """
+        Unacknowledged yaw is sent again once per timeout, not per sample.
+        """
+        # Setup
+        outbound_queue = create_queue()
+        command_instance = create_command(create_queue(), outbound_queue)
+        timeout = command_instance._Command__ACK_TIMEOUT
+
+        # Run
+        for tick, yaw in enumerate(TURN_YAWS):
+            command_instance.run(at_target_altitude(tick * SAMPLE_PERIOD, 0.0, 0.0, yaw))
+
+        command_instance.sender.run(time.monotonic() + timeout * 1.5)
+        sent_count = count_yaws_sent(outbound_queue)
+
+        # Test
+        assert sent_count == 2
+
+    def test_new_heading(self) -> None:
+        """
+        Heading moving by more than the yaw tolerance sends the yaw again.
+        """
+        # Setup
+        outbound_queue = create_queue()
+        command_instance = create_command(create_queue(), outbound_queue)
+
+        # Run
+        command_instance.run(at_target_altitude(0, 0.0, 0.0, 0.0))
+        # Target is now at 45 degrees
+        command_instance.run(at_target_altitude(SAMPLE_PERIOD, 0.0, 10.0, math.radians(10.0)))
+        sent_count = count_yaws_sent(outbound_queue)
+
+        # Test
+        assert sent_count == 2
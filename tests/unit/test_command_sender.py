@@ -0,0 +1,241 @@
+"""
+Test sending commands with acknowledgements.
+"""
+
+import pytest
+from pymavlink import mavutil
+
+from modules.command import command_sender
+from modules.mavlink_router import routed_connection
+from utilities.workers import queue_proxy_wrapper
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+ACK_TIMEOUT = 1.0  # seconds
+MAX_RETRIES = 2
+COMMAND = mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT
+PARAMS = (1, 0, 0, 0, 0, 0, 30)
+
+
+class Link:
+    """
+    Both ends of a routed connection.
+    """
+
+    def __init__(self) -> None:
+        self.ack_queue = queue_proxy_wrapper.QueueProxyWrapper(
+            None, 0, queue_proxy_wrapper.QueueBackend.IN_PROCESS
+        )
+        self.outbound_queue = queue_proxy_wrapper.QueueProxyWrapper(
+            None, 0, queue_proxy_wrapper.QueueBackend.IN_PROCESS
+        )
+        self.connection = routed_connection.RoutedConnection(self.ack_queue, self.outbound_queue)
+        self.__parser = mavutil.mavlink.MAVLink(None)
+
+    def ack(self, command: int, result: int, system_id: int = 1) -> None:
+        """
+        Receives a COMMAND_ACK from the vehicle.
+        """
+        vehicle = mavutil.mavlink.MAVLink(None, srcSystem=system_id)
+        message = vehicle.command_ack_encode(command, result)
+        # Sets the header with the system ID
+        message.pack(vehicle)
+        self.ack_queue.queue.put(message)
+
+    def sent(self) -> "list[list[mavutil.mavlink.MAVLink_message]]":
+        """
+        Decodes the messages of each write since the last call.
+        """
+        return [
+            self.__parser.parse_buffer(buffer) or []
+            for buffer in self.outbound_queue.get_many(100, 0.0)
+        ]
+
+
+@pytest.fixture()
+def link() -> Link:  # type: ignore
+    """
+    Routed connection with its queues.
+    """
+    yield Link()  # type: ignore
+
+
+@pytest.fixture()
+def sender(link: Link) -> command_sender.CommandSender:  # type: ignore
+    """
+    Sender on the link.
+    """
+    yield command_sender.CommandSender(link.connection, ACK_TIMEOUT, MAX_RETRIES)  # type: ignore
+
+
+class TestCommandSender:
+    """
+    Deduplication, acknowledgement, and retransmission.
+    """
+
+    def test_duplicate(self, link: Link, sender: command_sender.CommandSender) -> None:
+        """
+        A command in flight is not sent again, one with different parameters replaces it.
+        """
+        # Run
+        is_sent = sender.send(COMMAND, PARAMS, 0.0)
+        is_duplicate_sent = sender.send(COMMAND, PARAMS, 0.1)
+        is_other_sent = sender.send(COMMAND, PARAMS[:-1] + (40,), 0.1)
+
+        # Test
+        assert is_sent
+        assert not is_duplicate_sent
+        assert is_other_sent
+        assert [[message.param7 for message in write] for write in link.sent()] == [[30], [40]]
+        assert sender.get_in_flight_count() == 1
+
+    def test_changing_yaw(self, link: Link, sender: command_sender.CommandSender) -> None:
+        """
+        Yaw that changes every tick keeps only the newest in flight, which is the one retried.
+        """
+        # Setup
+        yaw_command = mavutil.mavlink.MAV_CMD_CONDITION_YAW
+
+        # Run
+        is_sent = [
+            sender.send(yaw_command, (10 - tick, 5, 1, 1, 0, 0, 0), tick * 0.1) for tick in range(5)
+        ]
+        in_flight_count = sender.get_in_flight_count()
+        # Retries are timed from the newest
+        sender.run(ACK_TIMEOUT + 0.1)
+        is_early_retry = len(link.sent()) > 5
+        sender.run(ACK_TIMEOUT + 0.5)
+        retries = link.sent()
+
+        # Test
+        assert is_sent == [True] * 5
+        assert in_flight_count == 1
+        assert not is_early_retry
+        assert [
+            (message.param1, message.confirmation) for write in retries for message in write
+        ] == [(6, 1)]
+
+    def test_ack(self, link: Link, sender: command_sender.CommandSender) -> None:
+        """
+        Acknowledgement completes the command with its ID, which can then be sent again.
+        """
+        # Setup
+        sender.send(COMMAND, PARAMS, 0.0)
+        sender.send(mavutil.mavlink.MAV_CMD_CONDITION_YAW, (10, 5, 1, 1, 0, 0, 0), 0.0)
+        link.ack(COMMAND, mavutil.mavlink.MAV_RESULT_ACCEPTED)
+
+        # Run
+        acknowledged, given_up = sender.run(0.1)
+
+        # Test
+        assert acknowledged == [((1, COMMAND, tuple(map(float, PARAMS))), 0)]
+        assert given_up == []
+        assert sender.get_in_flight_count() == 1
+        assert sender.send(COMMAND, PARAMS, 0.2)
+
+    def test_ack_of_replaced(self, link: Link, sender: command_sender.CommandSender) -> None:
+        """
+        Acknowledgement after a replacement completes the replacement.
+        """
+        # Setup
+        sender.send(COMMAND, PARAMS, 0.0)
+        sender.send(COMMAND, PARAMS[:-1] + (40,), 0.1)
+        link.ack(COMMAND, mavutil.mavlink.MAV_RESULT_ACCEPTED)
+
+        # Run
+        acknowledged, _ = sender.run(0.2)
+
+        # Test
+        assert acknowledged == [((1, COMMAND, tuple(map(float, PARAMS[:-1] + (40,)))), 0)]
+        assert sender.get_in_flight_count() == 0
+
+    def test_unmatched_ack(self, link: Link, sender: command_sender.CommandSender) -> None:
+        """
+        Acknowledgement of a command not in flight is ignored.
+        """
+        # Setup
+        sender.send(COMMAND, PARAMS, 0.0)
+        link.ack(mavutil.mavlink.MAV_CMD_CONDITION_YAW, mavutil.mavlink.MAV_RESULT_ACCEPTED)
+
+        # Run
+        acknowledged, _ = sender.run(0.1)
+
+        # Test
+        assert acknowledged == []
+        assert sender.get_in_flight_count() == 1
+
+    def test_retransmit(self, link: Link, sender: command_sender.CommandSender) -> None:
+        """
+        Command is sent again with increasing confirmation, then given up on.
+        """
+        # Setup
+        sender.send(COMMAND, PARAMS, 0.0)
+
+        # Run
+        results = [sender.run(ACK_TIMEOUT * (i + 1) + 0.1) for i in range(MAX_RETRIES + 1)]
+
+        # Test
+        assert [write[0].confirmation for write in link.sent()] == list(range(MAX_RETRIES + 1))
+        assert results[-1] == ([], [(1, COMMAND, tuple(map(float, PARAMS)))])
+        assert sender.get_in_flight_count() == 0
+
+    def test_in_progress(self, link: Link, sender: command_sender.CommandSender) -> None:
+        """
+        In progress acknowledgement delays retransmission without completing the command.
+        """
+        # Setup
+        sender.send(COMMAND, PARAMS, 0.0)
+        link.ack(COMMAND, mavutil.mavlink.MAV_RESULT_IN_PROGRESS)
+
+        # Run
+        acknowledged, _ = sender.run(ACK_TIMEOUT * 0.9)
+        sender.run(ACK_TIMEOUT * 1.5)
+
+        # Test
+        assert acknowledged == []
+        assert len(link.sent()) == 1
+        assert sender.get_in_flight_count() == 1
+
+    def test_send_many(self, link: Link, sender: command_sender.CommandSender) -> None:
+        """
+        Commands sent together, and sent again together, go in a single write.
+        """
+        # Setup
+        commands = [
+            (COMMAND, PARAMS),
+            (mavutil.mavlink.MAV_CMD_CONDITION_YAW, (10, 5, 1, 1, 0, 0, 0)),
+        ]
+
+        # Run
+        is_sent = sender.send_many(commands + [(COMMAND, PARAMS)], 0.0)
+        sender.run(ACK_TIMEOUT + 0.1)
+
+        # Test
+        writes = link.sent()
+        assert is_sent == [True, True, False]
+        assert [[message.command for message in write] for write in writes] == [
+            [command for command, _ in commands]
+        ] * 2
+        assert [message.confirmation for message in writes[1]] == [1, 1]
+        assert len({message.get_seq() for write in writes for message in write}) == 4
+
+    def test_target_systems(self, link: Link, sender: command_sender.CommandSender) -> None:
+        """
+        The same command to different vehicles is tracked and acknowledged per vehicle.
+        """
+        # Setup
+        is_sent = [sender.send(COMMAND, PARAMS, 0.0, system_id) for system_id in (1, 2)]
+        link.ack(COMMAND, mavutil.mavlink.MAV_RESULT_ACCEPTED, 2)
+
+        # Run
+        acknowledged, _ = sender.run(0.1)
+
+        # Test
+        assert is_sent == [True, True]
+        assert [message.target_system for write in link.sent() for message in write] == [1, 2]
+        assert acknowledged == [((2, COMMAND, tuple(map(float, PARAMS))), 0)]
+        assert sender.get_in_flight_count() == 1
@@ -0,0 +1,137 @@
+"""
+Test deciding commands for 1 vehicle and for many at once.
+"""
+
+import math
+
+import numpy as np
+import pytest
+from pymavlink import mavutil
+
+from modules.command import decision
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+VEHICLE_COUNT = 1000
+TARGET = (10.0, 20.0, 30.0)
+# NumPy's vectorized atan2 may differ from the C library's in the last bit
+AMOUNT_TOLERANCE = 1e-9
+
+
+@pytest.fixture()
+def swarm() -> "tuple[np.ndarray, np.ndarray]":  # type: ignore
+    """
+    Positions and yaws of vehicles spread around the target.
+    """
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(-100.0, 100.0, (VEHICLE_COUNT, 3))
+    yaws = rng.uniform(-math.pi, math.pi, VEHICLE_COUNT)
+    yield positions, yaws  # type: ignore
+
+
+def assert_commands_equal(
+    commands: "list[tuple[int, tuple[float, ...]]]",
+    expected: "list[tuple[int, tuple[float, ...]]]",
+) -> None:
+    """
+    Same commands, directions and parameters, with amounts up to rounding.
+    """
+    assert [command for command, _ in commands] == [command for command, _ in expected]
+    for (_, params), (_, expected_params) in zip(commands, expected):
+        assert params[1:] == expected_params[1:]
+        assert params[0] == pytest.approx(expected_params[0], rel=0.0, abs=AMOUNT_TOLERANCE)
+
+
+class TestDecide:
+    """
+    Decisions for 1 vehicle.
+    """
+
+    def test_at_target(self) -> None:
+        """
+        Vehicle at the target height and facing it needs no commands.
+        """
+        # Run
+        delta_height, delta_yaw, direction = decision.decide(0.0, 0.0, 30.0, 0.0, 10.0, 0.0, 30.0)
+
+        # Test
+        assert len(decision.get_commands(delta_height, delta_yaw, direction, 30.0)) == 0
+
+    def test_turn_and_climb(self) -> None:
+        """
+        Vehicle below and facing away from the target needs both commands.
+        """
+        # Run
+        delta_height, delta_yaw, direction = decision.decide(0.0, 0.0, 20.0, 0.0, 0.0, 10.0, 30.0)
+        commands = decision.get_commands(delta_height, delta_yaw, direction, 30.0)
+
+        # Test
+        assert delta_height == 10.0
+        assert delta_yaw == pytest.approx(90.0)
+        assert [command for command, _ in commands] == [
+            mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT,
+            mavutil.mavlink.MAV_CMD_CONDITION_YAW,
+        ]
+        assert commands[1][1][2] == -1
+
+
+class TestDecideSwarm:
+    """
+    Decisions for many vehicles match the decisions for each.
+    """
+
+    def test_matches_scalar(self, swarm: "tuple[np.ndarray, np.ndarray]") -> None:
+        """
+        Every vehicle gets the same commands as deciding for it alone.
+        """
+        # Setup
+        positions, yaws = swarm
+
+        # Run
+        swarm_decision = decision.decide_swarm(positions, yaws, np.array(TARGET))
+
+        # Test
+        assert len(swarm_decision) == VEHICLE_COUNT
+        for i in range(VEHICLE_COUNT):
+            delta_height, delta_yaw, direction = decision.decide(*positions[i], yaws[i], *TARGET)
+            expected = decision.get_commands(delta_height, delta_yaw, direction, TARGET[2])
+
+            assert swarm_decision.delta_heights[i] == delta_height
+            assert swarm_decision.delta_yaws[i] == pytest.approx(
+                delta_yaw, rel=0.0, abs=AMOUNT_TOLERANCE
+            )
+            assert_commands_equal(swarm_decision.get_commands(i), expected)
+
+    def test_targets_per_vehicle(self, swarm: "tuple[np.ndarray, np.ndarray]") -> None:
+        """
+        Each vehicle can have its own target.
+        """
+        # Setup
+        positions, yaws = swarm
+        targets = positions[::-1].copy()
+
+        # Run
+        swarm_decision = decision.decide_swarm(positions, yaws, targets)
+
+        # Test
+        for i in range(VEHICLE_COUNT):
+            delta_height, delta_yaw, direction = decision.decide(
+                *positions[i], yaws[i], *targets[i]
+            )
+            expected = decision.get_commands(delta_height, delta_yaw, direction, targets[i][2])
+
+            assert_commands_equal(swarm_decision.get_commands(i), expected)
+
+    def test_empty(self) -> None:
+        """
+        No vehicles, no decisions.
+        """
+        # Run
+        swarm_decision = decision.decide_swarm(np.zeros((0, 3)), np.zeros(0), np.array(TARGET))
+
+        # Test
+        assert len(swarm_decision) == 0
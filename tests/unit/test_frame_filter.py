@@ -0,0 +1,95 @@
+"""
+Test MAVLink frame filtering by message ID.
+"""
+
+import pytest
+from pymavlink.dialects.v10 import common as mavlink_v1
+from pymavlink.dialects.v20 import common as mavlink_v2
+
+from modules.mavlink_router import frame_filter
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+def pack_frames(mavlink: object) -> "tuple[bytes, bytes, bytes]":
+    """
+    Packs a HEARTBEAT, ATTITUDE, and SYS_STATUS frame with the dialect.
+    """
+    encoder = mavlink.MAVLink(None, srcSystem=1, srcComponent=0)
+    heartbeat = encoder.heartbeat_encode(
+        mavlink.MAV_TYPE_QUADROTOR, mavlink.MAV_AUTOPILOT_GENERIC, 0, 0, 0
+    ).pack(encoder)
+    attitude = encoder.attitude_encode(100, 0.1, 0.2, 0.3, 0.0, 0.0, 0.0).pack(encoder)
+    sys_status = encoder.sys_status_encode(0, 0, 0, 500, 12000, -1, 80, 0, 0, 0, 0, 0, 0).pack(
+        encoder
+    )
+    return heartbeat, attitude, sys_status
+
+
+@pytest.fixture(params=[mavlink_v1, mavlink_v2], ids=["v1", "v2"])
+def mavlink(request: pytest.FixtureRequest) -> object:  # type: ignore
+    """
+    MAVLink dialect for each protocol version.
+    """
+    yield request.param  # type: ignore
+
+
+class TestMessageIdFilter:
+    """
+    Frame splitting and filtering.
+    """
+
+    def test_filters_by_id(self, mavlink: object) -> None:
+        """
+        Only subscribed frames are passed on, and they still decode.
+        """
+        # Setup
+        heartbeat, attitude, sys_status = pack_frames(mavlink)
+        message_filter = frame_filter.MessageIdFilter(
+            {mavlink.MAVLINK_MSG_ID_HEARTBEAT, mavlink.MAVLINK_MSG_ID_ATTITUDE}
+        )
+        decoder = mavlink.MAVLink(None)
+
+        # Run
+        frames = message_filter.feed(sys_status + heartbeat + sys_status + attitude)
+        messages = [decoder.parse_buffer(frame)[0] for frame in frames]
+
+        # Test
+        assert frames == [heartbeat, attitude]
+        assert [message.get_type() for message in messages] == ["HEARTBEAT", "ATTITUDE"]
+        assert message_filter.get_counts() == (2, 2, 0)
+
+    def test_partial_frames(self, mavlink: object) -> None:
+        """
+        Frames split across reads are reassembled.
+        """
+        # Setup
+        heartbeat, attitude, _ = pack_frames(mavlink)
+        message_filter = frame_filter.MessageIdFilter({mavlink.MAVLINK_MSG_ID_ATTITUDE})
+        data = heartbeat + attitude
+
+        # Run
+        frames = []
+        for i in range(0, len(data), 3):
+            frames.extend(message_filter.feed(data[i : i + 3]))
+
+        # Test
+        assert frames == [attitude]
+
+    def test_discards_junk(self, mavlink: object) -> None:
+        """
+        Bytes before a start marker are discarded and counted.
+        """
+        # Setup
+        _, attitude, _ = pack_frames(mavlink)
+        message_filter = frame_filter.MessageIdFilter({mavlink.MAVLINK_MSG_ID_ATTITUDE})
+
+        # Run
+        frames = message_filter.feed(b"\x00\x01\x02" + attitude)
+
+        # Test
+        assert frames == [attitude]
+        assert message_filter.get_counts() == (1, 0, 3)
@@ -0,0 +1,187 @@
+"""
+Test tracking the connection state of each vehicle from its heartbeats.
+"""
+
+import pytest
+from pymavlink import mavutil
+
+# Logger is a submodule
+pytest.importorskip("modules.common.modules.logger.logger")
+
+# pylint: disable=wrong-import-position
+from modules.heartbeat import heartbeat_receiver
+
+# pylint: enable=wrong-import-position
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+DISCONNECT_MISSED_COUNT = 5
+
+
+class FakeConnection:
+    """
+    Connection whose received heartbeats are set by the test before each run.
+    """
+
+    def __init__(self) -> None:
+        self.messages = []
+
+    def receive_heartbeat(self, system_id: int) -> None:
+        """
+        Queues a HEARTBEAT from the vehicle.
+        """
+        vehicle = mavutil.mavlink.MAVLink(None, srcSystem=system_id)
+        message = vehicle.heartbeat_encode(
+            mavutil.mavlink.MAV_TYPE_QUADROTOR, mavutil.mavlink.MAV_AUTOPILOT_PX4, 0, 0, 0
+        )
+        # Sets the header with the system ID
+        message.pack(vehicle)
+        self.messages.append(message)
+
+    # Same signature as mavutil.mavfile
+    def recv_match(
+        self,
+        type: "str | list[str] | None" = None,  # pylint: disable=redefined-builtin,unused-argument
+        blocking: bool = False,  # pylint: disable=unused-argument
+        timeout: "float | None" = None,  # pylint: disable=unused-argument
+    ) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Returns the next heartbeat.
+        """
+        if len(self.messages) == 0:
+            return None
+
+        return self.messages.pop(0)
+
+
+class RecordingLogger:
+    """
+    Keeps the warnings logged.
+    """
+
+    def __init__(self) -> None:
+        self.warnings = []
+
+    def info(self, _: str, __: bool = False) -> None:
+        """
+        Ignored.
+        """
+
+    def warning(self, message: str, _: bool = False) -> None:
+        """
+        Keeps the message.
+        """
+        self.warnings.append(message)
+
+
+@pytest.fixture()
+def connection() -> FakeConnection:  # type: ignore
+    """
+    Connection with nothing received.
+    """
+    yield FakeConnection()  # type: ignore
+
+
+@pytest.fixture()
+def recording_logger() -> RecordingLogger:  # type: ignore
+    """
+    Logger with nothing logged.
+    """
+    yield RecordingLogger()  # type: ignore
+
+
+@pytest.fixture()
+def receiver(
+    connection: FakeConnection, recording_logger: RecordingLogger
+) -> heartbeat_receiver.HeartbeatReceiver:  # type: ignore
+    """
+    Receiver on the connection.
+    """
+    result, receiver_instance = heartbeat_receiver.HeartbeatReceiver.create(
+        connection, recording_logger
+    )
+    assert result
+    assert receiver_instance is not None
+
+    yield receiver_instance  # type: ignore
+
+
+class TestHeartbeatReceiver:
+    """
+    Missed heartbeats and disconnects.
+    """
+
+    def test_disconnect_logged_once(
+        self,
+        connection: FakeConnection,
+        recording_logger: RecordingLogger,
+        receiver: heartbeat_receiver.HeartbeatReceiver,
+    ) -> None:
+        """
+        Silent vehicle is warned about until it disconnects, then not again.
+        """
+        # Setup
+        connection.receive_heartbeat(1)
+        receiver.run()
+
+        # Run
+        states = [receiver.run() for _ in range(DISCONNECT_MISSED_COUNT * 3)]
+
+        # Test
+        assert states[DISCONNECT_MISSED_COUNT - 2] == "Connected"
+        assert states[DISCONNECT_MISSED_COUNT - 1] == "Disconnected"
+        assert states[-1] == "Disconnected"
+        assert len(recording_logger.warnings) == DISCONNECT_MISSED_COUNT
+        assert recording_logger.warnings[-1] == "Disconnected from system 1"
+        assert receiver.missed_heartbeats[1] == DISCONNECT_MISSED_COUNT
+
+    def test_reconnect(
+        self,
+        connection: FakeConnection,
+        recording_logger: RecordingLogger,
+        receiver: heartbeat_receiver.HeartbeatReceiver,
+    ) -> None:
+        """
+        Disconnected vehicle heard from again is connected and counted again.
+        """
+        # Setup
+        connection.receive_heartbeat(1)
+        receiver.run()
+        for _ in range(DISCONNECT_MISSED_COUNT * 2):
+            receiver.run()
+
+        # Run
+        connection.receive_heartbeat(1)
+        state = receiver.run()
+        recording_logger.warnings.clear()
+        receiver.run()
+
+        # Test
+        assert state == "Connected"
+        assert recording_logger.warnings == ["Missed Heartbeat from system 1"]
+
+    def test_vehicles_separate(
+        self,
+        connection: FakeConnection,
+        receiver: heartbeat_receiver.HeartbeatReceiver,
+    ) -> None:
+        """
+        A vehicle still heard from keeps the connection up when another disconnects.
+        """
+        # Setup
+        connection.receive_heartbeat(1)
+        connection.receive_heartbeat(2)
+        receiver.run()
+
+        # Run
+        for _ in range(DISCONNECT_MISSED_COUNT):
+            connection.receive_heartbeat(2)
+            state = receiver.run()
+
+        # Test
+        assert state == "Connected"
+        assert receiver.get_states() == {1: "Disconnected", 2: "Connected"}
@@ -0,0 +1,123 @@
+"""
+Test nearest point and radius queries of the k-d tree.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from modules.mission import kd_tree
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+POINT_COUNT = 500
+QUERY_COUNT = 200
+RADIUS = 15.0
+
+
+@pytest.fixture()
+def points() -> np.ndarray:  # type: ignore
+    """
+    Random points with some duplicates.
+    """
+    rng = np.random.default_rng(0)
+    random_points = rng.uniform(-100.0, 100.0, (POINT_COUNT, 3))
+    random_points[-10:] = random_points[:10]
+    yield random_points  # type: ignore
+
+
+@pytest.fixture()
+def queries() -> np.ndarray:  # type: ignore
+    """
+    Random query points, some outside the points.
+    """
+    rng = np.random.default_rng(1)
+    yield rng.uniform(-150.0, 150.0, (QUERY_COUNT, 3))  # type: ignore
+
+
+class TestKdTree:
+    """
+    Queries agree with checking every point.
+    """
+
+    def test_nearest(self, points: np.ndarray, queries: np.ndarray) -> None:
+        """
+        Nearest point is at the smallest distance.
+        """
+        # Setup
+        tree = kd_tree.KdTree(points)
+
+        # Test
+        for query in queries.tolist():
+            distances = np.linalg.norm(points - query, axis=1)
+            index, distance = tree.nearest(query)
+
+            assert distance == pytest.approx(distances.min())
+            assert distances[index] == pytest.approx(distances.min())
+
+    def test_nearest_exact(self, points: np.ndarray) -> None:
+        """
+        Each point is its own nearest.
+        """
+        # Setup
+        tree = kd_tree.KdTree(points)
+
+        # Test
+        for point in points[:-10].tolist():
+            index, distance = tree.nearest(point)
+            assert distance == 0.0
+            assert points[index].tolist() == point
+
+    def test_within(self, points: np.ndarray, queries: np.ndarray) -> None:
+        """
+        Points within the radius are exactly those found.
+        """
+        # Setup
+        tree = kd_tree.KdTree(points)
+
+        # Test
+        for query in queries.tolist():
+            distances = np.linalg.norm(points - query, axis=1)
+            expected = np.flatnonzero(distances <= RADIUS).tolist()
+
+            assert sorted(tree.within(query, RADIUS)) == expected
+
+    def test_single_point(self) -> None:
+        """
+        Tree of 1 point.
+        """
+        # Setup
+        tree = kd_tree.KdTree(np.array([[1.0, 2.0, 3.0]]))
+
+        # Test
+        assert len(tree) == 1
+        assert tree.nearest((1.0, 2.0, 5.0)) == (0, 2.0)
+        assert len(tree.within((1.0, 2.0, 5.0), 1.0)) == 0
+        assert tree.within((1.0, 2.0, 5.0), 2.0) == [0]
+
+    def test_collinear(self) -> None:
+        """
+        Points on a line, with no spread along the other axes.
+        """
+        # Setup
+        line = np.array([[float(i), 0.0, 0.0] for i in range(100)])
+        tree = kd_tree.KdTree(line)
+
+        # Test
+        assert tree.nearest((41.4, 3.0, 4.0)) == (41, pytest.approx(math.hypot(0.4, 5.0)))
+        assert sorted(tree.within((50.0, 0.0, 0.0), 2.0)) == [48, 49, 50, 51, 52]
+
+    def test_invalid(self) -> None:
+        """
+        There must be points.
+        """
+        with pytest.raises(ValueError):
+            kd_tree.KdTree(np.zeros((0, 3)))
+
+        with pytest.raises(ValueError):
+            kd_tree.KdTree(np.zeros(3))
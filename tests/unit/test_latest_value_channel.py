@@ -0,0 +1,128 @@
+"""
+Test the latest value channel.
+"""
+
+import multiprocessing as mp
+import queue
+import threading
+
+import pytest
+
+from utilities.workers import latest_value_channel
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+SLOT_SIZE = 256  # bytes
+WRITE_TIME = 0.05  # seconds
+
+
+@pytest.fixture()
+def channel() -> latest_value_channel.LatestValueChannel:  # type: ignore
+    """
+    Creates a latest value channel.
+    """
+    latest_channel = latest_value_channel.LatestValueChannel(SLOT_SIZE)
+    yield latest_channel  # type: ignore
+    latest_channel.close()
+    latest_channel.unlink()
+
+
+def writer(channel: latest_value_channel.LatestValueChannel, count: int) -> None:
+    """
+    Puts integers into the channel.
+    """
+    for i in range(1, count + 1):
+        channel.put(i)
+
+
+class TestLatestValueChannel:
+    """
+    Conflation and sequencing.
+    """
+
+    def test_initial(self, channel: latest_value_channel.LatestValueChannel) -> None:
+        """
+        Nothing to read before the first put.
+        """
+        assert channel.read() == (0, None)
+        assert channel.empty()
+        with pytest.raises(queue.Empty):
+            channel.get_nowait()
+
+    def test_conflates(self, channel: latest_value_channel.LatestValueChannel) -> None:
+        """
+        Only the newest value is returned, and only once.
+        """
+        # Setup
+        channel.put("old")
+        channel.put("new")
+
+        # Run
+        actual = channel.get_many(10, timeout=0.0)
+
+        # Test
+        assert actual == ["new"]
+        assert channel.get_sequence() == 2
+        assert channel.get_many(10, timeout=0.0) == []
+
+    def test_wait_newer(self, channel: latest_value_channel.LatestValueChannel) -> None:
+        """
+        Waiting for a newer sequence returns immediately if there is one, otherwise times out.
+        """
+        # Setup
+        channel.put(3.0)
+
+        # Run
+        result_newer, sequence, value = channel.wait_newer(0, timeout=0.0)
+        result_same, _, _ = channel.wait_newer(sequence, timeout=0.01)
+
+        # Test
+        assert result_newer
+        assert sequence == 1
+        assert value == 3.0
+        assert not result_same
+
+    def test_across_processes(self, channel: latest_value_channel.LatestValueChannel) -> None:
+        """
+        Reader in this process ends on the last value written by another process.
+        """
+        # Setup
+        count = 200
+        worker = mp.Process(target=writer, args=(channel, count))
+
+        # Run
+        worker.start()
+        worker.join()
+        _, sequence, value = channel.wait_newer(0, timeout=5.0)
+
+        # Test
+        assert sequence == count
+        assert value == count
+
+    def test_read_during_write(self, channel: latest_value_channel.LatestValueChannel) -> None:
+        """
+        Read waits for a write in progress to finish.
+        """
+        # Setup
+        channel.put("old")
+        header_format = channel._LatestValueChannel__HEADER_FORMAT
+        buffer = channel._LatestValueChannel__shared_memory.buf
+        write_sequence, length = header_format.unpack_from(buffer, 0)
+        # Odd sequence number marks a write in progress
+        header_format.pack_into(buffer, 0, write_sequence + 1, length)
+        write_end = threading.Timer(
+            WRITE_TIME, header_format.pack_into, (buffer, 0, write_sequence + 2, length)
+        )
+
+        # Run
+        write_end.start()
+        sequence, value = channel.read()
+        write_end.join()
+
+        # Test
+        assert sequence == 2
+        assert value == "old"
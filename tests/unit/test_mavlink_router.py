@@ -0,0 +1,325 @@
+"""
+Test routing received messages to subscriber queues.
+"""
+
+import pytest
+from pymavlink import mavutil
+
+# Logger is a submodule
+logger = pytest.importorskip("modules.common.modules.logger.logger")
+
+# pylint: disable=wrong-import-position
+from modules.mavlink_router import mavlink_router
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import sharded_queue
+
+# pylint: enable=wrong-import-position
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+QUEUE_MAX_SIZE = 16
+SHARD_COUNT = 4
+MAX_RUNS = 8
+
+
+class FakeConnection:
+    """
+    Connection that receives the given frames in order, 1 per read, and keeps what is written.
+    """
+
+    def __init__(self, frames: "list[bytes]") -> None:
+        self.frames = list(frames)
+        self.written = []
+        self.mav = mavutil.mavlink.MAVLink(None)
+
+    # Same signature as mavutil.mavfile
+    def recv_match(
+        self,
+        type: "str | list[str] | None" = None,  # pylint: disable=redefined-builtin,unused-argument
+        blocking: bool = False,  # pylint: disable=unused-argument
+        timeout: "float | None" = None,  # pylint: disable=unused-argument
+    ) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Decodes the next frame.
+        """
+        if len(self.frames) == 0:
+            return None
+
+        return self.mav.parse_buffer(self.frames.pop(0))[0]
+
+    def select(self, _: float) -> bool:
+        """
+        Whether there is a frame to read.
+        """
+        return len(self.frames) > 0
+
+    def recv(self, _: int) -> bytes:
+        """
+        Reads the next frame.
+        """
+        return self.frames.pop(0)
+
+    def post_message(self, _: mavutil.mavlink.MAVLink_message) -> None:
+        """
+        No bookkeeping.
+        """
+
+    def write(self, buffer: bytes) -> None:
+        """
+        Keeps the written bytes.
+        """
+        self.written.append(buffer)
+
+
+def pack(message: mavutil.mavlink.MAVLink_message, system_id: int = 1) -> bytes:
+    """
+    Packs the message as sent by the vehicle.
+    """
+    return message.pack(mavutil.mavlink.MAVLink(None, srcSystem=system_id))
+
+
+def heartbeat_frame(system_id: int = 1) -> bytes:
+    """
+    HEARTBEAT from the vehicle.
+    """
+    return pack(
+        mavutil.mavlink.MAVLink_heartbeat_message(
+            mavutil.mavlink.MAV_TYPE_QUADROTOR, mavutil.mavlink.MAV_AUTOPILOT_PX4, 0, 0, 0, 3
+        ),
+        system_id,
+    )
+
+
+def attitude_frame(time_boot_ms: int) -> bytes:
+    """
+    ATTITUDE from the vehicle.
+    """
+    return pack(
+        mavutil.mavlink.MAVLink_attitude_message(time_boot_ms, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0)
+    )
+
+
+def status_frame() -> bytes:
+    """
+    SYS_STATUS from the vehicle, never subscribed to.
+    """
+    return pack(mavutil.mavlink.MAVLink_sys_status_message(0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0))
+
+
+def create_queue(maxsize: int = QUEUE_MAX_SIZE) -> queue_proxy_wrapper.QueueProxyWrapper:
+    """
+    Subscriber queue in process.
+    """
+    return queue_proxy_wrapper.QueueProxyWrapper(
+        None, maxsize, queue_proxy_wrapper.QueueBackend.IN_PROCESS
+    )
+
+
+def create_router(
+    connection: FakeConnection,
+    routes: "dict[str, list[queue_proxy_wrapper.QueueProxyWrapper | sharded_queue.ShardedQueue]]",
+    is_filtered: bool,
+) -> mavlink_router.MavlinkRouter:
+    """
+    Router of the connection.
+    """
+    result, local_logger = logger.Logger.create("test_mavlink_router", False)
+    assert result
+    assert local_logger is not None
+
+    result, router = mavlink_router.MavlinkRouter.create(
+        connection, routes, is_filtered, local_logger
+    )
+    assert result
+    assert router is not None
+
+    return router
+
+
+def run_until_empty(router: mavlink_router.MavlinkRouter, connection: FakeConnection) -> None:
+    """
+    Runs the router until every frame is received.
+    """
+    for _ in range(MAX_RUNS):
+        if len(connection.frames) == 0:
+            return
+
+        router.run()
+
+    assert len(connection.frames) == 0
+
+
+def get_types(subscriber_queue: queue_proxy_wrapper.QueueProxyWrapper) -> "list[str]":
+    """
+    Types of the messages in the queue, in order.
+    """
+    return [message.get_type() for message in subscriber_queue.get_many(QUEUE_MAX_SIZE, 0.0)]
+
+
+@pytest.mark.parametrize("is_filtered", [False, True])
+class TestRun:
+    """
+    Messages are put into the queues subscribed to their type, in both modes.
+    """
+
+    def test_routing(self, is_filtered: bool) -> None:
+        """
+        Each type goes to its own subscribers in arrival order.
+        """
+        # Setup
+        heartbeat_queue = create_queue()
+        attitude_queue = create_queue()
+        connection = FakeConnection([attitude_frame(1), heartbeat_frame(), attitude_frame(2)])
+        router = create_router(
+            connection, {"HEARTBEAT": [heartbeat_queue], "ATTITUDE": [attitude_queue]}, is_filtered
+        )
+
+        # Run
+        run_until_empty(router, connection)
+        attitudes = attitude_queue.get_many(QUEUE_MAX_SIZE, 0.0)
+
+        # Test
+        assert get_types(heartbeat_queue) == ["HEARTBEAT"]
+        assert [attitude.time_boot_ms for attitude in attitudes] == [1, 2]
+        assert router.get_counts()["routed"] == 3
+
+    def test_fan_out(self, is_filtered: bool) -> None:
+        """
+        Message goes to every subscriber of its type.
+        """
+        # Setup
+        subscriber_queues = [create_queue(), create_queue()]
+        connection = FakeConnection([heartbeat_frame()])
+        router = create_router(connection, {"HEARTBEAT": subscriber_queues}, is_filtered)
+
+        # Run
+        run_until_empty(router, connection)
+
+        # Test
+        assert all(
+            get_types(subscriber_queue) == ["HEARTBEAT"] for subscriber_queue in subscriber_queues
+        )
+        assert router.get_counts()["routed"] == 2
+
+    def test_unsubscribed(self, is_filtered: bool) -> None:
+        """
+        Unsubscribed types are not routed, and not decoded when filtered.
+        """
+        # Setup
+        heartbeat_queue = create_queue()
+        connection = FakeConnection([status_frame(), heartbeat_frame()])
+        router = create_router(connection, {"HEARTBEAT": [heartbeat_queue]}, is_filtered)
+
+        # Run
+        run_until_empty(router, connection)
+        counts = router.get_counts()
+
+        # Test
+        assert get_types(heartbeat_queue) == ["HEARTBEAT"]
+        if is_filtered:
+            assert counts["decoded"] == 1
+            assert counts["skipped"] == 1
+        else:
+            assert counts["decoded"] == 2
+
+    def test_sharded(self, is_filtered: bool) -> None:
+        """
+        Message goes to the shard of the vehicle that sent it.
+        """
+        # Setup
+        shards = [create_queue() for _ in range(SHARD_COUNT)]
+        vehicle_queue = sharded_queue.ShardedQueue(shards)
+        system_ids = [1, 2, 3, 1]
+        connection = FakeConnection([heartbeat_frame(system_id) for system_id in system_ids])
+        router = create_router(connection, {"HEARTBEAT": [vehicle_queue]}, is_filtered)
+
+        # Run
+        run_until_empty(router, connection)
+
+        # Test
+        for index, shard in enumerate(shards):
+            expected_system_ids = [
+                system_id
+                for system_id in system_ids
+                if vehicle_queue.get_shard_index(system_id) == index
+            ]
+            received_system_ids = [
+                message.get_srcSystem() for message in shard.get_many(QUEUE_MAX_SIZE, 0.0)
+            ]
+            assert received_system_ids == expected_system_ids
+
+    def test_full_subscriber(self, is_filtered: bool) -> None:
+        """
+        Full subscriber queue drops the message without blocking the other subscribers.
+        """
+        # Setup
+        full_queue = create_queue(1)
+        subscriber_queue = create_queue()
+        connection = FakeConnection([heartbeat_frame(), heartbeat_frame()])
+        router = create_router(
+            connection, {"HEARTBEAT": [full_queue, subscriber_queue]}, is_filtered
+        )
+
+        # Run
+        run_until_empty(router, connection)
+        counts = router.get_counts()
+
+        # Test
+        assert len(get_types(full_queue)) == 1
+        assert len(get_types(subscriber_queue)) == 2
+        assert counts["routed"] == 3
+        assert counts["dropped"] == 1
+
+
+class TestRouter:
+    """
+    Creating the router and sending.
+    """
+
+    def test_send(self) -> None:
+        """
+        Outbound buffers are written in a single write.
+        """
+        # Setup
+        connection = FakeConnection([])
+        router = create_router(connection, {"HEARTBEAT": [create_queue()]}, False)
+        buffers = [heartbeat_frame(255), heartbeat_frame(255)]
+
+        # Run
+        router.send([])
+        router.send(buffers)
+
+        # Test
+        assert connection.written == [b"".join(buffers)]
+
+    @pytest.mark.parametrize(
+        "routes",
+        [
+            {"HEARTBEAT": []},
+            {"NOT_A_MESSAGE": [create_queue()]},
+        ],
+    )
+    def test_invalid_routes(
+        self,
+        routes: "dict[str, list[queue_proxy_wrapper.QueueProxyWrapper]]",
+    ) -> None:
+        """
+        Every route needs a known type and a subscriber.
+        """
+        # Setup
+        result, local_logger = logger.Logger.create("test_mavlink_router", False)
+        assert result
+        assert local_logger is not None
+
+        # Run
+        result, router = mavlink_router.MavlinkRouter.create(
+            FakeConnection([]), routes, False, local_logger
+        )
+
+        # Test
+        assert not result
+        assert router is None
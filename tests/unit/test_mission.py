@@ -0,0 +1,123 @@
+"""
+Test waypoint missions.
+"""
+
+import pathlib
+
+import pytest
+
+from modules.mission import mission
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+ACCEPTANCE_RADIUS = 2.0
+WAYPOINTS = [(0.0, 0.0, 10.0), (10.0, 0.0, 10.0), (10.0, 10.0, 20.0), (0.0, 10.0, 20.0)]
+
+
+@pytest.fixture()
+def square() -> mission.Mission:  # type: ignore
+    """
+    Mission around a square.
+    """
+    yield mission.Mission(WAYPOINTS, ACCEPTANCE_RADIUS)  # type: ignore
+
+
+class TestMission:
+    """
+    Waypoints are flown in order.
+    """
+
+    def test_not_reached(self, square: mission.Mission) -> None:
+        """
+        Vehicle keeps flying to a waypoint outside its acceptance radius.
+        """
+        assert square.get_next_target(1, (5.0, 0.0, 10.0)) == 1
+
+    def test_reached(self, square: mission.Mission) -> None:
+        """
+        Vehicle within the acceptance radius flies to the next waypoint.
+        """
+        assert square.get_next_target(1, (9.0, 1.0, 10.0)) == 2
+
+    def test_hold_last(self, square: mission.Mission) -> None:
+        """
+        Last waypoint is held once reached.
+        """
+        assert square.get_next_target(3, WAYPOINTS[3]) == 3
+
+    def test_start_first(self, square: mission.Mission) -> None:
+        """
+        Vehicle without progress starts at the first waypoint, wherever it is.
+        """
+        assert square.get_next_target(None, (12.0, 12.0, 25.0)) == 0
+
+    def test_start_first_reached(self, square: mission.Mission) -> None:
+        """
+        Vehicle without progress that is already at the first waypoint flies to the next.
+        """
+        assert square.get_next_target(None, WAYPOINTS[0]) == 1
+
+    def test_resume_nearest(self, square: mission.Mission) -> None:
+        """
+        Resuming vehicle without progress starts at the nearest waypoint.
+        """
+        # Run
+        index = square.get_next_target(None, (12.0, 12.0, 25.0), True)
+
+        # Test
+        assert square.get_nearest((12.0, 12.0, 25.0))[0] == 2
+        assert index == 2
+
+    def test_skip_only_in_order(self) -> None:
+        """
+        Reaching a later waypoint does not skip the one being flown to.
+        """
+        # Setup
+        overlapping = mission.Mission(WAYPOINTS + [(1.0, 0.0, 10.0)], ACCEPTANCE_RADIUS)
+
+        # Test
+        assert overlapping.get_next_target(1, (0.5, 0.0, 10.0)) == 1
+        assert overlapping.get_next_target(3, WAYPOINTS[3]) == 4
+
+    def test_accepted(self, square: mission.Mission) -> None:
+        """
+        Waypoints containing the position, in flying order.
+        """
+        # Setup
+        overlapping = mission.Mission(WAYPOINTS + [(1.0, 0.0, 10.0)], ACCEPTANCE_RADIUS)
+
+        # Test
+        assert len(square.get_accepted((5.0, 5.0, 15.0))) == 0
+        assert overlapping.get_accepted((0.5, 0.0, 10.0)) == [0, 4]
+
+    def test_load(self, tmp_path: pathlib.Path) -> None:
+        """
+        Waypoints are read from CSV lines.
+        """
+        # Setup
+        path = tmp_path / "mission.csv"
+        path.write_text("# x,y,z\n" + "\n".join(",".join(map(str, w)) for w in WAYPOINTS))
+
+        # Run
+        loaded = mission.Mission.load(str(path), ACCEPTANCE_RADIUS)
+
+        # Test
+        assert len(loaded) == len(WAYPOINTS)
+        assert [loaded.get_waypoint(i) for i in range(len(loaded))] == WAYPOINTS
+
+    def test_invalid(self) -> None:
+        """
+        Waypoints must be 3D and the acceptance radius positive.
+        """
+        with pytest.raises(ValueError):
+            mission.Mission([], ACCEPTANCE_RADIUS)
+
+        with pytest.raises(ValueError):
+            mission.Mission([(0.0, 0.0)], ACCEPTANCE_RADIUS)
+
+        with pytest.raises(ValueError):
+            mission.Mission(WAYPOINTS, 0.0)
@@ -0,0 +1,290 @@
+"""
+Test building queues and workers from a topology.
+"""
+
+import multiprocessing as mp
+
+import pytest
+
+# Logger is a submodule
+logger = pytest.importorskip("modules.common.modules.logger.logger")
+
+# pylint: disable=wrong-import-position
+from utilities.workers import pipeline
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import sharded_queue
+from utilities.workers import worker_controller
+
+# pylint: enable=wrong-import-position
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+STOP_TIMEOUT = 0.1  # seconds
+
+
+@pytest.fixture(scope="module")
+def mp_manager() -> mp.managers.SyncManager:  # type: ignore
+    """
+    Manager for queues with the manager backend.
+    """
+    manager = mp.Manager()
+    yield manager  # type: ignore
+    manager.shutdown()
+
+
+@pytest.fixture()
+def local_logger() -> logger.Logger:  # type: ignore
+    """
+    Logger for the pipeline.
+    """
+    result, test_logger = logger.Logger.create("test_pipeline", False)
+    assert result
+    assert test_logger is not None
+
+    yield test_logger  # type: ignore
+
+
+def create_topology() -> "dict":
+    """
+    Valid topology: a stage producing into a broadcast queue read by 2 stages, one of which
+    has a sharded input, and a queue between thread stages.
+    """
+    return {
+        "queues": {
+            "raw": {"backend": "SHARED_MEMORY", "maxsize": 8},
+            "samples": {"backend": "BROADCAST", "maxsize": 8},
+            "keyed": {"backend": "SHARED_MEMORY", "shards": 2},
+            "threads": None,
+            "external": None,
+        },
+        "stages": {
+            "source": {"count": 1, "input_queues": ["raw"], "output_queues": ["samples"]},
+            "sink": {"count": 2, "max_count": 3, "input_queues": ["samples"]},
+            "keyed_sink": {"count": 2, "input_queues": ["samples", "keyed"]},
+            "thread_source": {"count": 1, "backend": "THREAD", "output_queues": ["threads"]},
+            "thread_sink": {"count": 1, "backend": "THREAD", "input_queues": ["threads"]},
+        },
+    }
+
+
+def create_pipeline(
+    topology: "dict",
+    mp_manager: mp.managers.SyncManager,
+    local_logger: logger.Logger,
+) -> "tuple[bool, pipeline.Pipeline | None]":
+    """
+    Creates the pipeline, stopping it if created so that its queues are freed.
+    """
+    result, test_pipeline = pipeline.Pipeline.create(
+        topology, mp_manager, worker_controller.WorkerController(), local_logger
+    )
+    if test_pipeline is not None:
+        test_pipeline.stop(STOP_TIMEOUT)
+
+    return result, test_pipeline
+
+
+class TestCreate:
+    """
+    Valid topology creates its queues.
+    """
+
+    def test_queues(self, mp_manager: mp.managers.SyncManager, local_logger: logger.Logger) -> None:
+        """
+        Every queue is created with its backend, and broadcast queues have a subscriber per
+        consuming stage.
+        """
+        # Run
+        result, test_pipeline = pipeline.Pipeline.create(
+            create_topology(), mp_manager, worker_controller.WorkerController(), local_logger
+        )
+
+        # Test
+        assert result
+        assert test_pipeline is not None
+
+        raw_queue = test_pipeline.get_queue("raw")
+        samples_queue = test_pipeline.get_queue("samples")
+        keyed_queue = test_pipeline.get_queue("keyed")
+        assert raw_queue.backend == queue_proxy_wrapper.QueueBackend.SHARED_MEMORY
+        assert raw_queue.maxsize == 8
+        assert samples_queue.queue.get_subscriber_count() == 2
+        assert isinstance(keyed_queue, sharded_queue.ShardedQueue)
+        assert len(keyed_queue.get_shards()) == 2
+
+        stage_input_queues = test_pipeline._Pipeline__stage_input_queues
+        assert len(stage_input_queues["sink"]) == 1
+        assert len(stage_input_queues["keyed_sink"]) == 2
+
+        test_pipeline.stop(STOP_TIMEOUT)
+
+    def test_sentinels(
+        self, mp_manager: mp.managers.SyncManager, local_logger: logger.Logger
+    ) -> None:
+        """
+        Default sentinel count is a sentinel for every worker that can block on the queue.
+        """
+        # Run
+        result, test_pipeline = pipeline.Pipeline.create(
+            create_topology(), mp_manager, worker_controller.WorkerController(), local_logger
+        )
+
+        # Test
+        assert result
+        assert test_pipeline is not None
+
+        sentinel_counts = test_pipeline._Pipeline__sentinel_counts
+        assert sentinel_counts["raw"] == 1
+        # Most workers of any subscriber, maximum count for a scaling stage
+        assert sentinel_counts["samples"] == 3
+        # Per shard
+        assert sentinel_counts["keyed"] == 1
+        assert sentinel_counts["external"] == 0
+
+        test_pipeline.stop(STOP_TIMEOUT)
+
+    def test_backend_selection(
+        self, mp_manager: mp.managers.SyncManager, local_logger: logger.Logger
+    ) -> None:
+        """
+        Queue without a backend is in process between thread stages, otherwise a manager queue.
+        """
+        # Run
+        result, test_pipeline = pipeline.Pipeline.create(
+            create_topology(), mp_manager, worker_controller.WorkerController(), local_logger
+        )
+
+        # Test
+        assert result
+        assert test_pipeline is not None
+        assert (
+            test_pipeline.get_queue("threads").backend
+            == queue_proxy_wrapper.QueueBackend.IN_PROCESS
+        )
+        assert (
+            test_pipeline.get_queue("external").backend == queue_proxy_wrapper.QueueBackend.MANAGER
+        )
+
+        test_pipeline.stop(STOP_TIMEOUT)
+
+    def test_stages_mismatch(
+        self, mp_manager: mp.managers.SyncManager, local_logger: logger.Logger
+    ) -> None:
+        """
+        Workers must be given for exactly the stages of the topology.
+        """
+        # Setup
+        result, test_pipeline = pipeline.Pipeline.create(
+            create_topology(), mp_manager, worker_controller.WorkerController(), local_logger
+        )
+        assert result
+        assert test_pipeline is not None
+
+        # Run
+        result = test_pipeline.create_workers({"source": (print, ())})
+
+        # Test
+        assert not result
+
+        test_pipeline.stop(STOP_TIMEOUT)
+
+
+class TestInvalid:
+    """
+    Invalid topology is rejected with the create() failure convention.
+    """
+
+    @pytest.mark.parametrize(
+        "topology",
+        [
+            # Missing stages
+            {"queues": {}},
+            # Stages not a mapping
+            {"queues": {}, "stages": []},
+        ],
+    )
+    def test_topology(
+        self,
+        topology: "dict",
+        mp_manager: mp.managers.SyncManager,
+        local_logger: logger.Logger,
+    ) -> None:
+        """
+        Topology must have exactly queues and stages, as mappings.
+        """
+        # Run
+        result, test_pipeline = create_pipeline(topology, mp_manager, local_logger)
+
+        # Test
+        assert not result
+        assert test_pipeline is None
+
+    @pytest.mark.parametrize(
+        "name, queue_config",
+        [
+            ("unknown_setting", {"colour": "red"}),
+            ("unknown_backend", {"backend": "CARRIER_PIGEON"}),
+            ("negative_maxsize", {"maxsize": -1}),
+            ("negative_sentinels", {"sentinels": -1}),
+            ("no_shards", {"shards": 0}),
+            ("subscribers_not_broadcast", {"subscribers": 2}),
+            ("too_few_subscribers", {"backend": "BROADCAST", "subscribers": 1}),
+            ("unknown_lag_policy", {"backend": "BROADCAST", "lag_policy": "IGNORE"}),
+        ],
+    )
+    def test_queue(
+        self,
+        name: str,
+        queue_config: "dict",
+        mp_manager: mp.managers.SyncManager,
+        local_logger: logger.Logger,
+    ) -> None:
+        """
+        Queue settings must be known and in range.
+        """
+        # Setup
+        topology = create_topology()
+        topology["queues"]["samples"] = queue_config
+
+        # Run
+        result, test_pipeline = create_pipeline(topology, mp_manager, local_logger)
+
+        # Test
+        assert not result, name
+        assert test_pipeline is None
+
+    @pytest.mark.parametrize(
+        "name, stage_config",
+        [
+            ("unknown_setting", {"count": 1, "colour": "red"}),
+            ("missing_count", {}),
+            ("bad_count", {"count": "1"}),
+            ("unknown_backend", {"count": 1, "backend": "FIBER"}),
+            ("queues_not_list", {"count": 1, "input_queues": "raw"}),
+            ("unknown_queue", {"count": 1, "input_queues": ["missing"]}),
+        ],
+    )
+    def test_stage(
+        self,
+        name: str,
+        stage_config: "dict",
+        mp_manager: mp.managers.SyncManager,
+        local_logger: logger.Logger,
+    ) -> None:
+        """
+        Stage settings must be known, with an integer count and known queues.
+        """
+        # Setup
+        topology = create_topology()
+        topology["stages"]["source"] = stage_config
+
+        # Run
+        result, test_pipeline = create_pipeline(topology, mp_manager, local_logger)
+
+        # Test
+        assert not result, name
+        assert test_pipeline is None
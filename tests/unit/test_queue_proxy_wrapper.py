@@ -0,0 +1,172 @@
+"""
+Test closing queues at shutdown.
+"""
+
+import threading
+import time
+
+import pytest
+
+from utilities.workers import queue_proxy_wrapper
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+QUEUE_CAPACITY = 4
+
+
+@pytest.fixture(
+    params=[
+        queue_proxy_wrapper.QueueBackend.IN_PROCESS,
+        queue_proxy_wrapper.QueueBackend.SHARED_MEMORY,
+    ]
+)
+def bounded_queue(request: pytest.FixtureRequest) -> queue_proxy_wrapper.QueueProxyWrapper:  # type: ignore
+    """
+    Bounded queue of each backend that does not need a manager.
+    """
+    wrapper = queue_proxy_wrapper.QueueProxyWrapper(None, QUEUE_CAPACITY, request.param)
+    yield wrapper  # type: ignore
+    wrapper.release()
+
+
+class TestClose:
+    """
+    Close unblocks producers and consumers within the deadline.
+    """
+
+    def test_unbounded_queue(self) -> None:
+        """
+        Every item is discarded regardless of the queue size, then sentinels are put.
+        """
+        # Setup
+        wrapper = queue_proxy_wrapper.QueueProxyWrapper(
+            None, 0, queue_proxy_wrapper.QueueBackend.IN_PROCESS
+        )
+        wrapper.put_many(list(range(1000)))
+
+        # Run
+        discarded_count = wrapper.close(2, time.monotonic() + 1.0)
+
+        # Test
+        assert discarded_count == 1000
+        assert wrapper.get_many(10, 0.0) == [None, None]
+
+    def test_unblocks_producer(self, bounded_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        A producer blocked on a full queue can put.
+        """
+        # Setup
+        bounded_queue.put_many(list(range(QUEUE_CAPACITY)))
+        producer = threading.Thread(target=bounded_queue.queue.put, args=(QUEUE_CAPACITY,))
+        producer.start()
+
+        # Run
+        bounded_queue.close(0, time.monotonic() + 1.0)
+        producer.join(1.0)
+
+        # Test
+        assert not producer.is_alive()
+
+    def test_unblocks_consumer(self, bounded_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        A consumer blocked on an empty queue gets a sentinel.
+        """
+        # Setup
+        items = []
+        consumer = threading.Thread(target=lambda: items.append(bounded_queue.queue.get()))
+        consumer.start()
+
+        # Run
+        bounded_queue.close(1, time.monotonic() + 1.0)
+        consumer.join(1.0)
+
+        # Test
+        assert not consumer.is_alive()
+        assert items == [None]
+
+    def test_deadline(self, bounded_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Sentinels that do not fit by the deadline are skipped.
+        """
+        # Setup
+        start_time = time.monotonic()
+
+        # Run
+        bounded_queue.close(QUEUE_CAPACITY + 1, start_time + 0.1)
+
+        # Test
+        assert time.monotonic() - start_time < 1.0
+        assert bounded_queue.queue.qsize() == QUEUE_CAPACITY
+
+    def test_broadcast(self) -> None:
+        """
+        Every subscriber of the broadcast backend gets every sentinel.
+        """
+        # Setup
+        wrapper = queue_proxy_wrapper.QueueProxyWrapper(
+            None, QUEUE_CAPACITY, queue_proxy_wrapper.QueueBackend.BROADCAST, subscriber_count=2
+        )
+        subscribers = [wrapper.subscribe(0), wrapper.subscribe(1)]
+        wrapper.put_many(list(range(QUEUE_CAPACITY)))
+
+        # Run
+        discarded_count = wrapper.close(1, time.monotonic() + 1.0)
+
+        # Test
+        assert discarded_count == QUEUE_CAPACITY
+        assert [subscriber.get_many(10, 0.0) for subscriber in subscribers] == [[None], [None]]
+        wrapper.release()
+
+
+class TestQsize:
+    """
+    Items waiting, the same for every backend.
+    """
+
+    def test_bounded(self, bounded_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Counts the items put and not yet got.
+        """
+        # Run
+        bounded_queue.put_many([1, 2, 3])
+        bounded_queue.get_many(1, 0.0)
+
+        # Test
+        assert bounded_queue.qsize() == 2
+
+    def test_broadcast(self) -> None:
+        """
+        Subscribers count the items they have not read, the channel the most of any.
+        """
+        # Setup
+        wrapper = queue_proxy_wrapper.QueueProxyWrapper(
+            None, QUEUE_CAPACITY, queue_proxy_wrapper.QueueBackend.BROADCAST, subscriber_count=2
+        )
+        subscribers = [wrapper.subscribe(index) for index in range(2)]
+
+        # Run
+        wrapper.put_many([1, 2, 3])
+        subscribers[0].get_many(2, 0.0)
+
+        # Test
+        assert [subscriber.qsize() for subscriber in subscribers] == [1, 3]
+        assert wrapper.qsize() == 3
+
+        wrapper.release()
+
+
+class TestBackend:
+    """
+    Backend selection.
+    """
+
+    def test_unknown_backend(self) -> None:
+        """
+        Unknown backend is an invalid argument.
+        """
+        with pytest.raises(ValueError):
+            queue_proxy_wrapper.QueueProxyWrapper(None, QUEUE_CAPACITY, "CARRIER_PIGEON")
@@ -0,0 +1,145 @@
+"""
+Test restoring sequence order.
+"""
+
+import pickle
+
+import pytest
+
+from modules.reorder import reorder_buffer
+from modules.reorder import sequenced_item
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+WINDOW = 4
+
+
+@pytest.fixture()
+def buffer() -> reorder_buffer.ReorderBuffer:  # type: ignore
+    """
+    Creates a small reorder buffer.
+    """
+    yield reorder_buffer.ReorderBuffer(WINDOW)  # type: ignore
+
+
+def push_all(buffer: reorder_buffer.ReorderBuffer, sequences: "list[int]") -> "list[int]":
+    """
+    Pushes items with the sequences, returns the sequences released.
+    """
+    released = []
+    for sequence in sequences:
+        items = buffer.push(sequenced_item.SequencedItem(sequence, f"item {sequence}"))
+        released += [item.sequence for item in items]
+
+    return released
+
+
+class TestReorderBuffer:
+    """
+    Items come out in sequence order.
+    """
+
+    def test_in_order(self, buffer: reorder_buffer.ReorderBuffer) -> None:
+        """
+        Items in order pass straight through.
+        """
+        assert push_all(buffer, [0, 1, 2]) == [0, 1, 2]
+        assert buffer.get_max_depth() == 1
+
+    def test_out_of_order(self, buffer: reorder_buffer.ReorderBuffer) -> None:
+        """
+        Items ahead of a missing sequence are held until it arrives.
+        """
+        # Run
+        released = push_all(buffer, [1, 2, 0, 4, 3])
+
+        # Test
+        assert released == [0, 1, 2, 3, 4]
+        assert buffer.get_depth() == 0
+        assert buffer.get_max_depth() == 3
+        assert buffer.get_skipped_count() == 0
+
+    def test_window_full(self, buffer: reorder_buffer.ReorderBuffer) -> None:
+        """
+        Missing sequence is skipped once the window is full, and is late if it arrives after.
+        """
+        # Run
+        released = push_all(buffer, [1, 2, 3, 4])
+        released_full = push_all(buffer, [5])
+        released_late = push_all(buffer, [0])
+
+        # Test
+        assert released == []
+        assert released_full == [1, 2, 3, 4, 5]
+        assert released_late == []
+        assert buffer.get_skipped_count() == 1
+        assert buffer.get_late_count() == 1
+
+    def test_flush(self, buffer: reorder_buffer.ReorderBuffer) -> None:
+        """
+        Flushing releases everything held and skips the gaps.
+        """
+        # Setup
+        push_all(buffer, [3, 1])
+
+        # Run
+        released = [item.sequence for item in buffer.flush()]
+
+        # Test
+        assert released == [1, 3]
+        assert buffer.get_skipped_count() == 2
+
+    def test_duplicate(self, buffer: reorder_buffer.ReorderBuffer) -> None:
+        """
+        A sequence is only released once.
+        """
+        assert push_all(buffer, [1, 1, 0, 0]) == [0, 1]
+        assert buffer.get_late_count() == 2
+
+    def test_first_item(self) -> None:
+        """
+        Without a first sequence, starts from the first item pushed.
+        """
+        # Setup
+        buffer = reorder_buffer.ReorderBuffer(WINDOW, None)
+
+        # Run
+        released = push_all(buffer, [10, 12, 11])
+
+        # Test
+        assert released == [10, 11, 12]
+        assert buffer.get_skipped_count() == 0
+
+    def test_invalid_window(self) -> None:
+        """
+        Window must hold at least 1 item.
+        """
+        with pytest.raises(ValueError):
+            reorder_buffer.ReorderBuffer(0)
+
+
+class TestSequencedItem:
+    """
+    Tagging items.
+    """
+
+    def test_counter(self) -> None:
+        """
+        Sequence numbers are consecutive from 0 .
+        """
+        counter = sequenced_item.SequenceCounter()
+        assert [counter.next() for _ in range(3)] == [0, 1, 2]
+
+    def test_pickle(self) -> None:
+        """
+        Sequence and item survive pickling.
+        """
+        # Run
+        item = pickle.loads(pickle.dumps(sequenced_item.SequencedItem(3, "item")))
+
+        # Test
+        assert (item.sequence, item.item) == (3, "item")
@@ -0,0 +1,162 @@
+"""
+Test the routed connection stand in.
+"""
+
+import pytest
+from pymavlink import mavutil
+
+from modules.mavlink_router import routed_connection
+from utilities.workers import queue_proxy_wrapper
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+QUEUE_MAX_SIZE = 16
+
+
+@pytest.fixture()
+def input_queue() -> queue_proxy_wrapper.QueueProxyWrapper:  # type: ignore
+    """
+    Subscriber queue.
+    """
+    subscriber_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        None, QUEUE_MAX_SIZE, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY
+    )
+    yield subscriber_queue  # type: ignore
+    subscriber_queue.release()
+
+
+@pytest.fixture()
+def outbound_queue() -> queue_proxy_wrapper.QueueProxyWrapper:  # type: ignore
+    """
+    Router outbound queue.
+    """
+    router_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        None, QUEUE_MAX_SIZE, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY
+    )
+    yield router_queue  # type: ignore
+    router_queue.release()
+
+
+def attitude_message(time_boot_ms: int) -> mavutil.mavlink.MAVLink_message:
+    """
+    Creates an ATTITUDE message.
+    """
+    return mavutil.mavlink.MAVLink_attitude_message(time_boot_ms, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0)
+
+
+def position_message(time_boot_ms: int) -> mavutil.mavlink.MAVLink_message:
+    """
+    Creates a LOCAL_POSITION_NED message.
+    """
+    return mavutil.mavlink.MAVLink_local_position_ned_message(
+        time_boot_ms, 1.0, 2.0, 3.0, 0.0, 0.0, 0.0
+    )
+
+
+class TestRoutedConnection:
+    """
+    Receiving from and sending to the router.
+    """
+
+    def test_other_types_kept(self, input_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Message of another type is kept for a later call instead of discarded.
+        """
+        # Setup
+        connection = routed_connection.RoutedConnection(input_queue, None)
+        input_queue.put_many([attitude_message(1), position_message(2)])
+
+        # Run
+        position = connection.recv_match(type="LOCAL_POSITION_NED", blocking=True, timeout=1.0)
+        attitude = connection.recv_match(type="ATTITUDE", blocking=False)
+        nothing = connection.recv_match(type="ATTITUDE", blocking=True, timeout=0.01)
+
+        # Test
+        assert position is not None
+        assert position.time_boot_ms == 2
+        assert attitude is not None
+        assert attitude.time_boot_ms == 1
+        assert nothing is None
+
+    def test_any_type_in_order(self, input_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        No type returns messages in arrival order.
+        """
+        # Setup
+        connection = routed_connection.RoutedConnection(input_queue, None)
+        input_queue.put_many([attitude_message(1), position_message(2)])
+
+        # Run
+        first = connection.recv_match(blocking=True, timeout=1.0)
+        second = connection.recv_match(type=["ATTITUDE", "LOCAL_POSITION_NED"])
+
+        # Test
+        assert first.get_type() == "ATTITUDE"
+        assert second.get_type() == "LOCAL_POSITION_NED"
+
+    def test_send(self, outbound_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Sent messages arrive at the router as packed bytes.
+        """
+        # Setup
+        connection = routed_connection.RoutedConnection(None, outbound_queue)
+        parser = mavutil.mavlink.MAVLink(None)
+
+        # Run
+        connection.mav.heartbeat_send(
+            mavutil.mavlink.MAV_TYPE_GCS, mavutil.mavlink.MAV_AUTOPILOT_INVALID, 0, 0, 0
+        )
+        buffers = outbound_queue.get_many(QUEUE_MAX_SIZE, timeout=1.0)
+        messages = parser.parse_buffer(buffers[0])
+
+        # Test
+        assert len(buffers) == 1
+        assert messages[0].get_type() == "HEARTBEAT"
+        assert messages[0].get_srcSystem() == 255
+
+    def test_sentinel(self, input_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Sentinel ends a blocking wait without a timeout.
+        """
+        # Setup
+        connection = routed_connection.RoutedConnection(input_queue, None)
+        input_queue.put_many([attitude_message(1), None])
+
+        # Run
+        position = connection.recv_match(type="LOCAL_POSITION_NED", blocking=True)
+        attitude = connection.recv_match(type="ATTITUDE", blocking=False)
+
+        # Test
+        assert position is None
+        assert attitude is not None
+
+    def test_backpressure(self, input_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Messages of other types are kept up to the limit, the rest stay in the subscriber
+        queue rather than being dropped.
+        """
+        # Setup
+        max_pending = routed_connection.RoutedConnection._RoutedConnection__MAX_PENDING
+        connection = routed_connection.RoutedConnection(input_queue, None)
+
+        # Run
+        for i in range(max_pending):
+            input_queue.put_many([attitude_message(i)])
+            assert connection.recv_match(type="LOCAL_POSITION_NED") is None
+
+        input_queue.put_many([position_message(max_pending)])
+        position_when_full = connection.recv_match(type="LOCAL_POSITION_NED")
+        depth_when_full = input_queue.qsize()
+        attitudes = [connection.recv_match(type="ATTITUDE") for _ in range(max_pending)]
+        position = connection.recv_match(type="LOCAL_POSITION_NED", blocking=True, timeout=1.0)
+
+        # Test
+        assert position_when_full is None
+        assert depth_when_full == 1
+        assert [attitude.time_boot_ms for attitude in attitudes] == list(range(max_pending))
+        assert position is not None
+        assert position.time_boot_ms == max_pending
@@ -0,0 +1,179 @@
+"""
+Test partitioning queues by key.
+"""
+
+import pytest
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import sharded_queue
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+SHARD_COUNT = 4
+KEY_COUNT = 1000
+
+
+def create_shards(count: int) -> "list[queue_proxy_wrapper.QueueProxyWrapper]":
+    """
+    Creates in process queues as shards.
+    """
+    return [
+        queue_proxy_wrapper.QueueProxyWrapper(None, 0, queue_proxy_wrapper.QueueBackend.IN_PROCESS)
+        for _ in range(count)
+    ]
+
+
+@pytest.fixture()
+def sharded() -> sharded_queue.ShardedQueue:  # type: ignore
+    """
+    Creates a sharded queue of in process queues.
+    """
+    yield sharded_queue.ShardedQueue(create_shards(SHARD_COUNT))  # type: ignore
+
+
+class TestConsistentHashRing:
+    """
+    Keys are spread between shards, and stay put as shards are added.
+    """
+
+    def test_stable(self) -> None:
+        """
+        Separate rings agree on the shard of every key.
+        """
+        # Setup
+        ring = sharded_queue.ConsistentHashRing(SHARD_COUNT)
+        other_ring = sharded_queue.ConsistentHashRing(SHARD_COUNT)
+
+        # Test
+        assert [ring.get_shard(key) for key in range(KEY_COUNT)] == [
+            other_ring.get_shard(key) for key in range(KEY_COUNT)
+        ]
+
+    def test_distribution(self) -> None:
+        """
+        Every shard gets a fair share of keys.
+        """
+        # Setup
+        ring = sharded_queue.ConsistentHashRing(SHARD_COUNT)
+
+        # Run
+        counts = [0] * SHARD_COUNT
+        for key in range(KEY_COUNT):
+            counts[ring.get_shard(key)] += 1
+
+        # Test
+        assert min(counts) > KEY_COUNT / SHARD_COUNT / 2
+
+    def test_add_shard(self) -> None:
+        """
+        Adding a shard only moves keys to the new shard, about 1 in that many.
+        """
+        # Setup
+        ring = sharded_queue.ConsistentHashRing(SHARD_COUNT)
+        larger_ring = sharded_queue.ConsistentHashRing(SHARD_COUNT + 1)
+
+        # Run
+        moved = [
+            key for key in range(KEY_COUNT) if ring.get_shard(key) != larger_ring.get_shard(key)
+        ]
+
+        # Test
+        assert all(larger_ring.get_shard(key) == SHARD_COUNT for key in moved)
+        assert len(moved) < KEY_COUNT / (SHARD_COUNT + 1) * 2
+
+    def test_invalid(self) -> None:
+        """
+        Shard and point counts must be positive.
+        """
+        with pytest.raises(ValueError):
+            sharded_queue.ConsistentHashRing(0)
+
+        with pytest.raises(ValueError):
+            sharded_queue.ConsistentHashRing(SHARD_COUNT, 0)
+
+
+class TestShardedQueue:
+    """
+    Items of a key always go to the same shard.
+    """
+
+    def test_get_shard(self, sharded: sharded_queue.ShardedQueue) -> None:
+        """
+        Shards of cached and uncached keys agree with the ring.
+        """
+        # Setup
+        ring = sharded_queue.ConsistentHashRing(SHARD_COUNT)
+
+        # Test
+        for key in [0, 1, 255, 256, 1000]:
+            index = sharded.get_shard_index(key)
+            assert index == ring.get_shard(key)
+            assert sharded.get_shard(key) is sharded.get_shards()[index]
+
+    def test_put(self, sharded: sharded_queue.ShardedQueue) -> None:
+        """
+        Items put into the shard of their key are read from that shard only.
+        """
+        # Run
+        for key in range(16):
+            sharded.get_shard(key).queue.put(key)
+
+        # Test
+        for index, shard in enumerate(sharded.get_shards()):
+            keys = shard.get_many(16, 0.0)
+            assert all(sharded.get_shard_index(key) == index for key in keys)
+
+    def test_qsize(self, sharded: sharded_queue.ShardedQueue) -> None:
+        """
+        Items waiting in all shards.
+        """
+        # Run
+        for key in range(16):
+            sharded.get_shard(key).queue.put(key)
+
+        # Test
+        assert sharded.qsize() == 16
+        assert sum(shard.qsize() for shard in sharded.get_shards()) == 16
+
+    def test_invalid(self) -> None:
+        """
+        Shards must exist and share a backend.
+        """
+        with pytest.raises(ValueError):
+            sharded_queue.ShardedQueue([])
+
+        shared_memory_shard = queue_proxy_wrapper.QueueProxyWrapper(
+            None, 4, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY
+        )
+        with pytest.raises(ValueError):
+            sharded_queue.ShardedQueue(create_shards(1) + [shared_memory_shard])
+
+        shared_memory_shard.release()
+
+
+class TestPerWorker:
+    """
+    Each worker gets its own value.
+    """
+
+    def test_get(self) -> None:
+        """
+        Worker `i` gets value `i`.
+        """
+        # Setup
+        per_worker = sharded_queue.PerWorker(["a", "b"])
+
+        # Test
+        assert len(per_worker) == 2
+        assert [per_worker.get(index) for index in range(2)] == ["a", "b"]
+
+    def test_invalid(self) -> None:
+        """
+        There must be a value.
+        """
+        with pytest.raises(ValueError):
+            sharded_queue.PerWorker([])
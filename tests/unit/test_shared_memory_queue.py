@@ -0,0 +1,159 @@
+"""
+Test the shared memory queue.
+"""
+
+import multiprocessing as mp
+import queue
+
+import pytest
+
+from utilities.workers import shared_memory_queue
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+QUEUE_CAPACITY = 4
+SLOT_SIZE = 256  # bytes
+
+
+@pytest.fixture()
+def data_queue() -> shared_memory_queue.SharedMemoryQueue:  # type: ignore
+    """
+    Creates a small shared memory queue.
+    """
+    shared_queue = shared_memory_queue.SharedMemoryQueue(QUEUE_CAPACITY, SLOT_SIZE)
+    yield shared_queue  # type: ignore
+    shared_queue.close()
+    shared_queue.unlink()
+
+
+def producer(data_queue: shared_memory_queue.SharedMemoryQueue, count: int) -> None:
+    """
+    Puts integers into the queue.
+    """
+    for i in range(count):
+        data_queue.put(i)
+
+
+class TestSharedMemoryQueue:
+    """
+    Put and get behaviour.
+    """
+
+    def test_fifo_order(self, data_queue: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Items come out in the order they were put in.
+        """
+        # Setup
+        expected = [1, "two", (3.0, None)]
+
+        # Run
+        for item in expected:
+            data_queue.put(item)
+
+        actual = [data_queue.get() for _ in range(len(expected))]
+
+        # Test
+        assert actual == expected
+        assert data_queue.empty()
+
+    def test_wraps_around(self, data_queue: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        More items than capacity pass through the ring in order.
+        """
+        # Setup
+        expected = list(range(QUEUE_CAPACITY * 3))
+
+        # Run
+        actual = []
+        for item in expected:
+            data_queue.put(item)
+            actual.append(data_queue.get())
+
+        # Test
+        assert actual == expected
+
+    def test_full(self, data_queue: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Put on a full queue raises after the timeout.
+        """
+        # Setup
+        for i in range(QUEUE_CAPACITY):
+            data_queue.put(i)
+
+        # Run and test
+        assert data_queue.full()
+        with pytest.raises(queue.Full):
+            data_queue.put(0, timeout=0.01)
+
+    def test_empty(self, data_queue: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Get on an empty queue raises.
+        """
+        with pytest.raises(queue.Empty):
+            data_queue.get_nowait()
+
+    def test_item_too_large(self, data_queue: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Items larger than the slot are rejected without consuming a slot.
+        """
+        with pytest.raises(ValueError):
+            data_queue.put(bytes(SLOT_SIZE))
+
+        assert data_queue.qsize() == 0
+
+    def test_put_many_get_many(self, data_queue: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Batches keep order and get_many stops at the requested size.
+        """
+        # Setup
+        items = [0, 1, 2]
+
+        # Run
+        put_count = data_queue.put_many(items)
+        first = data_queue.get_many(2)
+        second = data_queue.get_many(QUEUE_CAPACITY)
+
+        # Test
+        assert put_count == len(items)
+        assert first == [0, 1]
+        assert second == [2]
+
+    def test_put_many_partial(self, data_queue: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Batch larger than the free space puts what fits before the timeout.
+        """
+        # Setup
+        items = list(range(QUEUE_CAPACITY + 2))
+
+        # Run
+        put_count = data_queue.put_many(items, timeout=0.01)
+
+        # Test
+        assert put_count == QUEUE_CAPACITY
+        assert data_queue.get_many(QUEUE_CAPACITY + 2, timeout=0.0) == items[:QUEUE_CAPACITY]
+
+    def test_get_many_timeout(self, data_queue: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Empty batch on timeout.
+        """
+        assert data_queue.get_many(QUEUE_CAPACITY, timeout=0.01) == []
+
+    def test_across_processes(self, data_queue: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Items from another process arrive complete and in order.
+        """
+        # Setup
+        count = 100
+        worker = mp.Process(target=producer, args=(data_queue, count))
+
+        # Run
+        worker.start()
+        actual = [data_queue.get(timeout=5.0) for _ in range(count)]
+        worker.join()
+
+        # Test
+        assert actual == list(range(count))
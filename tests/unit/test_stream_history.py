@@ -0,0 +1,110 @@
+"""
+Test the telemetry stream history.
+"""
+
+import math
+
+import pytest
+
+from modules.telemetry import stream_history
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+@pytest.fixture()
+def history() -> stream_history.StreamHistory:  # type: ignore
+    """
+    Position and yaw stream with 2 samples.
+    """
+    history = stream_history.StreamHistory(2, {1}, 4)
+    history.append(100, (0.0, math.radians(170)))
+    history.append(200, (10.0, math.radians(-170)))
+    yield history  # type: ignore
+
+
+class TestStreamHistory:
+    """
+    Appending and sampling.
+    """
+
+    def test_interpolates_between_samples(self, history: stream_history.StreamHistory) -> None:
+        """
+        Linear values are interpolated linearly, angles along the shorter arc across pi .
+        """
+        # Run
+        result, values = history.sample(150)
+
+        # Test
+        assert result
+        assert values[0] == pytest.approx(5.0)
+        assert abs(values[1]) == pytest.approx(math.pi)
+
+    def test_holds_outside_history(self, history: stream_history.StreamHistory) -> None:
+        """
+        Times outside the history hold the nearest sample.
+        """
+        # Run
+        _, before = history.sample(50)
+        _, after = history.sample(250)
+
+        # Test
+        assert before[0] == 0.0
+        assert after[0] == 10.0
+
+    def test_rejects_older_sample(self, history: stream_history.StreamHistory) -> None:
+        """
+        Out of order samples do not rewrite the history.
+        """
+        # Run
+        result = history.append(150, (100.0, 0.0))
+
+        # Test
+        assert not result
+        assert len(history) == 2
+        assert history.get_newest_time() == 200
+
+    def test_clear(self, history: stream_history.StreamHistory) -> None:
+        """
+        Cleared history accepts a sample older than the samples it had.
+        """
+        # Run
+        history.clear()
+        result = history.append(50, (1.0, 0.0))
+
+        # Test
+        assert result
+        assert len(history) == 1
+        assert history.get_newest_time() == 50
+
+    def test_capacity(self, history: stream_history.StreamHistory) -> None:
+        """
+        The oldest samples are replaced once full.
+        """
+        # Run
+        for sample_time in range(300, 600, 100):
+            history.append(sample_time, (sample_time / 10, 0.0))
+
+        _, values = history.sample(100)
+
+        # Test
+        assert len(history) == 4
+        assert history.get_newest_time() == 500
+        assert values[0] == 10.0
+
+    def test_empty(self) -> None:
+        """
+        Nothing to sample.
+        """
+        # Setup
+        history = stream_history.StreamHistory(1, set(), 4)
+
+        # Run
+        result, values = history.sample(0)
+
+        # Test
+        assert not result
+        assert values is None
+        assert history.get_newest_time() is None
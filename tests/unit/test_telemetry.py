@@ -0,0 +1,307 @@
+"""
+Test fusing the position and attitude streams.
+"""
+
+import time
+
+import pytest
+from pymavlink import mavutil
+
+# Logger is a submodule
+logger = pytest.importorskip("modules.common.modules.logger.logger")
+
+# pylint: disable=wrong-import-position
+from modules.telemetry import telemetry
+
+# pylint: enable=wrong-import-position
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+SYSTEM_ID = 1
+EMIT_PERIOD = 0.05  # seconds
+
+
+class FakeConnection:
+    """
+    Connection that returns the given messages in order, then nothing.
+    """
+
+    def __init__(self, messages: "list[mavutil.mavlink.MAVLink_message]") -> None:
+        self.messages = list(messages)
+
+    # Same signature as mavutil.mavfile
+    def recv_match(
+        self,
+        type: "str | list[str] | None" = None,  # pylint: disable=redefined-builtin,unused-argument
+        blocking: bool = False,  # pylint: disable=unused-argument
+        timeout: "float | None" = None,  # pylint: disable=unused-argument
+    ) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Returns the next message.
+        """
+        if len(self.messages) == 0:
+            return None
+
+        return self.messages.pop(0)
+
+
+def attitude_message(time_boot_ms: int, yaw: float) -> mavutil.mavlink.MAVLink_message:
+    """
+    Creates an ATTITUDE message from the vehicle.
+    """
+    message = mavutil.mavlink.MAVLink_attitude_message(time_boot_ms, 0.0, 0.0, yaw, 0.0, 0.0, 0.0)
+    # Packing sets the header, which holds the system ID
+    message.pack(mavutil.mavlink.MAVLink(None, srcSystem=SYSTEM_ID))
+    return message
+
+
+def position_message(time_boot_ms: int, x: float) -> mavutil.mavlink.MAVLink_message:
+    """
+    Creates a LOCAL_POSITION_NED message from the vehicle.
+    """
+    message = mavutil.mavlink.MAVLink_local_position_ned_message(
+        time_boot_ms, x, 0.0, 0.0, 0.0, 0.0, 0.0
+    )
+    message.pack(mavutil.mavlink.MAVLink(None, srcSystem=SYSTEM_ID))
+    return message
+
+
+def create_telemetry(
+    messages: "list[mavutil.mavlink.MAVLink_message]",
+    emit_policy: telemetry.EmitPolicy,
+    emit_period: float = 0.0,
+) -> telemetry.Telemetry:
+    """
+    Creates telemetry that receives the messages.
+    """
+    result, local_logger = logger.Logger.create("test_telemetry", False)
+    assert result
+    assert local_logger is not None
+
+    result, telemetry_instance = telemetry.Telemetry.create(
+        FakeConnection(messages), local_logger, emit_policy, emit_period
+    )
+    assert result
+    assert telemetry_instance is not None
+
+    return telemetry_instance
+
+
+def run_all(
+    telemetry_instance: telemetry.Telemetry, count: int
+) -> "list[telemetry.TelemetryData | None]":
+    """
+    Runs once per message.
+    """
+    return [telemetry_instance.run() for _ in range(count)]
+
+
+class TestOnAnyUpdate:
+    """
+    Emits whenever the aligned time advances.
+    """
+
+    def test_emit(self) -> None:
+        """
+        Nothing until both streams are received, then every update of the lagging stream.
+        """
+        # Setup
+        messages = [
+            position_message(100, 1.0),
+            attitude_message(100, 0.5),
+            position_message(200, 2.0),
+            attitude_message(200, 0.6),
+        ]
+        telemetry_instance = create_telemetry(messages, telemetry.EmitPolicy.ON_ANY_UPDATE)
+
+        # Run
+        outputs = run_all(telemetry_instance, len(messages))
+
+        # Test
+        assert outputs[0] is None
+        assert outputs[1] is not None
+        assert outputs[1].time_since_boot == 100
+        assert outputs[1].system_id == SYSTEM_ID
+        assert outputs[3] is not None
+        assert outputs[3].time_since_boot == 200
+        assert outputs[3].x == 2.0
+        assert outputs[3].yaw == 0.6
+
+    def test_no_duplicate(self) -> None:
+        """
+        Updates of the leading stream do not emit the same aligned time again.
+        """
+        # Setup
+        messages = [
+            position_message(100, 1.0),
+            attitude_message(100, 0.5),
+            position_message(200, 2.0),
+            position_message(300, 3.0),
+            attitude_message(250, 0.6),
+        ]
+        telemetry_instance = create_telemetry(messages, telemetry.EmitPolicy.ON_ANY_UPDATE)
+
+        # Run
+        outputs = run_all(telemetry_instance, len(messages))
+
+        # Test
+        assert outputs[2] is None
+        assert outputs[3] is None
+        assert outputs[4] is not None
+        assert outputs[4].time_since_boot == 250
+        # Interpolated between the position samples either side
+        assert outputs[4].x == pytest.approx(2.5)
+
+    def test_older_ignored(self) -> None:
+        """
+        Message older than the latest of its stream does not emit.
+        """
+        # Setup
+        messages = [
+            position_message(200, 2.0),
+            attitude_message(200, 0.5),
+            attitude_message(100, 0.4),
+        ]
+        telemetry_instance = create_telemetry(messages, telemetry.EmitPolicy.ON_ANY_UPDATE)
+
+        # Run
+        outputs = run_all(telemetry_instance, len(messages))
+
+        # Test
+        assert outputs[1] is not None
+        assert outputs[2] is None
+
+    def test_restart(self) -> None:
+        """
+        Time since boot going back by a lot starts both streams over instead of stopping.
+        """
+        # Setup
+        messages = [
+            position_message(100000, 2.0),
+            attitude_message(100000, 0.5),
+            position_message(100, 3.0),
+            attitude_message(100, 0.6),
+            position_message(200, 4.0),
+            attitude_message(200, 0.7),
+        ]
+        telemetry_instance = create_telemetry(messages, telemetry.EmitPolicy.ON_ANY_UPDATE)
+
+        # Run
+        outputs = run_all(telemetry_instance, len(messages))
+
+        # Test
+        assert outputs[1] is not None
+        # The attitude from before the restart is not aligned with the position after it
+        assert outputs[2] is None
+        assert outputs[3] is not None
+        assert outputs[3].time_since_boot == 100
+        assert outputs[3].x == 3.0
+        assert outputs[5] is not None
+        assert outputs[5].time_since_boot == 200
+        assert telemetry_instance.vehicles[SYSTEM_ID].restart_count == 1
+
+
+class TestOnBoth:
+    """
+    Emits once both streams are newer than at the last emit.
+    """
+
+    def test_emit(self) -> None:
+        """
+        Repeated updates of 1 stream wait for the other.
+        """
+        # Setup
+        messages = [
+            position_message(100, 1.0),
+            position_message(150, 1.5),
+            attitude_message(140, 0.5),
+            attitude_message(200, 0.6),
+            attitude_message(300, 0.7),
+            position_message(300, 3.0),
+        ]
+        telemetry_instance = create_telemetry(messages, telemetry.EmitPolicy.ON_BOTH)
+
+        # Run
+        outputs = run_all(telemetry_instance, len(messages))
+
+        # Test
+        assert [output is not None for output in outputs] == [
+            False,
+            False,
+            True,
+            False,
+            False,
+            True,
+        ]
+        assert outputs[2].time_since_boot == 140
+        assert outputs[5].time_since_boot == 300
+        assert outputs[5].yaw == 0.7
+
+
+class TestFixedRate:
+    """
+    Emits the latest state every period.
+    """
+
+    def test_emit(self) -> None:
+        """
+        Nothing before the period has passed, then 1 emit per period.
+        """
+        # Setup
+        messages = [position_message(100, 1.0), attitude_message(100, 0.5)]
+        telemetry_instance = create_telemetry(
+            messages, telemetry.EmitPolicy.FIXED_RATE, EMIT_PERIOD
+        )
+
+        # Run
+        early_outputs = run_all(telemetry_instance, len(messages))
+        time.sleep(EMIT_PERIOD)
+        output = telemetry_instance.run()
+        repeated_output = telemetry_instance.run()
+
+        # Test
+        assert early_outputs == [None, None]
+        assert output is not None
+        assert output.time_since_boot == 100
+        assert repeated_output is None
+
+    def test_should_emit_skips_missed_periods(self) -> None:
+        """
+        Late emit schedules the next one a period ahead rather than emitting a burst.
+        """
+        # Setup
+        vehicle = telemetry.VehicleTelemetry(SYSTEM_ID, 10.0)
+        vehicle.update(position_message(100, 1.0))
+        vehicle.update(attitude_message(100, 0.5))
+
+        # Run
+        is_early = vehicle.should_emit(telemetry.EmitPolicy.FIXED_RATE, 1.0, False, 9.5)
+        is_late = vehicle.should_emit(telemetry.EmitPolicy.FIXED_RATE, 1.0, False, 13.5)
+        is_repeated = vehicle.should_emit(telemetry.EmitPolicy.FIXED_RATE, 1.0, False, 13.6)
+
+        # Test
+        assert not is_early
+        assert is_late
+        assert not is_repeated
+        assert vehicle.next_emit_time == 14.0
+
+    def test_invalid_period(self) -> None:
+        """
+        Period must be positive.
+        """
+        # Setup
+        result, local_logger = logger.Logger.create("test_telemetry", False)
+        assert result
+
+        # Run
+        result, telemetry_instance = telemetry.Telemetry.create(
+            FakeConnection([]), local_logger, telemetry.EmitPolicy.FIXED_RATE, 0.0
+        )
+
+        # Test
+        assert not result
+        assert telemetry_instance is None
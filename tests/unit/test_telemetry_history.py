@@ -0,0 +1,124 @@
+"""
+Test the telemetry history.
+"""
+
+import numpy as np
+import pytest
+
+from modules.telemetry import telemetry_history
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+CAPACITY = 8
+VALUE_COUNT = len(telemetry_history.VALUE_NAMES)
+
+
+def make_values(value: float) -> "tuple[float, ...]":
+    """
+    Sample with every value the same.
+    """
+    return (value,) * VALUE_COUNT
+
+
+@pytest.fixture()
+def history() -> telemetry_history.TelemetryHistory:  # type: ignore
+    """
+    History that has wrapped around, holding values 4 to 11 at times 400 to 1100 .
+    """
+    history = telemetry_history.TelemetryHistory(CAPACITY, 100.0)
+    for i in range(12):
+        history.append(i * 100, make_values(float(i)))
+
+    yield history  # type: ignore
+
+
+class TestTelemetryHistory:
+    """
+    Appending and windowed queries.
+    """
+
+    def test_mean_matches_direct(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        Running sum mean equals the mean computed from the window directly.
+        """
+        # Run
+        result, mean = history.mean(550, 1000)
+        _, window = history.get_window(550, 1000)
+
+        # Test
+        assert result
+        assert np.allclose(mean, window.mean(axis=0))
+        assert mean[0] == pytest.approx(8.0)
+
+    def test_minimum_maximum(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        Extremes over an inclusive range.
+        """
+        # Run
+        _, minimum = history.minimum(500, 700)
+        _, maximum = history.maximum(500, 700)
+
+        # Test
+        assert minimum[0] == 5.0
+        assert maximum[0] == 7.0
+
+    def test_empty_window(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        Range before the history has no samples.
+        """
+        # Run
+        result, mean = history.mean(0, 300)
+
+        # Test
+        assert not result
+        assert mean is None
+
+    def test_last(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        Newest samples oldest first, capped at the history length.
+        """
+        # Run
+        times, values = history.last(3)
+        all_times, _ = history.last(100)
+
+        # Test
+        assert list(times) == [900, 1000, 1100]
+        assert list(values[:, 0]) == [9.0, 10.0, 11.0]
+        assert len(all_times) == CAPACITY
+
+    def test_ema(self) -> None:
+        """
+        Moves toward new values according to the time between samples.
+        """
+        # Setup
+        history = telemetry_history.TelemetryHistory(CAPACITY, 100.0)
+        history.append(0, make_values(0.0))
+
+        # Run
+        history.append(100, make_values(1.0))
+        _, ema = history.ema()
+
+        # Test
+        assert ema[0] == pytest.approx(1.0 - np.exp(-1.0))
+
+    def test_rejects_invalid_samples(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        Samples that are not newer or have missing values are not added.
+        """
+        # Setup
+        values = list(make_values(0.0))
+        values[3] = None
+
+        # Run
+        is_old_added = history.append(1100, make_values(0.0))
+        is_missing_added = history.append(1200, tuple(values))
+
+        # Test
+        assert not is_old_added
+        assert not is_missing_added
+        assert history.get_newest_time() == 1100
+        assert len(history) == CAPACITY
@@ -0,0 +1,55 @@
+"""
+Test the telemetry binary record.
+"""
+
+import pytest
+
+from modules.telemetry import telemetry_record
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+@pytest.fixture()
+def values() -> "tuple":  # type: ignore
+    """
+    Field values with some missing.
+    """
+    yield (1234, 1.5, -2.0, 30.0, None, 0.25, 0.0, 0.1, 0.2, -3.0, None, None, 0.5)  # type: ignore
+
+
+class TestTelemetryRecord:
+    """
+    Packing and unpacking.
+    """
+
+    def test_round_trip(self, values: "tuple") -> None:
+        """
+        Values including None survive a round trip.
+        """
+        # Setup
+        buffer = bytearray(telemetry_record.RECORD_SIZE + 10)
+
+        # Run
+        telemetry_record.pack_into(buffer, 10, values)
+        actual = telemetry_record.unpack_from(buffer, 10)
+
+        # Test
+        assert actual == values
+
+    def test_all_none(self) -> None:
+        """
+        Empty data is all None rather than all 0 .
+        """
+        # Setup
+        expected = (None,) * len(telemetry_record.FIELD_NAMES)
+        buffer = bytearray(telemetry_record.RECORD_SIZE)
+
+        # Run
+        telemetry_record.pack_into(buffer, 0, expected)
+        actual = telemetry_record.unpack_from(buffer)
+
+        # Test
+        assert actual == expected
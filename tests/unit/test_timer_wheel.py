@@ -0,0 +1,113 @@
+"""
+Test the timer wheel.
+"""
+
+import pytest
+
+from modules.command import timer_wheel
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+TICK = 0.1  # seconds
+SLOT_COUNT = 8
+
+
+@pytest.fixture()
+def wheel() -> timer_wheel.TimerWheel:  # type: ignore
+    """
+    Creates a small timer wheel starting at time 0 .
+    """
+    yield timer_wheel.TimerWheel(TICK, SLOT_COUNT, 0.0)  # type: ignore
+
+
+class TestTimerWheel:
+    """
+    Timers expire once, never early.
+    """
+
+    def test_expire(self, wheel: timer_wheel.TimerWheel) -> None:
+        """
+        Timers expire by their time and are removed.
+        """
+        # Setup
+        wheel.schedule("a", 0.25)
+        wheel.schedule("b", 0.45)
+
+        # Run
+        expired_early = wheel.advance(0.2)
+        expired_a = wheel.advance(0.35)
+        expired_b = wheel.advance(1.0)
+
+        # Test
+        assert expired_early == []
+        assert expired_a == ["a"]
+        assert expired_b == ["b"]
+        assert len(wheel) == 0
+
+    def test_later_round(self, wheel: timer_wheel.TimerWheel) -> None:
+        """
+        Timers further away than the ring wait for their round.
+        """
+        # Setup
+        wheel.schedule("far", TICK * SLOT_COUNT * 2.5)
+
+        # Run
+        expired_early = wheel.advance(TICK * SLOT_COUNT * 2)
+        expired = wheel.advance(TICK * SLOT_COUNT * 3)
+
+        # Test
+        assert expired_early == []
+        assert expired == ["far"]
+
+    def test_far_behind(self, wheel: timer_wheel.TimerWheel) -> None:
+        """
+        Advancing past several rounds at once expires every timer due.
+        """
+        # Setup
+        keys = [f"timer {i}" for i in range(SLOT_COUNT * 2)]
+        for i, key in enumerate(keys):
+            wheel.schedule(key, TICK * (i + 1))
+
+        # Run
+        expired = wheel.advance(TICK * SLOT_COUNT * 10)
+
+        # Test
+        assert sorted(expired) == sorted(keys)
+
+    def test_cancel_and_reschedule(self, wheel: timer_wheel.TimerWheel) -> None:
+        """
+        Cancelled timers do not expire, and scheduling again replaces the timer.
+        """
+        # Setup
+        wheel.schedule("cancelled", 0.1)
+        wheel.schedule("moved", 0.1)
+
+        # Run
+        is_cancelled = wheel.cancel("cancelled")
+        wheel.schedule("moved", 0.5)
+        expired_early = wheel.advance(0.3)
+
+        # Test
+        assert is_cancelled
+        assert not wheel.cancel("cancelled")
+        assert expired_early == []
+        assert "moved" in wheel
+        assert wheel.advance(0.5) == ["moved"]
+
+    def test_past_time(self, wheel: timer_wheel.TimerWheel) -> None:
+        """
+        Timers scheduled in the past expire on the next tick.
+        """
+        # Setup
+        wheel.advance(1.0)
+
+        # Run
+        wheel.schedule("late", 0.0)
+
+        # Test
+        assert wheel.advance(1.0) == []
+        assert wheel.advance(1.1) == ["late"]
@@ -0,0 +1,267 @@
+"""
+Test scaling workers to the input queue depth.
+"""
+
+import time
+
+import pytest
+
+# Logger is a submodule
+logger = pytest.importorskip("modules.common.modules.logger.logger")
+
+# pylint: disable=wrong-import-position
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import sharded_queue
+from utilities.workers import worker_autoscaler
+from utilities.workers import worker_controller
+
+# pylint: enable=wrong-import-position
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+SERVICE_TIME = 0.1  # seconds
+SCALE_UP_DRAIN_TIME = 1.0  # seconds
+SCALE_DOWN_DRAIN_TIME = 0.2  # seconds
+COOLDOWN = 0.1  # seconds
+MIN_COUNT = 1
+MAX_COUNT = 3
+
+
+class FakeManager:
+    """
+    Worker manager whose workers never progress, so the service time stays the estimate.
+    """
+
+    def __init__(self, input_queues: list) -> None:
+        self.input_queues = input_queues
+        self.worker_count = MIN_COUNT
+
+    def get_slot_count(self) -> int:
+        """
+        Slot per possible worker.
+        """
+        return MAX_COUNT
+
+    def get_worker_progress(self, _: int) -> int:
+        """
+        No progress.
+        """
+        return 0
+
+    def get_worker_count(self) -> int:
+        """
+        Active workers.
+        """
+        return self.worker_count
+
+    def get_input_queues(self) -> list:
+        """
+        Queues measured by the autoscaler.
+        """
+        return self.input_queues
+
+    def get_target_name(self) -> str:
+        """
+        Name for logging.
+        """
+        return "fake"
+
+    def add_worker(self) -> bool:
+        """
+        Adds a worker up to the maximum.
+        """
+        if self.worker_count >= MAX_COUNT:
+            return False
+
+        self.worker_count += 1
+        return True
+
+    def retire_worker(self) -> bool:
+        """
+        Retires a worker down to the minimum.
+        """
+        if self.worker_count <= MIN_COUNT:
+            return False
+
+        self.worker_count -= 1
+        return True
+
+
+def create_queue() -> queue_proxy_wrapper.QueueProxyWrapper:
+    """
+    Unbounded queue in process.
+    """
+    return queue_proxy_wrapper.QueueProxyWrapper(
+        None, 0, queue_proxy_wrapper.QueueBackend.IN_PROCESS
+    )
+
+
+def create_autoscaler(
+    manager: FakeManager, controller: worker_controller.WorkerController
+) -> worker_autoscaler.WorkerAutoscaler:
+    """
+    Autoscaler of the manager.
+    """
+    result, local_logger = logger.Logger.create("test_worker_autoscaler", False)
+    assert result
+    assert local_logger is not None
+
+    result, autoscaler = worker_autoscaler.WorkerAutoscaler.create(
+        manager,
+        controller,
+        SERVICE_TIME,
+        SCALE_UP_DRAIN_TIME,
+        SCALE_DOWN_DRAIN_TIME,
+        COOLDOWN,
+        local_logger,
+    )
+    assert result
+    assert autoscaler is not None
+
+    return autoscaler
+
+
+@pytest.fixture()
+def controller() -> worker_controller.WorkerController:  # type: ignore
+    """
+    Controller with no requests.
+    """
+    yield worker_controller.WorkerController()  # type: ignore
+
+
+class TestThresholds:
+    """
+    Scales up above the scale up drain time and down below the scale down drain time.
+    """
+
+    def test_scale_up(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Deep queue adds a worker.
+        """
+        # Setup
+        input_queue = create_queue()
+        manager = FakeManager([input_queue])
+        autoscaler = create_autoscaler(manager, controller)
+        # Drain time 2 s
+        input_queue.put_many(list(range(20)))
+        time.sleep(COOLDOWN)
+
+        # Run
+        change = autoscaler.run()
+
+        # Test
+        assert change == 1
+        assert manager.worker_count == 2
+
+    def test_hold(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Drain time between the thresholds keeps the worker count.
+        """
+        # Setup
+        input_queue = create_queue()
+        manager = FakeManager([input_queue])
+        manager.worker_count = 2
+        autoscaler = create_autoscaler(manager, controller)
+        # Drain time 0.5 s
+        input_queue.put_many(list(range(10)))
+        time.sleep(COOLDOWN)
+
+        # Run
+        change = autoscaler.run()
+
+        # Test
+        assert change == 0
+        assert manager.worker_count == 2
+
+    def test_scale_down(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Empty queue retires a worker, down to the minimum.
+        """
+        # Setup
+        manager = FakeManager([create_queue()])
+        manager.worker_count = 2
+        autoscaler = create_autoscaler(manager, controller)
+        time.sleep(COOLDOWN)
+
+        # Run
+        change = autoscaler.run()
+        time.sleep(COOLDOWN)
+        change_at_minimum = autoscaler.run()
+
+        # Test
+        assert change == -1
+        assert change_at_minimum == 0
+        assert manager.worker_count == MIN_COUNT
+
+    def test_sharded(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Depth of a sharded queue is of all its shards.
+        """
+        # Setup
+        shards = [create_queue(), create_queue()]
+        manager = FakeManager([sharded_queue.ShardedQueue(shards)])
+        autoscaler = create_autoscaler(manager, controller)
+        for shard in shards:
+            shard.put_many(list(range(10)))
+
+        time.sleep(COOLDOWN)
+
+        # Run
+        change = autoscaler.run()
+
+        # Test
+        assert change == 1
+
+
+class TestCooldown:
+    """
+    Waits after each change.
+    """
+
+    def test_cooldown(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Deep queue adds 1 worker per cooldown.
+        """
+        # Setup
+        input_queue = create_queue()
+        manager = FakeManager([input_queue])
+        autoscaler = create_autoscaler(manager, controller)
+        input_queue.put_many(list(range(100)))
+
+        # Run
+        change_in_first_cooldown = autoscaler.run()
+        time.sleep(COOLDOWN)
+        change = autoscaler.run()
+        change_in_cooldown = autoscaler.run()
+        time.sleep(COOLDOWN)
+        change_after_cooldown = autoscaler.run()
+
+        # Test
+        assert change_in_first_cooldown == 0
+        assert change == 1
+        assert change_in_cooldown == 0
+        assert change_after_cooldown == 1
+        assert manager.worker_count == MAX_COUNT
+
+    def test_paused(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Nothing changes while paused.
+        """
+        # Setup
+        input_queue = create_queue()
+        manager = FakeManager([input_queue])
+        autoscaler = create_autoscaler(manager, controller)
+        input_queue.put_many(list(range(100)))
+        controller.request_pause()
+        time.sleep(COOLDOWN)
+
+        # Run
+        change = autoscaler.run()
+
+        # Test
+        assert change == 0
+        assert manager.worker_count == MIN_COUNT
@@ -0,0 +1,231 @@
+"""
+Test the worker controller.
+"""
+
+import asyncio
+import multiprocessing as mp
+import threading
+
+import pytest
+
+from utilities.workers import worker_controller
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+@pytest.fixture()
+def controller() -> worker_controller.WorkerController:  # type: ignore
+    """
+    Controller with no requests.
+    """
+    yield worker_controller.WorkerController()  # type: ignore
+
+
+def start_pause_check(controller: worker_controller.WorkerController) -> threading.Thread:
+    """
+    Calls check_pause() in a thread, which is alive while paused.
+    """
+    thread = threading.Thread(target=controller.check_pause)
+    thread.start()
+    return thread
+
+
+def loop(controller: worker_controller.WorkerController) -> None:
+    """
+    Minimal worker loop, registered as worker_manager.run_worker() does.
+    """
+    controller.register_worker()
+    try:
+        while not controller.is_exit_requested():
+            controller.check_pause()
+    finally:
+        controller.deregister_worker()
+
+
+def start_workers(controller: worker_controller.WorkerController, count: int) -> "list[mp.Process]":
+    """
+    Starts registered worker processes.
+    """
+    workers = [mp.Process(target=loop, args=(controller,)) for _ in range(count)]
+    controller.expect_workers(count)
+    for worker in workers:
+        worker.start()
+
+    return workers
+
+
+async def loop_async(controller: worker_controller.WorkerController) -> None:
+    """
+    Minimal asyncio worker loop, registered as worker_manager.run_worker_async() does.
+    """
+    controller.register_worker()
+    try:
+        while not controller.is_exit_requested():
+            await controller.check_pause_async()
+            await asyncio.sleep(0.001)
+    finally:
+        controller.deregister_worker()
+
+
+def run_tasks(controller: worker_controller.WorkerController, count: int) -> None:
+    """
+    Runs registered asyncio workers on an event loop until they exit.
+    """
+
+    async def run() -> None:
+        await asyncio.gather(*(loop_async(controller) for _ in range(count)))
+
+    asyncio.run(run())
+
+
+class TestWorkerController:
+    """
+    Exit and pause requests.
+    """
+
+    def test_exit(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Request and clear are idempotent.
+        """
+        # Run
+        controller.request_exit()
+        controller.request_exit()
+        is_requested = controller.is_exit_requested()
+        controller.clear_exit()
+        controller.clear_exit()
+
+        # Test
+        assert is_requested
+        assert not controller.is_exit_requested()
+
+    def test_pause_blocks_until_resume(
+        self, controller: worker_controller.WorkerController
+    ) -> None:
+        """
+        Paused check blocks, and returns once resumed.
+        """
+        # Setup
+        controller.request_pause()
+
+        # Run
+        thread = start_pause_check(controller)
+        thread.join(0.1)
+        is_blocked = thread.is_alive()
+        controller.request_resume()
+        thread.join(1.0)
+
+        # Test
+        assert is_blocked
+        assert not thread.is_alive()
+        assert not controller.is_pause_requested()
+
+    def test_exit_releases_pause(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Paused workers are released to exit.
+        """
+        # Setup
+        controller.request_pause()
+        thread = start_pause_check(controller)
+
+        # Run
+        controller.request_exit()
+        thread.join(1.0)
+
+        # Test
+        assert not thread.is_alive()
+        assert controller.is_pause_requested()
+
+    def test_acknowledged_pause_and_exit(
+        self, controller: worker_controller.WorkerController
+    ) -> None:
+        """
+        Waiting requests return once every registered worker has parked or stopped.
+        """
+        # Setup
+        workers = start_workers(controller, 2)
+
+        # Run
+        is_paused = controller.request_pause(True, 5.0)
+        pause_latency = controller.get_pause_latency()
+        controller.request_resume()
+        is_exited = controller.request_exit(True, 5.0)
+        for worker in workers:
+            worker.join()
+
+        # Test
+        assert is_paused
+        assert pause_latency is not None
+        assert is_exited
+        assert controller.get_exit_latency() is not None
+        assert controller.get_registered_count() == 0
+
+    def test_pause_again(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Resumed workers stop counting as parked, so a new pause waits for them to park again.
+        """
+        # Setup
+        workers = start_workers(controller, 2)
+        parked_index = controller._WorkerController__PARKED_COUNT
+        counts = controller._WorkerController__counts
+
+        # Run
+        is_first_paused = controller.request_pause(True, 5.0)
+        controller.request_resume()
+        with controller._WorkerController__condition:
+            is_resumed = controller._WorkerController__condition.wait_for(
+                lambda: counts[parked_index] == 0, 5.0
+            )
+
+        is_paused = controller.request_pause(True, 5.0)
+        parked_count = counts[parked_index]
+        controller.request_exit(True, 5.0)
+        for worker in workers:
+            worker.join()
+
+        # Test
+        assert is_first_paused
+        assert is_resumed
+        assert is_paused
+        assert parked_count == 2
+
+    def test_pause_wait_times_out(self, controller: worker_controller.WorkerController) -> None:
+        """
+        A registered worker that never checks in is not parked.
+        """
+        # Setup
+        controller.expect_workers(1)
+
+        # Run
+        result = controller.request_pause(True, 0.1)
+
+        # Test
+        assert not result
+        assert controller.get_pause_latency() is None
+
+    def test_thread_and_task_workers(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Threads and asyncio tasks on one event loop register and park separately.
+        """
+        # Setup
+        controller.expect_workers(3)
+        workers = [
+            threading.Thread(target=loop, args=(controller,)),
+            threading.Thread(target=run_tasks, args=(controller, 2)),
+        ]
+        for worker in workers:
+            worker.start()
+
+        # Run
+        is_paused = controller.request_pause(True, 5.0)
+        controller.request_resume()
+        is_exited = controller.request_exit(True, 5.0)
+        for worker in workers:
+            worker.join()
+
+        # Test
+        assert is_paused
+        assert is_exited
+        assert controller.get_registered_count() == 0
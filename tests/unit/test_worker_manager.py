@@ -0,0 +1,321 @@
+"""
+Test managing thread and asyncio workers.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+# Logger is a submodule
+logger = pytest.importorskip("modules.common.modules.logger.logger")
+
+# pylint: disable=wrong-import-position
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from utilities.workers import worker_manager
+
+# pylint: enable=wrong-import-position
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+TIMEOUT = 1.0  # seconds
+
+
+@pytest.fixture()
+def local_logger() -> logger.Logger:  # type: ignore
+    """
+    Logger for the managers.
+    """
+    result, test_logger = logger.Logger.create("test_worker_manager", False)
+    assert result
+    assert test_logger is not None
+
+    yield test_logger  # type: ignore
+
+
+@pytest.fixture()
+def controller() -> worker_controller.WorkerController:  # type: ignore
+    """
+    Controller with no requests.
+    """
+    yield worker_controller.WorkerController()  # type: ignore
+
+
+def echo(
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Thread worker that passes items through until exit.
+    """
+    while not controller.is_exit_requested():
+        controller.check_pause()
+        for item in input_queue.get_many(8, 0.01):
+            output_queue.queue.put(item)
+
+
+async def echo_async(
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Asyncio worker that passes items through until exit.
+    """
+    while not controller.is_exit_requested():
+        await controller.check_pause_async()
+        for item in input_queue.get_many(8, 0.0):
+            output_queue.queue.put(item)
+
+        await asyncio.sleep(0.001)
+
+
+def fail(controller: worker_controller.WorkerController) -> None:
+    """
+    Thread worker that raises.
+    """
+    controller.check_pause()
+    raise RuntimeError("Worker failed")
+
+
+def create_in_process_queue() -> queue_proxy_wrapper.QueueProxyWrapper:
+    """
+    Queue between workers in main.
+    """
+    return queue_proxy_wrapper.QueueProxyWrapper(
+        None, 0, queue_proxy_wrapper.QueueBackend.IN_PROCESS
+    )
+
+
+def create_manager(
+    target: "(...) -> object",  # type: ignore
+    queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
+    backend: worker_manager.WorkerBackend,
+    controller: worker_controller.WorkerController,
+    local_logger: logger.Logger,
+) -> worker_manager.WorkerManager:
+    """
+    Creates a manager of 1 worker, with an input and an output queue if given.
+    """
+    result, properties = worker_manager.WorkerProperties.create(
+        1,
+        target,
+        (),
+        queues[:1],
+        queues[1:],
+        controller,
+        local_logger,
+        backend=backend,
+    )
+    assert result
+    assert properties is not None
+
+    result, manager = worker_manager.WorkerManager.create(properties, local_logger)
+    assert result
+    assert manager is not None
+
+    return manager
+
+
+class TestSelectQueueBackend:
+    """
+    Queues only cross a process boundary when an endpoint is a process.
+    """
+
+    def test_in_process(self) -> None:
+        """
+        Threads, asyncio tasks and main share the process.
+        """
+        # Run
+        backend = worker_manager.select_queue_backend(
+            [worker_manager.WorkerBackend.THREAD, worker_manager.WorkerBackend.ASYNCIO, None],
+            queue_proxy_wrapper.QueueBackend.SHARED_MEMORY,
+        )
+
+        # Test
+        assert backend == queue_proxy_wrapper.QueueBackend.IN_PROCESS
+
+    def test_process(self) -> None:
+        """
+        Any process endpoint needs the cross process backend.
+        """
+        # Run
+        backend = worker_manager.select_queue_backend(
+            [worker_manager.WorkerBackend.THREAD, worker_manager.WorkerBackend.PROCESS],
+            queue_proxy_wrapper.QueueBackend.SHARED_MEMORY,
+        )
+
+        # Test
+        assert backend == queue_proxy_wrapper.QueueBackend.SHARED_MEMORY
+
+
+class TestThreadWorkers:
+    """
+    Workers in threads of main.
+    """
+
+    def test_start_and_stop(
+        self, controller: worker_controller.WorkerController, local_logger: logger.Logger
+    ) -> None:
+        """
+        Worker processes items until exit, and registers while running.
+        """
+        # Setup
+        input_queue = create_in_process_queue()
+        output_queue = create_in_process_queue()
+        manager = create_manager(
+            echo,
+            [input_queue, output_queue],
+            worker_manager.WorkerBackend.THREAD,
+            controller,
+            local_logger,
+        )
+
+        # Run
+        manager.start_workers()
+        input_queue.queue.put(1)
+        item = output_queue.queue.get(timeout=TIMEOUT)
+        is_alive = manager.is_worker_alive(0)
+        controller.request_exit()
+        is_stopped = manager.join_workers(time.monotonic() + TIMEOUT)
+
+        # Test
+        assert item == 1
+        assert is_alive
+        assert is_stopped
+        assert controller.get_registered_count() == 0
+
+    # The exception is expected to reach the thread exception hook
+    @pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+    def test_exception(
+        self, controller: worker_controller.WorkerController, local_logger: logger.Logger
+    ) -> None:
+        """
+        Worker that raises dies and deregisters, and is restarted.
+        """
+        # Setup
+        manager = create_manager(
+            fail, [], worker_manager.WorkerBackend.THREAD, controller, local_logger
+        )
+
+        # Run
+        manager.start_workers()
+        manager.join_workers(time.monotonic() + TIMEOUT)
+        is_alive = manager.is_worker_alive(0)
+        registered_count = controller.get_registered_count()
+        is_restarted = manager.check_and_restart_dead_workers()
+        manager.join_workers(time.monotonic() + TIMEOUT)
+
+        # Test
+        assert not is_alive
+        assert registered_count == 0
+        assert is_restarted
+        assert manager.get_worker_generation(0) == 1
+
+    def test_process_target_rejected(
+        self, controller: worker_controller.WorkerController, local_logger: logger.Logger
+    ) -> None:
+        """
+        Process workers cannot use in process queues.
+        """
+        # Run
+        result, properties = worker_manager.WorkerProperties.create(
+            1,
+            echo,
+            (),
+            [create_in_process_queue()],
+            [create_in_process_queue()],
+            controller,
+            local_logger,
+        )
+
+        # Test
+        assert not result
+        assert properties is None
+
+
+class TestAsyncioWorkers:
+    """
+    Workers as tasks on an event loop thread of main.
+    """
+
+    def test_start_and_stop(
+        self, controller: worker_controller.WorkerController, local_logger: logger.Logger
+    ) -> None:
+        """
+        Worker processes items until exit, and the event loop stops with it.
+        """
+        # Setup
+        input_queue = create_in_process_queue()
+        output_queue = create_in_process_queue()
+        manager = create_manager(
+            echo_async,
+            [input_queue, output_queue],
+            worker_manager.WorkerBackend.ASYNCIO,
+            controller,
+            local_logger,
+        )
+
+        # Run
+        manager.start_workers()
+        input_queue.queue.put(1)
+        item = output_queue.queue.get(timeout=TIMEOUT)
+        controller.request_exit()
+        is_stopped = manager.join_workers(time.monotonic() + TIMEOUT)
+
+        # Test
+        assert item == 1
+        assert is_stopped
+        assert manager._WorkerManager__loop_thread is None
+        assert controller.get_registered_count() == 0
+
+    def test_stop_workers(
+        self, controller: worker_controller.WorkerController, local_logger: logger.Logger
+    ) -> None:
+        """
+        Running task is cancelled.
+        """
+        # Setup
+        manager = create_manager(
+            echo_async,
+            [create_in_process_queue(), create_in_process_queue()],
+            worker_manager.WorkerBackend.ASYNCIO,
+            controller,
+            local_logger,
+        )
+        manager.start_workers()
+
+        # Run
+        is_stopped = manager.stop_workers()
+
+        # Test
+        assert is_stopped
+        assert controller.get_registered_count() == 0
+
+    def test_function_target_rejected(
+        self, controller: worker_controller.WorkerController, local_logger: logger.Logger
+    ) -> None:
+        """
+        Asyncio workers require a coroutine function.
+        """
+        # Run
+        result, properties = worker_manager.WorkerProperties.create(
+            1,
+            echo,
+            (),
+            [],
+            [],
+            controller,
+            local_logger,
+            backend=worker_manager.WorkerBackend.ASYNCIO,
+        )
+
+        # Test
+        assert not result
+        assert properties is None
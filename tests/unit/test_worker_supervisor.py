@@ -0,0 +1,253 @@
+"""
+Test restarting crashed and hung workers.
+"""
+
+import time
+
+import pytest
+
+# Logger is a submodule
+logger = pytest.importorskip("modules.common.modules.logger.logger")
+
+# pylint: disable=wrong-import-position
+from utilities.workers import worker_controller
+from utilities.workers import worker_supervisor
+
+# pylint: enable=wrong-import-position
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+HANG_TIMEOUT = 0.05  # seconds
+INITIAL_BACKOFF = 0.1  # seconds
+MAX_BACKOFF = 0.4  # seconds
+
+
+class FakeManager:
+    """
+    Worker manager of 1 worker, whose state is set by the test.
+    """
+
+    def __init__(self) -> None:
+        self.is_alive = True
+        self.progress = 0
+        self.generation = 0
+        self.is_restart_successful = True
+        self.restart_count = 0
+
+    def get_slot_count(self) -> int:
+        """
+        Single slot.
+        """
+        return 1
+
+    def is_worker_active(self, _: int) -> bool:
+        """
+        Worker is never retired.
+        """
+        return True
+
+    def is_worker_alive(self, _: int) -> bool:
+        """
+        Set by the test.
+        """
+        return self.is_alive
+
+    def get_worker_generation(self, _: int) -> int:
+        """
+        Changes on each successful restart.
+        """
+        return self.generation
+
+    def get_worker_progress(self, _: int) -> int:
+        """
+        Set by the test.
+        """
+        return self.progress
+
+    def get_target_name(self) -> str:
+        """
+        Name for logging.
+        """
+        return "fake"
+
+    def restart_worker(self, _: int) -> bool:
+        """
+        Counts restarts, a successful restart is a new worker in the same state.
+        """
+        self.restart_count += 1
+        if self.is_restart_successful:
+            self.generation += 1
+
+        return self.is_restart_successful
+
+
+@pytest.fixture()
+def controller() -> worker_controller.WorkerController:  # type: ignore
+    """
+    Controller with no requests.
+    """
+    yield worker_controller.WorkerController()  # type: ignore
+
+
+@pytest.fixture()
+def manager() -> FakeManager:  # type: ignore
+    """
+    Manager of a running worker.
+    """
+    yield FakeManager()  # type: ignore
+
+
+@pytest.fixture()
+def supervisor(
+    manager: FakeManager, controller: worker_controller.WorkerController
+) -> worker_supervisor.WorkerSupervisor:  # type: ignore
+    """
+    Supervisor of the manager.
+    """
+    result, test_logger = logger.Logger.create("test_worker_supervisor", False)
+    assert result
+    assert test_logger is not None
+
+    result, worker_supervisor_instance = worker_supervisor.WorkerSupervisor.create(
+        [manager], controller, HANG_TIMEOUT, INITIAL_BACKOFF, MAX_BACKOFF, test_logger
+    )
+    assert result
+    assert worker_supervisor_instance is not None
+
+    yield worker_supervisor_instance  # type: ignore
+
+
+class TestHang:
+    """
+    Workers whose progress counter stalls are restarted.
+    """
+
+    def test_stalled(
+        self, manager: FakeManager, supervisor: worker_supervisor.WorkerSupervisor
+    ) -> None:
+        """
+        No progress for longer than the hang timeout is a hang.
+        """
+        # Run
+        early_found_count = supervisor.check()
+        time.sleep(HANG_TIMEOUT * 2)
+        found_count = supervisor.check()
+
+        # Test
+        assert early_found_count == 0
+        assert found_count == 1
+        assert manager.restart_count == 1
+
+    def test_progressing(
+        self, manager: FakeManager, supervisor: worker_supervisor.WorkerSupervisor
+    ) -> None:
+        """
+        Progress between checks is not a hang, however long the checks are apart.
+        """
+        # Run
+        supervisor.check()
+        time.sleep(HANG_TIMEOUT * 2)
+        manager.progress += 1
+        found_count = supervisor.check()
+
+        # Test
+        assert found_count == 0
+        assert manager.restart_count == 0
+
+    def test_paused(
+        self,
+        manager: FakeManager,
+        controller: worker_controller.WorkerController,
+        supervisor: worker_supervisor.WorkerSupervisor,
+    ) -> None:
+        """
+        Paused workers do not progress, and are not hung.
+        """
+        # Setup
+        controller.request_pause()
+
+        # Run
+        supervisor.check()
+        time.sleep(HANG_TIMEOUT * 2)
+        found_count = supervisor.check()
+
+        # Test
+        assert found_count == 0
+        assert manager.restart_count == 0
+
+
+class TestBackoff:
+    """
+    Restarts of the same worker back off.
+    """
+
+    def test_doubling(
+        self, manager: FakeManager, supervisor: worker_supervisor.WorkerSupervisor
+    ) -> None:
+        """
+        Worker that keeps dying is restarted after the backoff, which doubles.
+        """
+        # Setup
+        manager.is_alive = False
+
+        # Run
+        supervisor.check()
+        supervisor.check()
+        restart_count_in_first_backoff = manager.restart_count
+        time.sleep(INITIAL_BACKOFF * 1.2)
+        supervisor.check()
+        time.sleep(INITIAL_BACKOFF * 1.2)
+        supervisor.check()
+        restart_count_in_second_backoff = manager.restart_count
+        time.sleep(INITIAL_BACKOFF * 1.5)
+        supervisor.check()
+
+        # Test
+        assert restart_count_in_first_backoff == 1
+        assert restart_count_in_second_backoff == 2
+        assert manager.restart_count == 3
+
+    def test_failed_restart(
+        self, manager: FakeManager, supervisor: worker_supervisor.WorkerSupervisor
+    ) -> None:
+        """
+        Failed restart backs off instead of being attempted on every check.
+        """
+        # Setup
+        manager.is_alive = False
+        manager.is_restart_successful = False
+
+        # Run
+        found_counts = [supervisor.check() for _ in range(3)]
+        restart_count_in_backoff = manager.restart_count
+        time.sleep(INITIAL_BACKOFF * 1.2)
+        supervisor.check()
+
+        # Test
+        assert found_counts == [1, 1, 1]
+        assert restart_count_in_backoff == 1
+        assert manager.restart_count == 2
+
+    def test_exit_requested(
+        self,
+        manager: FakeManager,
+        controller: worker_controller.WorkerController,
+        supervisor: worker_supervisor.WorkerSupervisor,
+    ) -> None:
+        """
+        Workers stopping at exit are not restarted.
+        """
+        # Setup
+        manager.is_alive = False
+        controller.request_exit()
+
+        # Run
+        found_count = supervisor.check()
+
+        # Test
+        assert found_count == 0
+        assert manager.restart_count == 0
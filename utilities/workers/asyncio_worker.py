@@ -0,0 +1,120 @@
+"""
+Asyncio task workers, run on an event loop in a thread of the main process.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+
+
+class EventLoopThread:
+    """
+    Event loop running in a daemon thread, shared by the asyncio workers of a worker manager.
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        name: Name of the thread.
+        """
+        self.__loop = asyncio.new_event_loop()
+        self.__thread = threading.Thread(target=self.__run, name=name, daemon=True)
+        self.__thread.start()
+
+    def __run(self) -> None:
+        """
+        Thread target.
+        """
+        asyncio.set_event_loop(self.__loop)
+        self.__loop.run_forever()
+
+    def submit(self, coroutine: "collections.abc.Coroutine") -> concurrent.futures.Future:
+        """
+        Schedules the coroutine as a task on the event loop.
+
+        Returns a future of the result of the coroutine.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.__loop)
+
+    def stop(self) -> None:
+        """
+        Stops the event loop once its current callbacks are done, and closes it.
+        Tasks still running are abandoned.
+        """
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+        self.__thread.join()
+        self.__loop.close()
+
+
+class AsyncioWorker:
+    """
+    Task with the parts of the `mp.Process` interface used by the worker manager.
+    A task that blocks without awaiting blocks every task on the event loop, and cannot be
+    stopped.
+    """
+
+    def __init__(
+        self,
+        loop_thread: EventLoopThread,
+        target: "(...) -> collections.abc.Coroutine",  # type: ignore
+        args: "tuple",
+        name: str,
+    ) -> None:
+        """
+        loop_thread: Event loop to run the task on.
+        target: Coroutine function.
+        args: Target function arguments.
+        name: Name of the worker.
+        """
+        self.__loop_thread = loop_thread
+        self.__target = target
+        self.__args = args
+        self.__future = None
+
+        self.name = name
+        # No process of its own
+        self.pid = None
+
+    def start(self) -> None:
+        """
+        Schedules the task.
+        """
+        assert self.__future is None, "Worker already started"
+        self.__future = self.__loop_thread.submit(self.__target(*self.__args))
+
+    def is_alive(self) -> bool:
+        """
+        Returns whether the task has started and not finished.
+        """
+        return self.__future is not None and not self.__future.done()
+
+    def join(self, timeout: "float | None" = None) -> None:
+        """
+        Waits for the task to finish.
+
+        timeout: Time waiting in seconds, None is forever.
+        """
+        if self.__future is None:
+            return
+
+        concurrent.futures.wait([self.__future], timeout)
+
+    def terminate(self) -> None:
+        """
+        Cancels the task, which raises `asyncio.CancelledError` at its current await.
+        """
+        if self.__future is not None:
+            self.__future.cancel()
+
+    @property
+    def exitcode(self) -> "int | None":
+        """
+        None while running, 0 if the task returned, otherwise 1 .
+        Cancelled tasks still run their finally blocks, so they are never negative.
+        """
+        if not self.is_alive() and self.__future is not None:
+            if self.__future.cancelled() or self.__future.exception() is not None:
+                return 1
+
+            return 0
+
+        return None
@@ -0,0 +1,420 @@
+"""
+Publish and subscribe channel in shared memory.
+"""
+
+import enum
+import multiprocessing as mp
+import multiprocessing.shared_memory
+import pickle
+import queue
+import struct
+import time
+
+
+class LagPolicy(enum.Enum):
+    """
+    What happens to a subscriber that falls a whole channel capacity behind.
+
+    BLOCK: The producer waits for the slowest subscriber, so no items are lost.
+    DROP_OLDEST: The subscriber loses its oldest unread items and continues from the oldest
+        item still in the channel.
+    SKIP_TO_LATEST: The subscriber loses all of its unread items except the newest.
+    """
+
+    BLOCK = 0
+    DROP_OLDEST = 1
+    SKIP_TO_LATEST = 2
+
+
+class BroadcastChannel:  # pylint: disable=too-many-instance-attributes
+    """
+    Ring buffer of fixed size slots in shared memory, where every item is written once and
+    read by every subscriber. Each subscriber has its own cursor in shared memory, so items
+    are not copied per subscriber and a restarted worker continues where it left off.
+
+    Workers that share a subscriber share its cursor, so they split its items between them
+    like consumers of a queue, while each subscriber still sees every item.
+
+    Write side of the `queue.Queue` interface, use subscribe() for the read side.
+    """
+
+    __SEQUENCE_FORMAT = struct.Struct("=Q")
+    # Per subscriber: sequence of the next item to read, and number of items lost to lag
+    __CURSOR_FORMAT = struct.Struct("=QQ")
+    __LENGTH_FORMAT = struct.Struct("=I")
+
+    DEFAULT_CAPACITY = 64
+    DEFAULT_SLOT_SIZE = 4096  # bytes
+
+    def __init__(
+        self,
+        capacity: int,
+        subscriber_count: int,
+        lag_policy: LagPolicy = LagPolicy.DROP_OLDEST,
+        slot_size: int = DEFAULT_SLOT_SIZE,
+    ) -> None:
+        """
+        Constructor allocates the shared memory and synchronization primitives.
+
+        capacity: Number of slots, must be greater than 0 .
+        subscriber_count: Number of subscribers, must be greater than 0 . With the block
+            policy, every subscriber must be read or the producer stops.
+        lag_policy: What happens to a subscriber that falls a whole capacity behind.
+        slot_size: Maximum size of a pickled item in bytes, must be greater than 0 .
+        """
+        if capacity <= 0:
+            raise ValueError(f"Capacity must be greater than 0, got {capacity}")
+
+        if subscriber_count <= 0:
+            raise ValueError(f"Subscriber count must be greater than 0, got {subscriber_count}")
+
+        if slot_size <= 0:
+            raise ValueError(f"Slot size must be greater than 0, got {slot_size}")
+
+        self.__capacity = capacity
+        self.__subscriber_count = subscriber_count
+        self.__lag_policy = lag_policy
+        self.__slot_size = slot_size
+        self.__stride = self.__LENGTH_FORMAT.size + slot_size
+        self.__slots_offset = (
+            self.__SEQUENCE_FORMAT.size + subscriber_count * self.__CURSOR_FORMAT.size
+        )
+
+        self.__shared_memory = multiprocessing.shared_memory.SharedMemory(
+            create=True,
+            size=self.__slots_offset + capacity * self.__stride,
+        )
+        self.__shared_memory.buf[: self.__slots_offset] = bytes(self.__slots_offset)
+
+        # Condition shares the lock, the producer waits on it for space with the block policy
+        # and subscribers wait on it for items
+        self.__lock = mp.Lock()
+        self.__condition = mp.Condition(self.__lock)
+
+    def __get_write_sequence(self) -> int:
+        """
+        Number of items written so far. Lock must be held.
+        """
+        return self.__SEQUENCE_FORMAT.unpack_from(self.__shared_memory.buf, 0)[0]
+
+    def __cursor_offset(self, index: int) -> int:
+        """
+        Byte offset of the cursor of the subscriber.
+        """
+        return self.__SEQUENCE_FORMAT.size + index * self.__CURSOR_FORMAT.size
+
+    def __get_cursor(self, index: int) -> "tuple[int, int]":
+        """
+        Next sequence to read and dropped count of the subscriber. Lock must be held.
+        """
+        return self.__CURSOR_FORMAT.unpack_from(
+            self.__shared_memory.buf, self.__cursor_offset(index)
+        )
+
+    def __set_cursor(self, index: int, sequence: int, dropped_count: int) -> None:
+        """
+        Lock must be held.
+        """
+        self.__CURSOR_FORMAT.pack_into(
+            self.__shared_memory.buf, self.__cursor_offset(index), sequence, dropped_count
+        )
+
+    def __slot_offset(self, sequence: int) -> int:
+        """
+        Byte offset of the slot for the sequence.
+        """
+        return self.__slots_offset + (sequence % self.__capacity) * self.__stride
+
+    def __get_lag(self, index: int) -> int:
+        """
+        Items written that the subscriber has not read, including overwritten ones.
+        Lock must be held.
+        """
+        return self.__get_write_sequence() - self.__get_cursor(index)[0]
+
+    def __has_space(self) -> bool:
+        """
+        Whether writing would not overwrite an unread item. Lock must be held.
+        """
+        return all(
+            self.__get_lag(index) < self.__capacity for index in range(self.__subscriber_count)
+        )
+
+    def __pickle(self, item: object) -> bytes:
+        """
+        Pickles the item and checks that it fits in a slot.
+        """
+        data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.__slot_size:
+            raise ValueError(
+                f"Pickled item is {len(data)} bytes, larger than slot size {self.__slot_size}"
+            )
+
+        return data
+
+    def __write_slot(self, data: bytes) -> None:
+        """
+        Writes the data into the next slot. Lock must be held.
+        """
+        buffer = self.__shared_memory.buf
+        write_sequence = self.__get_write_sequence()
+        offset = self.__slot_offset(write_sequence)
+        self.__LENGTH_FORMAT.pack_into(buffer, offset, len(data))
+        start = offset + self.__LENGTH_FORMAT.size
+        buffer[start : start + len(data)] = data
+        self.__SEQUENCE_FORMAT.pack_into(buffer, 0, write_sequence + 1)
+
+    def __read_slot(self, sequence: int) -> bytes:
+        """
+        Copies the data out of the slot for the sequence. Lock must be held.
+        """
+        buffer = self.__shared_memory.buf
+        offset = self.__slot_offset(sequence)
+        (length,) = self.__LENGTH_FORMAT.unpack_from(buffer, offset)
+        start = offset + self.__LENGTH_FORMAT.size
+        return bytes(buffer[start : start + length])
+
+    def put(self, item: object, block: bool = True, timeout: "float | None" = None) -> None:
+        """
+        Publishes the item to every subscriber.
+
+        item: Must be picklable and fit within the slot size once pickled.
+        block: Whether to wait for space with the block policy, other policies never wait.
+        timeout: Time waiting in seconds before raising `queue.Full`, None is forever.
+        """
+        if self.put_many([item], timeout if block else 0.0) == 0:
+            raise queue.Full
+
+    def put_many(self, items: "list[object]", timeout: "float | None" = None) -> int:
+        """
+        Publishes the items in order, taking the lock once for the batch.
+
+        items: Each must be picklable and fit within the slot size once pickled.
+        timeout: Time waiting in seconds for space with the block policy before giving up,
+            None is forever.
+
+        Returns the number of items put, which is less than the number of items on timeout.
+        """
+        datas = [self.__pickle(item) for item in items]
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        put_count = 0
+        with self.__condition:
+            for data in datas:
+                if self.__lag_policy == LagPolicy.BLOCK and not self.__has_space():
+                    # Subscribers may be waiting for the items written so far
+                    self.__condition.notify_all()
+                    remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+                    if not self.__condition.wait_for(self.__has_space, remaining):
+                        break
+
+                self.__write_slot(data)
+                put_count += 1
+
+            self.__condition.notify_all()
+
+        return put_count
+
+    def read(self, index: int, max_items: int, timeout: "float | None" = None) -> "list[object]":
+        """
+        Reads up to `max_items` items for the subscriber, waiting only for the first one.
+        Use subscribe() rather than calling this directly.
+
+        index: Index of the subscriber.
+        max_items: Maximum number of items to return, must be greater than 0 .
+        timeout: Time waiting in seconds for the first item, None is forever.
+
+        Returns the items in order, empty on timeout.
+        """
+        with self.__condition:
+            if not self.__condition.wait_for(lambda: self.__get_lag(index) > 0, timeout):
+                return []
+
+            write_sequence = self.__get_write_sequence()
+            sequence, dropped_count = self.__get_cursor(index)
+
+            # Overwritten items are lost, only possible without the block policy
+            oldest_sequence = write_sequence - self.__capacity
+            if sequence < oldest_sequence:
+                next_sequence = oldest_sequence
+                if self.__lag_policy == LagPolicy.SKIP_TO_LATEST:
+                    next_sequence = write_sequence - 1
+
+                dropped_count += next_sequence - sequence
+                sequence = next_sequence
+
+            read_count = min(max_items, write_sequence - sequence)
+            datas = [self.__read_slot(sequence + i) for i in range(read_count)]
+            self.__set_cursor(index, sequence + read_count, dropped_count)
+
+            if self.__lag_policy == LagPolicy.BLOCK:
+                self.__condition.notify_all()
+
+        return [pickle.loads(data) for data in datas]
+
+    def subscribe(self, index: int) -> "BroadcastSubscriber":
+        """
+        Returns the read side for the subscriber.
+
+        index: Index of the subscriber, less than the subscriber count.
+        """
+        if not 0 <= index < self.__subscriber_count:
+            raise ValueError(f"Subscriber index must be less than {self.__subscriber_count}")
+
+        return BroadcastSubscriber(self, index)
+
+    def get_subscriber_lag(self, index: int) -> int:
+        """
+        Returns the number of items the subscriber can still read.
+        """
+        with self.__lock:
+            return min(self.__get_lag(index), self.__capacity)
+
+    def get_dropped_count(self, index: int) -> int:
+        """
+        Returns the number of items the subscriber has lost to lag.
+        """
+        with self.__lock:
+            return self.__get_cursor(index)[1]
+
+    def discard(self) -> int:
+        """
+        Marks every item as read by every subscriber, without counting them as dropped.
+
+        Returns the largest number of items discarded for a subscriber.
+        """
+        with self.__condition:
+            write_sequence = self.__get_write_sequence()
+            discarded_count = 0
+            for index in range(self.__subscriber_count):
+                sequence, dropped_count = self.__get_cursor(index)
+                discarded_count = max(
+                    discarded_count, min(write_sequence - sequence, self.__capacity)
+                )
+                self.__set_cursor(index, write_sequence, dropped_count)
+
+            self.__condition.notify_all()
+
+        return discarded_count
+
+    def put_nowait(self, item: object) -> None:
+        """
+        Equivalent to put(item, False).
+        """
+        self.put(item, False)
+
+    def qsize(self) -> int:
+        """
+        Approximate number of items held for the slowest subscriber.
+        """
+        with self.__lock:
+            return max(
+                min(self.__get_lag(index), self.__capacity)
+                for index in range(self.__subscriber_count)
+            )
+
+    def empty(self) -> bool:
+        """
+        Whether every subscriber has approximately read every item.
+        """
+        return self.qsize() == 0
+
+    def full(self) -> bool:
+        """
+        Whether the next put would overwrite or, with the block policy, wait.
+        """
+        return self.qsize() >= self.__capacity
+
+    def get_capacity(self) -> int:
+        """
+        Returns the number of slots.
+        """
+        return self.__capacity
+
+    def get_subscriber_count(self) -> int:
+        """
+        Returns the number of subscribers.
+        """
+        return self.__subscriber_count
+
+    def close(self) -> None:
+        """
+        Detaches this process from the shared memory.
+        """
+        self.__shared_memory.close()
+
+    def unlink(self) -> None:
+        """
+        Frees the shared memory, only call once from the process that created the channel.
+        """
+        self.__shared_memory.unlink()
+
+
+class BroadcastSubscriber:
+    """
+    Read side of a broadcast channel for 1 subscriber.
+    Same interface as `queue.Queue` for get and size, raising `queue.Empty`.
+    """
+
+    def __init__(self, channel: BroadcastChannel, index: int) -> None:
+        """
+        channel: Channel to read.
+        index: Index of the subscriber.
+        """
+        self.__channel = channel
+        self.__index = index
+
+    def get(self, block: bool = True, timeout: "float | None" = None) -> object:
+        """
+        Returns the next item for this subscriber.
+
+        block: Whether to wait for an item.
+        timeout: Time waiting in seconds before raising `queue.Empty`, None is forever.
+        """
+        items = self.__channel.read(self.__index, 1, timeout if block else 0.0)
+        if len(items) == 0:
+            raise queue.Empty
+
+        return items[0]
+
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> "list[object]":
+        """
+        Returns up to `max_items` items, waiting only for the first one.
+        The lock is taken once for the whole batch.
+
+        max_items: Maximum number of items to return, must be greater than 0 .
+        timeout: Time waiting in seconds for the first item, None is forever.
+
+        Returns the items in order, empty on timeout.
+        """
+        return self.__channel.read(self.__index, max_items, timeout)
+
+    def get_nowait(self) -> object:
+        """
+        Equivalent to get(False).
+        """
+        return self.get(False)
+
+    def qsize(self) -> int:
+        """
+        Approximate number of items this subscriber can still read.
+        """
+        return self.__channel.get_subscriber_lag(self.__index)
+
+    def empty(self) -> bool:
+        """
+        Whether this subscriber has approximately read every item.
+        """
+        return self.qsize() == 0
+
+    def full(self) -> bool:
+        """
+        Whether this subscriber is approximately a whole capacity behind.
+        """
+        return self.qsize() >= self.__channel.get_capacity()
+
+    def get_dropped_count(self) -> int:
+        """
+        Returns the number of items this subscriber has lost to lag.
+        """
+        return self.__channel.get_dropped_count(self.__index)
@@ -0,0 +1,224 @@
+"""
+Conflating channel that only holds the most recent value.
+"""
+
+import multiprocessing as mp
+import multiprocessing.shared_memory
+import pickle
+import queue
+import struct
+import time
+
+
+class LatestValueChannel:
+    """
+    Single slot in shared memory protected by a sequence lock.
+    Every put overwrites the slot, so a slow reader skips stale values instead of working
+    through a backlog, and memory use is fixed.
+
+    Writers are serialized by a lock, readers never take the lock unless they wait.
+    The write sequence number counts puts, and is odd while a write is in progress.
+
+    Same interface as `queue.Queue` for put, get, and size. A get returns the newest value that
+    this instance has not returned yet, so each reader (process) has its own cursor.
+    """
+
+    __HEADER_FORMAT = struct.Struct("=QI")
+    # Retries of a read that raced a write before yielding to the writer
+    __MAX_SPIN_COUNT = 64
+
+    DEFAULT_SLOT_SIZE = 4096  # bytes
+
+    def __init__(self, slot_size: int = DEFAULT_SLOT_SIZE) -> None:
+        """
+        Constructor allocates the shared memory and synchronization primitives.
+
+        slot_size: Maximum size of a pickled value in bytes, must be greater than 0 .
+        """
+        if slot_size <= 0:
+            raise ValueError(f"Slot size must be greater than 0, got {slot_size}")
+
+        self.__slot_size = slot_size
+
+        self.__shared_memory = multiprocessing.shared_memory.SharedMemory(
+            create=True,
+            size=self.__HEADER_FORMAT.size + slot_size,
+        )
+        self.__HEADER_FORMAT.pack_into(self.__shared_memory.buf, 0, 0, 0)
+
+        # Condition shares the writer lock, it is only needed by readers that wait
+        self.__lock = mp.Lock()
+        self.__condition = mp.Condition(self.__lock)
+
+        # Sequence of the last value returned by get(), per instance
+        self.__last_sequence = 0
+
+    def __write_sequence(self) -> int:
+        """
+        Raw write sequence number.
+        """
+        return self.__HEADER_FORMAT.unpack_from(self.__shared_memory.buf, 0)[0]
+
+    # Same signature as queue.Queue
+    # pylint: disable-next=unused-argument
+    def put(self, item: object, block: bool = True, timeout: "float | None" = None) -> None:
+        """
+        Overwrites the slot with the item and wakes waiting readers. Never blocks on a full
+        channel, block and timeout are accepted for compatibility with `queue.Queue` .
+
+        item: Must be picklable and fit within the slot size once pickled.
+        """
+        data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.__slot_size:
+            raise ValueError(
+                f"Pickled item is {len(data)} bytes, larger than slot size {self.__slot_size}"
+            )
+
+        buffer = self.__shared_memory.buf
+        with self.__condition:
+            write_sequence = self.__write_sequence()
+
+            # Odd while writing so that readers retry
+            self.__HEADER_FORMAT.pack_into(buffer, 0, write_sequence + 1, len(data))
+            start = self.__HEADER_FORMAT.size
+            buffer[start : start + len(data)] = data
+            self.__HEADER_FORMAT.pack_into(buffer, 0, write_sequence + 2, len(data))
+
+            self.__condition.notify_all()
+
+    def read(self) -> "tuple[int, object]":
+        """
+        Reads the slot without taking the lock.
+
+        Returns the sequence number of the value (number of puts so far) and the value,
+        the value is None if nothing has been put yet.
+        """
+        buffer = self.__shared_memory.buf
+        start = self.__HEADER_FORMAT.size
+        spin_count = 0
+        while True:
+            write_sequence, length = self.__HEADER_FORMAT.unpack_from(buffer, 0)
+            if write_sequence % 2 == 0:
+                data = bytes(buffer[start : start + length])
+                if self.__write_sequence() == write_sequence:
+                    break
+
+            # A write is in progress, give the writer the CPU if it is not done soon
+            spin_count += 1
+            if spin_count >= self.__MAX_SPIN_COUNT:
+                spin_count = 0
+                time.sleep(0)
+
+        if write_sequence == 0:
+            return 0, None
+
+        return write_sequence // 2, pickle.loads(data)
+
+    def get_sequence(self) -> int:
+        """
+        Returns the sequence number of the latest value.
+        """
+        return self.__write_sequence() // 2
+
+    def wait_newer(
+        self, sequence: int, timeout: "float | None" = None
+    ) -> "tuple[bool, int, object]":
+        """
+        Waits until a value newer than the sequence number has been put.
+
+        sequence: Sequence number already seen.
+        timeout: Time waiting in seconds, None is forever.
+
+        Returns whether there is a newer value, and the latest sequence number and value.
+        """
+        if self.get_sequence() <= sequence:
+            with self.__condition:
+                self.__condition.wait_for(lambda: self.get_sequence() > sequence, timeout)
+
+        latest_sequence, value = self.read()
+        if latest_sequence <= sequence:
+            return False, latest_sequence, None
+
+        return True, latest_sequence, value
+
+    def get(self, block: bool = True, timeout: "float | None" = None) -> object:
+        """
+        Returns the latest value if it is newer than the last value returned to this instance.
+
+        block: Whether to wait for a newer value.
+        timeout: Time waiting in seconds before raising `queue.Empty`, None is forever.
+        """
+        if not block:
+            timeout = 0.0
+
+        result, sequence, value = self.wait_newer(self.__last_sequence, timeout)
+        if not result:
+            raise queue.Empty
+
+        self.__last_sequence = sequence
+        return value
+
+    def put_many(self, items: "list[object]", timeout: "float | None" = None) -> int:
+        """
+        Only the last item is kept, earlier items would be overwritten immediately.
+
+        Returns the number of items, as none are rejected.
+        """
+        if len(items) > 0:
+            self.put(items[-1], timeout=timeout)
+
+        return len(items)
+
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> "list[object]":
+        """
+        Returns a list with the latest value if it is newer, otherwise an empty list.
+        """
+        if max_items <= 0:
+            return []
+
+        try:
+            return [self.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+
+    def put_nowait(self, item: object) -> None:
+        """
+        Equivalent to put(item, False).
+        """
+        self.put(item, False)
+
+    def get_nowait(self) -> object:
+        """
+        Equivalent to get(False).
+        """
+        return self.get(False)
+
+    def qsize(self) -> int:
+        """
+        1 if there is a value newer than the last value returned to this instance, otherwise 0.
+        """
+        return int(self.get_sequence() > self.__last_sequence)
+
+    def empty(self) -> bool:
+        """
+        Whether there is no newer value for this instance.
+        """
+        return self.qsize() == 0
+
+    def full(self) -> bool:
+        """
+        Never full, puts overwrite.
+        """
+        return False
+
+    def close(self) -> None:
+        """
+        Detaches this process from the shared memory.
+        """
+        self.__shared_memory.close()
+
+    def unlink(self) -> None:
+        """
+        Frees the shared memory, only call once from the process that created the channel.
+        """
+        self.__shared_memory.unlink()
@@ -0,0 +1,436 @@
+"""
+For building queues and workers from a topology in the configuration.
+"""
+
+import multiprocessing.managers
+import time
+
+from modules.common.modules.logger import logger
+from utilities.workers import broadcast_channel
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import sharded_queue
+from utilities.workers import worker_controller
+from utilities.workers import worker_manager
+
+
+class Pipeline:
+    """
+    Queues and worker managers described by a topology, such as the "pipeline" section of the
+    configuration:
+
+    ```
+    queues:
+      <queue name>:
+        backend: MANAGER  # QueueBackend name, default see below
+        maxsize: 0  # Default 0 (infinite)
+        sentinels: 1  # Put at shutdown, default is the maximum worker count of its consumers
+        subscribers: 2  # Only BROADCAST, default is the number of stages it is an input of
+        lag_policy: DROP_OLDEST  # Only BROADCAST, LagPolicy name, default DROP_OLDEST
+        shards: 2  # Queue per worker by key, see ShardedQueue, default not sharded
+    stages:
+      <stage name>:
+        count: 1
+        max_count: 4  # Default count (not scaling)
+        backend: PROCESS  # WorkerBackend name, default PROCESS
+        start_method: fork  # Default is the default start method
+        cpu_affinity: [0]  # Default is any CPU
+        nice: 5  # Default is inherited from main
+        input_queues: [<queue name>]  # In the order the target takes them, default none
+        output_queues: [<queue name>]  # Default none
+    ```
+
+    Targets and work arguments are code, so they are given to create_workers() by stage
+    name. Work arguments can include queues from get_queue() (e.g. in a connection), and
+    those queues need their sentinels set if their consumers can be blocked on them.
+    Stages are started in order and stopped in reverse order.
+
+    A queue without a backend is IN_PROCESS if it connects stages and all of them are thread or
+    asyncio stages, otherwise MANAGER. Queues are only connected by input_queues and
+    output_queues, so give a queue in work arguments of process workers a backend explicitly.
+
+    Each stage with a broadcast queue as input gets its own subscriber, in stage order, so
+    every stage sees every item while the workers of a stage split them. Extra subscribers
+    are read through get_queue(name).subscribe(index) after those of the stages.
+
+    A sharded queue is 1 queue per worker of each stage it connects, so those stages need
+    exactly as many workers as shards. Settings such as maxsize and sentinels are per shard.
+    """
+
+    __create_key = object()
+
+    __QUEUE_KEYS = frozenset(
+        ["backend", "maxsize", "sentinels", "subscribers", "lag_policy", "shards"]
+    )
+    __STAGE_KEYS = frozenset(
+        [
+            "count",
+            "max_count",
+            "backend",
+            "start_method",
+            "cpu_affinity",
+            "nice",
+            "input_queues",
+            "output_queues",
+        ]
+    )
+
+    @classmethod
+    def create(
+        cls,
+        topology: "dict",
+        mp_manager: multiprocessing.managers.SyncManager,
+        controller: worker_controller.WorkerController,
+        local_logger: logger.Logger,
+    ) -> "tuple[bool, Pipeline | None]":
+        """
+        Validates the topology and creates its queues.
+
+        topology: Queues and stages as described above.
+        mp_manager: Manager for queues with the manager backend.
+        controller: Worker controller of all the workers.
+        local_logger: Existing logger from process.
+
+        Returns whether the topology is valid and the pipeline.
+        """
+        if not isinstance(topology, dict) or set(topology.keys()) != {"queues", "stages"}:
+            local_logger.error("Pipeline requires exactly queues and stages", True)
+            return False, None
+
+        queue_configs = topology["queues"]
+        stage_configs = topology["stages"]
+        if not isinstance(queue_configs, dict) or not isinstance(stage_configs, dict):
+            local_logger.error("Pipeline queues and stages must be mappings by name", True)
+            return False, None
+
+        for name, stage_config in stage_configs.items():
+            if not cls.__is_valid_stage(name, stage_config, queue_configs, local_logger):
+                return False, None
+
+        # Consuming stages by queue, in stage order
+        consumers = {
+            name: [
+                stage_name
+                for stage_name, stage_config in stage_configs.items()
+                if name in stage_config.get("input_queues", [])
+            ]
+            for name in queue_configs.keys()
+        }
+
+        for name, queue_config in queue_configs.items():
+            if not cls.__is_valid_queue(name, queue_config, len(consumers[name]), local_logger):
+                return False, None
+
+        # Producing and consuming stages by queue
+        endpoints = {
+            name: [
+                stage_name
+                for stage_name, stage_config in stage_configs.items()
+                if name in stage_config.get("input_queues", [])
+                or name in stage_config.get("output_queues", [])
+            ]
+            for name in queue_configs.keys()
+        }
+
+        queues = {}
+        sentinel_counts = {}
+        stage_input_queues = {name: [] for name in stage_configs.keys()}
+        for name, queue_config in queue_configs.items():
+            # Queues without settings are empty in YAML
+            queue_config = queue_config or {}
+            if "backend" in queue_config:
+                backend = queue_proxy_wrapper.QueueBackend[queue_config["backend"]]
+            elif len(endpoints[name]) > 0:
+                backend = worker_manager.select_queue_backend(
+                    [
+                        worker_manager.WorkerBackend[
+                            stage_configs[stage_name].get("backend", "PROCESS")
+                        ]
+                        for stage_name in endpoints[name]
+                    ],
+                    queue_proxy_wrapper.QueueBackend.MANAGER,
+                )
+            else:
+                backend = queue_proxy_wrapper.QueueBackend.MANAGER
+
+            shards = [
+                queue_proxy_wrapper.QueueProxyWrapper(
+                    mp_manager,
+                    queue_config.get("maxsize", 0),
+                    backend,
+                    subscriber_count=queue_config.get("subscribers", max(len(consumers[name]), 1)),
+                    lag_policy=broadcast_channel.LagPolicy[
+                        queue_config.get("lag_policy", "DROP_OLDEST")
+                    ],
+                )
+                for _ in range(queue_config.get("shards", 1))
+            ]
+            queues[name] = shards[0]
+            if "shards" in queue_config:
+                queues[name] = sharded_queue.ShardedQueue(shards)
+
+            # Workers of a consumer of a sharded queue each have their own shard
+            consumer_worker_counts = [
+                (
+                    1
+                    if "shards" in queue_config
+                    else stage_configs[stage_name].get(
+                        "max_count", stage_configs[stage_name]["count"]
+                    )
+                )
+                for stage_name in consumers[name]
+            ]
+            if backend == queue_proxy_wrapper.QueueBackend.BROADCAST:
+                # Each worker of a consumer can be blocked on its subscriber
+                sentinel_counts[name] = queue_config.get(
+                    "sentinels", max(consumer_worker_counts, default=0)
+                )
+            else:
+                # Each worker of each consumer can be blocked on the queue
+                sentinel_counts[name] = queue_config.get("sentinels", sum(consumer_worker_counts))
+
+        for stage_name, stage_config in stage_configs.items():
+            for name in stage_config.get("input_queues", []):
+                if queues[name].backend == queue_proxy_wrapper.QueueBackend.BROADCAST:
+                    stage_input_queues[stage_name].append(
+                        queues[name].subscribe(consumers[name].index(stage_name))
+                    )
+                else:
+                    stage_input_queues[stage_name].append(queues[name])
+
+        return True, Pipeline(
+            cls.__create_key,
+            stage_configs,
+            queues,
+            stage_input_queues,
+            sentinel_counts,
+            controller,
+            local_logger,
+        )
+
+    @classmethod
+    def __is_valid_queue(
+        cls,
+        name: str,
+        queue_config: "dict | None",
+        consumer_count: int,
+        local_logger: logger.Logger,
+    ) -> bool:
+        """
+        Logs the first problem with the queue configuration.
+        """
+        queue_config = queue_config or {}
+        if not isinstance(queue_config, dict) or not set(queue_config.keys()) <= cls.__QUEUE_KEYS:
+            local_logger.error(f"Queue {name} has unknown settings: {queue_config}", True)
+            return False
+
+        backend = queue_config.get("backend", "MANAGER")
+        if backend not in queue_proxy_wrapper.QueueBackend.__members__:
+            local_logger.error(f"Queue {name} has unknown backend: {backend}", True)
+            return False
+
+        for key in ["maxsize", "sentinels"]:
+            value = queue_config.get(key, 0)
+            if not isinstance(value, int) or value < 0:
+                local_logger.error(f"Queue {name} {key} must be at least 0, got {value}", True)
+                return False
+
+        shard_count = queue_config.get("shards", 1)
+        if not isinstance(shard_count, int) or shard_count < 1:
+            local_logger.error(f"Queue {name} shards must be at least 1, got {shard_count}", True)
+            return False
+
+        if backend != "BROADCAST":
+            if "subscribers" in queue_config or "lag_policy" in queue_config:
+                local_logger.error(f"Queue {name} has subscriber settings but no subscribers", True)
+                return False
+
+            return True
+
+        subscriber_count = queue_config.get("subscribers", consumer_count)
+        if not isinstance(subscriber_count, int) or subscriber_count < max(consumer_count, 1):
+            local_logger.error(
+                f"Queue {name} needs a subscriber for each of its {consumer_count} consuming "
+                f"stages, got {subscriber_count}",
+                True,
+            )
+            return False
+
+        lag_policy = queue_config.get("lag_policy", "DROP_OLDEST")
+        if lag_policy not in broadcast_channel.LagPolicy.__members__:
+            local_logger.error(f"Queue {name} has unknown lag policy: {lag_policy}", True)
+            return False
+
+        return True
+
+    @classmethod
+    def __is_valid_stage(
+        cls,
+        name: str,
+        stage_config: "dict",
+        queue_configs: "dict",
+        local_logger: logger.Logger,
+    ) -> bool:
+        """
+        Logs the first problem with the stage configuration. The rest is checked by
+        WorkerProperties.
+        """
+        if not isinstance(stage_config, dict) or not set(stage_config.keys()) <= cls.__STAGE_KEYS:
+            local_logger.error(f"Stage {name} has unknown settings: {stage_config}", True)
+            return False
+
+        if not isinstance(stage_config.get("count"), int):
+            local_logger.error(f"Stage {name} requires an integer count", True)
+            return False
+
+        backend = stage_config.get("backend", "PROCESS")
+        if backend not in worker_manager.WorkerBackend.__members__:
+            local_logger.error(f"Stage {name} has unknown backend: {backend}", True)
+            return False
+
+        for key in ["input_queues", "output_queues"]:
+            if not isinstance(stage_config.get(key, []), list):
+                local_logger.error(f"Stage {name} {key} must be a list", True)
+                return False
+
+            for queue_name in stage_config.get(key, []):
+                if queue_name not in queue_configs:
+                    local_logger.error(f"Stage {name} has unknown queue: {queue_name}", True)
+                    return False
+
+        return True
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        stage_configs: "dict[str, dict]",
+        queues: "dict[str, queue_proxy_wrapper.QueueProxyWrapper | sharded_queue.ShardedQueue]",
+        stage_input_queues: "dict[str, list]",
+        sentinel_counts: "dict[str, int]",
+        controller: worker_controller.WorkerController,
+        local_logger: logger.Logger,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is Pipeline.__create_key, "Use create() method"
+
+        self.__stage_configs = stage_configs
+        self.__queues = queues
+        self.__stage_input_queues = stage_input_queues
+        self.__sentinel_counts = sentinel_counts
+        self.__controller = controller
+        self.__local_logger = local_logger
+
+        self.__worker_managers = {}
+
+    def get_queue(
+        self, name: str
+    ) -> "queue_proxy_wrapper.QueueProxyWrapper | sharded_queue.ShardedQueue":
+        """
+        Returns the queue with the name, the write side for the broadcast backend.
+        """
+        return self.__queues[name]
+
+    def create_workers(self, stages: "dict[str, tuple[(...) -> object, tuple]]") -> bool:  # type: ignore
+        """
+        Creates the worker managers of the stages, without starting them.
+
+        stages: Target and work arguments of every stage, by stage name.
+
+        Returns whether all worker managers were created.
+        """
+        if set(stages.keys()) != set(self.__stage_configs.keys()):
+            self.__local_logger.error(
+                f"Stages {sorted(stages.keys())} do not match the topology "
+                f"{sorted(self.__stage_configs.keys())}",
+                True,
+            )
+            return False
+
+        for name, stage_config in self.__stage_configs.items():
+            target, work_arguments = stages[name]
+            cpu_affinity = stage_config.get("cpu_affinity")
+
+            result, properties = worker_manager.WorkerProperties.create(
+                count=stage_config["count"],
+                target=target,
+                work_arguments=work_arguments,
+                input_queues=self.__stage_input_queues[name],
+                output_queues=[
+                    self.__queues[queue] for queue in stage_config.get("output_queues", [])
+                ],
+                controller=self.__controller,
+                local_logger=self.__local_logger,
+                max_count=stage_config.get("max_count"),
+                backend=worker_manager.WorkerBackend[stage_config.get("backend", "PROCESS")],
+                start_method=stage_config.get("start_method"),
+                cpu_affinity=None if cpu_affinity is None else set(cpu_affinity),
+                nice=stage_config.get("nice"),
+            )
+            if not result:
+                self.__local_logger.error(f"Failed to create worker properties for {name}", True)
+                return False
+
+            # Get Pylance to stop complaining
+            assert properties is not None
+
+            result, manager = worker_manager.WorkerManager.create(properties, self.__local_logger)
+            if not result:
+                self.__local_logger.error(f"Failed to create worker manager for {name}", True)
+                return False
+
+            # Get Pylance to stop complaining
+            assert manager is not None
+
+            self.__worker_managers[name] = manager
+
+        return True
+
+    def get_worker_manager(self, name: str) -> worker_manager.WorkerManager:
+        """
+        Returns the worker manager of the stage, after create_workers() .
+        """
+        return self.__worker_managers[name]
+
+    def get_worker_managers(self) -> "list[worker_manager.WorkerManager]":
+        """
+        Returns the worker managers of all stages in order, after create_workers() .
+        """
+        return list(self.__worker_managers.values())
+
+    def start_workers(self) -> None:
+        """
+        Starts the workers of every stage in order.
+        """
+        for manager in self.__worker_managers.values():
+            manager.start_workers()
+
+    def stop(self, timeout: float) -> float:
+        """
+        Stops the workers and frees the queues, call after requesting exit.
+        Queues are closed and stages joined in reverse order within the timeout, then workers
+        still running are stopped forcibly. Queues are not freed while thread workers that
+        could not be stopped may still use them.
+
+        timeout: Time in seconds for the workers to stop by themselves.
+
+        Returns the time taken in seconds.
+        """
+        start_time = time.monotonic()
+        deadline = start_time + timeout
+
+        for name in reversed(self.__queues.keys()):
+            self.__queues[name].close(self.__sentinel_counts[name], deadline)
+
+        is_stopped = True
+        for name in reversed(self.__worker_managers.keys()):
+            manager = self.__worker_managers[name]
+            if not manager.join_workers(deadline):
+                self.__local_logger.warning(f"Stopping {name} workers forcibly", True)
+                is_stopped = manager.stop_workers() and is_stopped
+
+        if is_stopped:
+            for queue in self.__queues.values():
+                queue.release()
+
+        return time.monotonic() - start_time
@@ -2,24 +2,174 @@
 Queue.
 """
 
+import copy
+import enum
 import multiprocessing.managers
 import queue
 import time
 
+from . import broadcast_channel
+from . import latest_value_channel
+from . import shared_memory_queue
+
+
+class QueueBackend(enum.Enum):
+    """
+    Underlying queue implementation.
+
+    MANAGER: Queue proxy from a SyncManager, every call is a round trip to the manager process.
+    SHARED_MEMORY: Bounded ring buffer in shared memory, no manager process in the data path.
+    LATEST_VALUE: Single conflating slot in shared memory, readers only see the newest item.
+    IN_PROCESS: `queue.Queue`, only for edges between thread and asyncio workers and main.
+    BROADCAST: Ring buffer in shared memory written once and read by every subscriber,
+        consumers read through subscribe().
+    """
+
+    MANAGER = 0
+    SHARED_MEMORY = 1
+    LATEST_VALUE = 2
+    IN_PROCESS = 3
+    BROADCAST = 4
+
 
 class QueueProxyWrapper:
     """
     Wrapper for an underlying queue proxy which also stores `maxsize`.
 
     `maxsize <= 0` means infinite size.
+    The shared memory backend is always bounded, so `maxsize <= 0` uses its default capacity.
+    The latest value backend holds exactly 1 item, so `maxsize` is always 1 .
+    The broadcast backend is bounded per subscriber like the shared memory backend.
     """
 
     __QUEUE_TIMEOUT = 0.1  # seconds
     __QUEUE_DELAY = 0.1  # seconds
+    __DRAIN_BATCH_SIZE = 64
+
+    # Backends with only the `queue.Queue` interface, without batch methods or resources
+    __QUEUE_INTERFACE_BACKENDS = frozenset([QueueBackend.MANAGER, QueueBackend.IN_PROCESS])
+
+    def __init__(
+        self,
+        mp_manager: multiprocessing.managers.SyncManager | None,
+        maxsize: int = 0,
+        backend: QueueBackend = QueueBackend.MANAGER,
+        slot_size: int = shared_memory_queue.SharedMemoryQueue.DEFAULT_SLOT_SIZE,
+        subscriber_count: int = 1,
+        lag_policy: broadcast_channel.LagPolicy = broadcast_channel.LagPolicy.DROP_OLDEST,
+    ) -> None:
+        """
+        mp_manager: Manager to create the queue proxy, only required for the manager backend.
+            Also ignored by the in process backend.
+        maxsize: Maximum number of items.
+        backend: Underlying queue implementation.
+        slot_size: Maximum size of a pickled item in bytes, only for the shared memory backends.
+        subscriber_count: Number of subscribers, only for the broadcast backend.
+        lag_policy: What happens to a slow subscriber, only for the broadcast backend.
+        """
+        if backend == QueueBackend.MANAGER:
+            assert mp_manager is not None, "Manager backend requires a manager"
+            self.queue = mp_manager.Queue(maxsize)
+        elif backend == QueueBackend.SHARED_MEMORY:
+            capacity = maxsize
+            if capacity <= 0:
+                capacity = shared_memory_queue.SharedMemoryQueue.DEFAULT_CAPACITY
+
+            self.queue = shared_memory_queue.SharedMemoryQueue(capacity, slot_size)
+        elif backend == QueueBackend.LATEST_VALUE:
+            maxsize = 1
+            self.queue = latest_value_channel.LatestValueChannel(slot_size)
+        elif backend == QueueBackend.IN_PROCESS:
+            self.queue = queue.Queue(maxsize)
+        elif backend == QueueBackend.BROADCAST:
+            capacity = maxsize
+            if capacity <= 0:
+                capacity = broadcast_channel.BroadcastChannel.DEFAULT_CAPACITY
+
+            self.queue = broadcast_channel.BroadcastChannel(
+                capacity, subscriber_count, lag_policy, slot_size
+            )
+        else:
+            raise ValueError(f"Unknown queue backend: {backend}")
 
-    def __init__(self, mp_manager: multiprocessing.managers.SyncManager, maxsize: int = 0) -> None:
-        self.queue = mp_manager.Queue(maxsize)
         self.maxsize = maxsize
+        self.backend = backend
+
+    def subscribe(self, index: int) -> "QueueProxyWrapper":
+        """
+        Returns a queue to read the broadcast backend as the subscriber, for the consumers.
+        Consumers sharing a subscriber split its items between them.
+
+        index: Index of the subscriber, less than the subscriber count.
+        """
+        assert self.backend == QueueBackend.BROADCAST, "Only the broadcast backend has subscribers"
+
+        subscriber = copy.copy(self)
+        subscriber.queue = self.queue.subscribe(index)
+        return subscriber
+
+    def put_many(self, items: "list[object]", timeout: "float | None" = None) -> int:
+        """
+        Puts the items into the queue in order.
+        The shared memory backend moves the whole batch under one lock,
+        the manager backend still needs one round trip per item,
+        the in process backend one lock per item,
+        and the latest value backend only keeps the last item.
+
+        items: Items to put.
+        timeout: Time waiting in seconds for space before giving up, None is forever.
+
+        Returns the number of items put, which is less than the number of items on timeout.
+        """
+        if self.backend not in self.__QUEUE_INTERFACE_BACKENDS:
+            return self.queue.put_many(items, timeout)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        put_count = 0
+        try:
+            for item in items:
+                remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+                self.queue.put(item, timeout=remaining)
+                put_count += 1
+        except queue.Full:
+            pass
+
+        return put_count
+
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> "list[object]":
+        """
+        Removes and returns up to `max_items` items, waiting only for the first one.
+        The shared memory backend moves the whole batch under one lock,
+        the manager backend still needs one round trip per item,
+        the in process backend one lock per item,
+        and the latest value backend returns at most 1 item.
+
+        max_items: Maximum number of items to return, must be greater than 0 .
+        timeout: Time waiting in seconds for the first item, None is forever.
+
+        Returns the items in order, empty on timeout.
+        """
+        if self.backend not in self.__QUEUE_INTERFACE_BACKENDS:
+            return self.queue.get_many(max_items, timeout)
+
+        items = []
+        try:
+            items.append(self.queue.get(timeout=timeout))
+            while len(items) < max_items:
+                items.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        return items
+
+    def qsize(self) -> int:
+        """
+        Approximate number of items waiting, for monitoring rather than synchronization.
+        For a broadcast subscriber it is the number of items that subscriber has not read,
+        and for the queue from the constructor the most of any subscriber.
+        The latest value backend is 1 while it has a value newer than this instance has read.
+        """
+        return self.queue.qsize()
 
     def fill_queue_with_sentinel(self, timeout: float = 0.0) -> None:
         """
@@ -58,3 +208,51 @@ class QueueProxyWrapper:
         self.fill_queue_with_sentinel()
         time.sleep(self.__QUEUE_DELAY)
         self.drain_queue()
+
+    def close(self, sentinel_count: int, deadline: float) -> int:
+        """
+        Unblocks the workers using the queue at shutdown, call after requesting exit.
+        Discards the items so that producers blocked on a full queue can put, then puts a
+        sentinel (None) per consumer so that consumers blocked on an empty queue get one.
+        Stops at the deadline, so the time taken does not depend on the queue size.
+
+        For the broadcast backend, call on the queue from the constructor. Every subscriber
+        gets every sentinel, so the sentinel count is per subscriber.
+
+        sentinel_count: Number of sentinels, 0 for consumers that cannot handle them.
+        deadline: Monotonic time in seconds to give up at.
+
+        Returns the number of items discarded, the most of any subscriber for the broadcast
+        backend.
+        """
+        discarded_count = 0
+        if self.backend == QueueBackend.BROADCAST:
+            discarded_count = self.queue.discard()
+        else:
+            while time.monotonic() < deadline:
+                items = self.get_many(self.__DRAIN_BATCH_SIZE, 0.0)
+                if len(items) == 0:
+                    break
+
+                discarded_count += len(items)
+
+        try:
+            for _ in range(sentinel_count):
+                self.queue.put(None, timeout=max(deadline - time.monotonic(), 0.0))
+        except queue.Full:
+            pass
+
+        return discarded_count
+
+    def release(self) -> None:
+        """
+        Frees resources held by the backend, only call once from main after all workers have
+        stopped. Does nothing for the manager backend as the manager owns the queue,
+        for the in process backend, or for a broadcast subscriber.
+        """
+        if isinstance(self.queue, broadcast_channel.BroadcastSubscriber):
+            return
+
+        if self.backend not in self.__QUEUE_INTERFACE_BACKENDS:
+            self.queue.close()
+            self.queue.unlink()
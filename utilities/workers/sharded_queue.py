@@ -0,0 +1,174 @@
+"""
+Queues partitioned by key, for stages that keep state per key.
+"""
+
+import bisect
+import hashlib
+
+from . import queue_proxy_wrapper
+
+
+class ConsistentHashRing:
+    """
+    Maps keys to shards by consistent hashing: each shard owns many points on a ring of
+    hashes, and a key belongs to the shard owning the next point after the hash of the key.
+    Changing the number of shards only moves about 1 in that many keys.
+
+    Hashes are stable across processes and runs, unlike `hash()` .
+    """
+
+    DEFAULT_POINTS_PER_SHARD = 64
+
+    def __init__(self, shard_count: int, points_per_shard: int = DEFAULT_POINTS_PER_SHARD) -> None:
+        """
+        shard_count: Number of shards, must be greater than 0 .
+        points_per_shard: Points of each shard on the ring, more spreads keys more evenly.
+        """
+        if shard_count <= 0:
+            raise ValueError(f"Shard count must be greater than 0, got {shard_count}")
+
+        if points_per_shard <= 0:
+            raise ValueError(f"Points per shard must be greater than 0, got {points_per_shard}")
+
+        points = sorted(
+            (self.__hash(f"{shard}:{point}"), shard)
+            for shard in range(shard_count)
+            for point in range(points_per_shard)
+        )
+        self.__hashes = [point_hash for point_hash, _ in points]
+        self.__shards = [shard for _, shard in points]
+        self.__shard_count = shard_count
+
+    @staticmethod
+    def __hash(key: str) -> int:
+        """
+        Stable 64 bit hash.
+        """
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+    def get_shard(self, key: "int | str") -> int:
+        """
+        Returns the index of the shard of the key.
+        """
+        index = bisect.bisect(self.__hashes, self.__hash(str(key)))
+        return self.__shards[index % len(self.__shards)]
+
+    def get_shard_count(self) -> int:
+        """
+        Returns the number of shards.
+        """
+        return self.__shard_count
+
+
+class ShardedQueue:
+    """
+    One queue per worker of a stage, where items are put into the shard of their key
+    (e.g. the system ID of a vehicle), so every item of a key goes to the same worker.
+
+    Pass it to WorkerProperties as an input or output queue and worker `i` gets shard `i`, so
+    the stage needs exactly as many workers as shards. Stages with the same number of shards
+    agree on which worker has which keys.
+    """
+
+    # MAVLink system IDs are 8 bit, so their shards are looked up rather than hashed
+    __CACHED_KEY_COUNT = 256
+
+    def __init__(self, shards: "list[queue_proxy_wrapper.QueueProxyWrapper]") -> None:
+        """
+        shards: Queue of each shard, all of the same backend.
+        """
+        if len(shards) == 0:
+            raise ValueError("Sharded queue requires at least 1 shard")
+
+        if len({shard.backend for shard in shards}) != 1:
+            raise ValueError("Shards must all be of the same backend")
+
+        self.__shards = shards
+        self.__ring = ConsistentHashRing(len(shards))
+        self.__cached_shards = [
+            self.__ring.get_shard(key) for key in range(self.__CACHED_KEY_COUNT)
+        ]
+
+    @property
+    def backend(self) -> queue_proxy_wrapper.QueueBackend:
+        """
+        Backend of the shards.
+        """
+        return self.__shards[0].backend
+
+    def get_shard_index(self, key: int) -> int:
+        """
+        Returns the index of the shard of the key.
+        """
+        if 0 <= key < self.__CACHED_KEY_COUNT:
+            return self.__cached_shards[key]
+
+        return self.__ring.get_shard(key)
+
+    def get_shard(self, key: int) -> queue_proxy_wrapper.QueueProxyWrapper:
+        """
+        Returns the queue of the shard of the key.
+        """
+        return self.__shards[self.get_shard_index(key)]
+
+    def get_shards(self) -> "list[queue_proxy_wrapper.QueueProxyWrapper]":
+        """
+        Returns the queues of all shards, by shard index.
+        """
+        return self.__shards
+
+    def subscribe(self, index: int) -> "ShardedQueue":
+        """
+        Returns the subscriber of every shard for the broadcast backend, see
+        QueueProxyWrapper.subscribe() .
+        """
+        return ShardedQueue([shard.subscribe(index) for shard in self.__shards])
+
+    def qsize(self) -> int:
+        """
+        Approximate number of items waiting in all shards, see QueueProxyWrapper.qsize() .
+        """
+        return sum(shard.qsize() for shard in self.__shards)
+
+    def close(self, sentinel_count: int, deadline: float) -> int:
+        """
+        Closes every shard, see QueueProxyWrapper.close() .
+
+        sentinel_count: Number of sentinels for each shard.
+        deadline: Monotonic time in seconds to give up at.
+
+        Returns the number of items discarded.
+        """
+        return sum(shard.close(sentinel_count, deadline) for shard in self.__shards)
+
+    def release(self) -> None:
+        """
+        Frees every shard, see QueueProxyWrapper.release() .
+        """
+        for shard in self.__shards:
+            shard.release()
+
+
+class PerWorker:
+    """
+    Work argument with a value for each worker of a stage, worker `i` gets value `i`. Used for
+    arguments built from the shards of a sharded queue, such as a connection per shard.
+    """
+
+    def __init__(self, values: list) -> None:
+        """
+        values: Value of each worker, by worker index.
+        """
+        if len(values) == 0:
+            raise ValueError("Per worker argument requires at least 1 value")
+
+        self.__values = values
+
+    def get(self, index: int) -> object:
+        """
+        Returns the value of the worker.
+        """
+        return self.__values[index]
+
+    def __len__(self) -> int:
+        return len(self.__values)
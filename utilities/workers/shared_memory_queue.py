@@ -0,0 +1,249 @@
+"""
+Bounded ring buffer queue in shared memory.
+"""
+
+import multiprocessing as mp
+import multiprocessing.shared_memory
+import pickle
+import queue
+import struct
+import time
+
+
+class SharedMemoryQueue:
+    """
+    Multiple producer, multiple consumer FIFO queue backed by a ring buffer of fixed size slots
+    in shared memory. Items are pickled directly into the slots, so there is no manager server
+    process in the data path.
+
+    Same interface as `queue.Queue` for put, get, and size, raising `queue.Full` and `queue.Empty`.
+    """
+
+    # Head and tail are monotonic counters, slot index is counter % capacity
+    __HEADER_FORMAT = struct.Struct("=QQ")
+    __LENGTH_FORMAT = struct.Struct("=I")
+
+    DEFAULT_CAPACITY = 256
+    DEFAULT_SLOT_SIZE = 4096  # bytes
+
+    def __init__(self, capacity: int, slot_size: int = DEFAULT_SLOT_SIZE) -> None:
+        """
+        Constructor allocates the shared memory and synchronization primitives.
+
+        capacity: Number of slots, must be greater than 0 .
+        slot_size: Maximum size of a pickled item in bytes, must be greater than 0 .
+        """
+        if capacity <= 0:
+            raise ValueError(f"Capacity must be greater than 0, got {capacity}")
+
+        if slot_size <= 0:
+            raise ValueError(f"Slot size must be greater than 0, got {slot_size}")
+
+        self.__capacity = capacity
+        self.__slot_size = slot_size
+        self.__stride = self.__LENGTH_FORMAT.size + slot_size
+
+        self.__shared_memory = multiprocessing.shared_memory.SharedMemory(
+            create=True,
+            size=self.__HEADER_FORMAT.size + capacity * self.__stride,
+        )
+        self.__HEADER_FORMAT.pack_into(self.__shared_memory.buf, 0, 0, 0)
+
+        # Lock protects head and tail, semaphores count filled and empty slots
+        self.__lock = mp.Lock()
+        self.__filled = mp.Semaphore(0)
+        self.__empty = mp.Semaphore(capacity)
+
+    def __slot_offset(self, counter: int) -> int:
+        """
+        Byte offset of the slot for the counter.
+        """
+        return self.__HEADER_FORMAT.size + (counter % self.__capacity) * self.__stride
+
+    def __write_slot(self, data: bytes) -> None:
+        """
+        Writes the data into the tail slot and advances the tail.
+        Caller must hold the lock and a reserved empty slot.
+        """
+        buffer = self.__shared_memory.buf
+        head, tail = self.__HEADER_FORMAT.unpack_from(buffer, 0)
+        offset = self.__slot_offset(tail)
+        self.__LENGTH_FORMAT.pack_into(buffer, offset, len(data))
+        start = offset + self.__LENGTH_FORMAT.size
+        buffer[start : start + len(data)] = data
+        self.__HEADER_FORMAT.pack_into(buffer, 0, head, tail + 1)
+
+    def __read_slot(self) -> bytes:
+        """
+        Copies the data out of the head slot and advances the head.
+        Caller must hold the lock and a reserved filled slot.
+        """
+        buffer = self.__shared_memory.buf
+        head, tail = self.__HEADER_FORMAT.unpack_from(buffer, 0)
+        offset = self.__slot_offset(head)
+        (length,) = self.__LENGTH_FORMAT.unpack_from(buffer, offset)
+        start = offset + self.__LENGTH_FORMAT.size
+        data = bytes(buffer[start : start + length])
+        self.__HEADER_FORMAT.pack_into(buffer, 0, head + 1, tail)
+        return data
+
+    def put(self, item: object, block: bool = True, timeout: "float | None" = None) -> None:
+        """
+        Puts the item into the queue.
+
+        item: Must be picklable and fit within the slot size once pickled.
+        block: Whether to wait for an empty slot.
+        timeout: Time waiting in seconds before raising `queue.Full`, None is forever.
+        """
+        data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.__slot_size:
+            raise ValueError(
+                f"Pickled item is {len(data)} bytes, larger than slot size {self.__slot_size}"
+            )
+
+        if not self.__empty.acquire(block, timeout):
+            raise queue.Full
+
+        with self.__lock:
+            self.__write_slot(data)
+
+        self.__filled.release()
+
+    def get(self, block: bool = True, timeout: "float | None" = None) -> object:
+        """
+        Removes and returns an item from the queue.
+
+        block: Whether to wait for a filled slot.
+        timeout: Time waiting in seconds before raising `queue.Empty`, None is forever.
+        """
+        if not self.__filled.acquire(block, timeout):
+            raise queue.Empty
+
+        with self.__lock:
+            data = self.__read_slot()
+
+        self.__empty.release()
+
+        return pickle.loads(data)
+
+    def put_many(self, items: "list[object]", timeout: "float | None" = None) -> int:
+        """
+        Puts the items into the queue in order, taking the lock once per run of empty slots
+        rather than once per item.
+
+        items: Each must be picklable and fit within the slot size once pickled.
+        timeout: Time waiting in seconds for empty slots before giving up, None is forever.
+
+        Returns the number of items put, which is less than the number of items on timeout.
+        """
+        datas = [pickle.dumps(item, pickle.HIGHEST_PROTOCOL) for item in items]
+        for data in datas:
+            if len(data) > self.__slot_size:
+                raise ValueError(
+                    f"Pickled item is {len(data)} bytes, larger than slot size {self.__slot_size}"
+                )
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        put_count = 0
+        while put_count < len(datas):
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            if not self.__empty.acquire(True, remaining):
+                break
+
+            # Reserve as many further slots as are free without waiting
+            reserved = 1
+            while put_count + reserved < len(datas) and self.__empty.acquire(False):
+                reserved += 1
+
+            with self.__lock:
+                for data in datas[put_count : put_count + reserved]:
+                    self.__write_slot(data)
+
+            for _ in range(reserved):
+                self.__filled.release()
+
+            put_count += reserved
+
+        return put_count
+
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> "list[object]":
+        """
+        Removes and returns up to `max_items` items, waiting only for the first one.
+        The lock is taken once for the whole batch.
+
+        max_items: Maximum number of items to return, must be greater than 0 .
+        timeout: Time waiting in seconds for the first item, None is forever.
+
+        Returns the items in order, empty on timeout.
+        """
+        if not self.__filled.acquire(True, timeout):
+            return []
+
+        reserved = 1
+        while reserved < max_items and self.__filled.acquire(False):
+            reserved += 1
+
+        with self.__lock:
+            datas = [self.__read_slot() for _ in range(reserved)]
+
+        for _ in range(reserved):
+            self.__empty.release()
+
+        return [pickle.loads(data) for data in datas]
+
+    def put_nowait(self, item: object) -> None:
+        """
+        Equivalent to put(item, False).
+        """
+        self.put(item, False)
+
+    def get_nowait(self) -> object:
+        """
+        Equivalent to get(False).
+        """
+        return self.get(False)
+
+    def qsize(self) -> int:
+        """
+        Approximate number of items in the queue.
+        """
+        with self.__lock:
+            head, tail = self.__HEADER_FORMAT.unpack_from(self.__shared_memory.buf, 0)
+
+        return tail - head
+
+    def empty(self) -> bool:
+        """
+        Whether the queue is approximately empty.
+        """
+        return self.qsize() == 0
+
+    def full(self) -> bool:
+        """
+        Whether the queue is approximately full.
+        """
+        return self.qsize() >= self.__capacity
+
+    def get_capacity(self) -> int:
+        """
+        Returns the number of slots.
+        """
+        return self.__capacity
+
+    def get_slot_size(self) -> int:
+        """
+        Returns the maximum size of a pickled item in bytes.
+        """
+        return self.__slot_size
+
+    def close(self) -> None:
+        """
+        Detaches this process from the shared memory.
+        """
+        self.__shared_memory.close()
+
+    def unlink(self) -> None:
+        """
+        Frees the shared memory, only call once from the process that created the queue.
+        """
+        self.__shared_memory.unlink()
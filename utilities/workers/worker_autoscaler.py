@@ -0,0 +1,219 @@
+"""
+For scaling the number of workers to the input queue depth.
+"""
+
+import threading
+import time
+
+from modules.common.modules.logger import logger
+from utilities.workers import worker_controller
+from utilities.workers import worker_manager
+
+
+class WorkerAutoscaler:  # pylint: disable=too-many-instance-attributes
+    """
+    Adds or retires 1 worker of a worker manager at a time, within its minimum and maximum
+    worker counts, based on the estimated time to drain its input queues:
+    queue depth * service time per item / active workers.
+
+    Scales up above the scale up drain time and down below the lower scale down drain time,
+    and waits for the cooldown after each change, so the count does not oscillate.
+
+    The service time starts at the given estimate and is refined from the worker progress
+    counters while the input queues stay non-empty, as each loop iteration then handles an item.
+    Only suits stateless workers that each take 1 item per loop iteration.
+    """
+
+    __create_key = object()
+
+    # Weight of each new service time measurement
+    __SERVICE_TIME_WEIGHT = 0.3
+
+    @classmethod
+    def create(
+        cls,
+        manager: worker_manager.WorkerManager,
+        controller: worker_controller.WorkerController,
+        service_time: float,
+        scale_up_drain_time: float,
+        scale_down_drain_time: float,
+        cooldown: float,
+        local_logger: logger.Logger,
+    ) -> "tuple[bool, WorkerAutoscaler | None]":
+        """
+        manager: Manager of the workers to scale, with workers started.
+        controller: Worker controller of the workers.
+        service_time: Initial estimate of the time for a worker to handle an item in seconds,
+            must be greater than 0 .
+        scale_up_drain_time: Drain time in seconds to add a worker above.
+        scale_down_drain_time: Drain time in seconds to retire a worker below,
+            at least 0 and less than scale_up_drain_time .
+        cooldown: Time in seconds after a change before the next, at least 0 .
+        local_logger: Existing logger from process.
+
+        Returns whether the autoscaler was created and the autoscaler.
+        """
+        if service_time <= 0.0:
+            local_logger.error(f"Service time must be greater than 0, got {service_time}", True)
+            return False, None
+
+        if scale_down_drain_time < 0.0 or scale_down_drain_time >= scale_up_drain_time:
+            local_logger.error(
+                f"Invalid drain times, scale up {scale_up_drain_time} "
+                f"and scale down {scale_down_drain_time}",
+                True,
+            )
+            return False, None
+
+        if cooldown < 0.0:
+            local_logger.error(f"Cooldown must be at least 0, got {cooldown}", True)
+            return False, None
+
+        return True, WorkerAutoscaler(
+            cls.__create_key,
+            manager,
+            controller,
+            service_time,
+            scale_up_drain_time,
+            scale_down_drain_time,
+            cooldown,
+            local_logger,
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        manager: worker_manager.WorkerManager,
+        controller: worker_controller.WorkerController,
+        service_time: float,
+        scale_up_drain_time: float,
+        scale_down_drain_time: float,
+        cooldown: float,
+        local_logger: logger.Logger,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is WorkerAutoscaler.__create_key, "Use create() method"
+
+        self.__manager = manager
+        self.__controller = controller
+        self.__service_time = service_time
+        self.__scale_up_drain_time = scale_up_drain_time
+        self.__scale_down_drain_time = scale_down_drain_time
+        self.__cooldown = cooldown
+        self.__local_logger = local_logger
+
+        self.__last_time = time.monotonic()
+        self.__last_progress = self.__get_total_progress()
+        self.__last_depth = 0
+        self.__last_scale_time = self.__last_time
+
+        self.__stop_event = threading.Event()
+        self.__thread = None
+
+    def __get_total_progress(self) -> int:
+        """
+        Loop iterations of all workers, including stopped ones.
+        """
+        return sum(
+            self.__manager.get_worker_progress(index)
+            for index in range(self.__manager.get_slot_count())
+        )
+
+    def __get_depth(self) -> int:
+        """
+        Items waiting in the input queues, only those not yet read by this stage for broadcast
+        subscribers.
+        """
+        return sum(input_queue.qsize() for input_queue in self.__manager.get_input_queues())
+
+    def __measure(self, now: float, depth: int, worker_count: int) -> None:
+        """
+        Refines the service time if the workers were busy since the last measurement.
+        """
+        progress = self.__get_total_progress()
+        iteration_count = progress - self.__last_progress
+        is_busy = self.__last_depth > 0 and depth > 0
+
+        if is_busy and iteration_count > 0 and worker_count > 0:
+            service_time = worker_count * (now - self.__last_time) / iteration_count
+            self.__service_time += self.__SERVICE_TIME_WEIGHT * (service_time - self.__service_time)
+
+        self.__last_time = now
+        self.__last_progress = progress
+        self.__last_depth = depth
+
+    def get_service_time(self) -> float:
+        """
+        Returns the current estimate of the time for a worker to handle an item in seconds.
+        """
+        return self.__service_time
+
+    def run(self) -> int:
+        """
+        Measures the input queues and adds or retires a worker if needed.
+
+        Returns the change in worker count: 1, 0, or -1 .
+        """
+        # Nothing is handled while paused or exiting, so the queues say nothing about load
+        if self.__controller.is_exit_requested() or self.__controller.is_pause_requested():
+            self.__last_depth = 0
+            return 0
+
+        now = time.monotonic()
+        depth = self.__get_depth()
+        worker_count = self.__manager.get_worker_count()
+        self.__measure(now, depth, worker_count)
+
+        if now - self.__last_scale_time < self.__cooldown:
+            return 0
+
+        drain_time = depth * self.__service_time / max(worker_count, 1)
+
+        change = 0
+        if drain_time > self.__scale_up_drain_time and self.__manager.add_worker():
+            change = 1
+        elif drain_time < self.__scale_down_drain_time and self.__manager.retire_worker():
+            change = -1
+
+        if change != 0:
+            self.__last_scale_time = now
+            self.__local_logger.info(
+                f"Scaled {self.__manager.get_target_name()} to {worker_count + change} workers, "
+                f"drain time {drain_time:.3f} s",
+                True,
+            )
+
+        return change
+
+    def __run(self, period: float) -> None:
+        """
+        Background thread.
+        """
+        while not self.__stop_event.wait(period):
+            self.run()
+
+    def start(self, period: float) -> None:
+        """
+        Starts scaling in a background thread.
+
+        period: Time between runs in seconds.
+        """
+        if self.__thread is not None:
+            return
+
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self.__run, args=(period,), daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the background thread, waiting for a run in progress.
+        """
+        if self.__thread is None:
+            return
+
+        self.__stop_event.set()
+        self.__thread.join()
+        self.__thread = None
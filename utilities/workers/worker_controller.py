@@ -2,66 +2,308 @@
 For controlling workers.
 """
 
+import asyncio
+import contextvars
+import ctypes
 import multiprocessing as mp
 import time
 
 
-class WorkerController:
+class WorkerController:  # pylint: disable=too-many-instance-attributes
     """
     For interprocess communication from main to worker.
     Contains exit and pause requests.
+
+    Requests are bits of a flag word in shared memory, so checking them is a memory read
+    without any system call. Writers are serialized by a lock, and paused workers wait on
+    an event that is set whenever they should run.
+
+    Workers started by a worker manager are registered, so that main can wait until every
+    registered worker has parked in check_pause() or exited, and read how long that took.
+    A worker killed by a signal is never deregistered, so waits should have a timeout.
+    Registration is per process, thread, or asyncio task, so all 3 kinds of worker can share
+    a controller.
     """
 
-    __QUEUE_DELAY = 0.1  # seconds
+    # Registration of the current worker: controller, progress counters, retire flags, index
+    # Context variables are separate per process, per thread, and per asyncio task
+    __worker = contextvars.ContextVar("worker", default=None)
+
+    __EXIT_FLAG = 0x1
+    __PAUSE_FLAG = 0x2
+
+    # Indices of the shared counts
+    __REGISTERED_COUNT = 0
+    __PARKED_COUNT = 1
+
+    # Indices of the shared times, monotonic in seconds, 0 if not yet
+    __PAUSE_REQUEST_TIME = 0
+    __PAUSE_QUIESCENT_TIME = 1
+    __EXIT_REQUEST_TIME = 2
+    __EXIT_QUIESCENT_TIME = 3
 
     def __init__(self) -> None:
         """
-        Constructor creates internal queue and semaphore.
+        Constructor creates the shared flag word, counts, lock, and event.
+        """
+        self.__flags = mp.RawValue(ctypes.c_uint32, 0)
+        self.__counts = mp.RawArray(ctypes.c_int32, 2)
+        self.__times = mp.RawArray(ctypes.c_double, 4)
+
+        # Condition shares the writer lock, it is only needed by main when waiting
+        self.__lock = mp.Lock()
+        self.__condition = mp.Condition(self.__lock)
+        # Set while workers should run, cleared while paused
+        self.__run_event = mp.Event()
+        self.__run_event.set()
+
+    def __update(self) -> None:
+        """
+        Updates the run event and quiescent times to match the flags and counts.
+        Lock must be held.
+        """
+        flags = self.__flags.value
+
+        # Exit also releases paused workers so that they can exit
+        if flags & self.__PAUSE_FLAG and not flags & self.__EXIT_FLAG:
+            self.__run_event.clear()
+        else:
+            self.__run_event.set()
+
+        registered_count = self.__counts[self.__REGISTERED_COUNT]
+        now = time.monotonic()
+
+        is_parked = self.__counts[self.__PARKED_COUNT] >= registered_count
+        if flags & self.__PAUSE_FLAG and is_parked:
+            if self.__times[self.__PAUSE_QUIESCENT_TIME] == 0.0:
+                self.__times[self.__PAUSE_QUIESCENT_TIME] = now
+
+        if flags & self.__EXIT_FLAG and registered_count <= 0:
+            if self.__times[self.__EXIT_QUIESCENT_TIME] == 0.0:
+                self.__times[self.__EXIT_QUIESCENT_TIME] = now
+
+        self.__condition.notify_all()
+
+    def __request(
+        self,
+        flag: int,
+        request_time_index: int,
+        quiescent_time_index: int,
+        wait: bool,
+        timeout: "float | None",
+    ) -> bool:
+        """
+        Sets a flag and optionally waits until the workers have acknowledged it.
+        """
+        with self.__condition:
+            if not self.__flags.value & flag:
+                self.__flags.value |= flag
+                self.__times[request_time_index] = time.monotonic()
+                self.__times[quiescent_time_index] = 0.0
+                self.__update()
+
+            if not wait:
+                return True
+
+            return self.__condition.wait_for(
+                lambda: self.__times[quiescent_time_index] != 0.0 or not self.__flags.value & flag,
+                timeout,
+            ) and bool(self.__flags.value & flag)
+
+    def __clear(self, flag: int) -> None:
+        """
+        Clears a flag.
+        """
+        with self.__condition:
+            self.__flags.value &= ~flag
+            self.__update()
+
+    def __get_latency(self, request_time_index: int, quiescent_time_index: int) -> "float | None":
+        """
+        Time between a request and its acknowledgement.
+        """
+        quiescent_time = self.__times[quiescent_time_index]
+        if quiescent_time == 0.0:
+            return None
+
+        return quiescent_time - self.__times[request_time_index]
+
+    def expect_workers(self, count: int) -> None:
+        """
+        Counts workers that are about to be started, call from main before starting them.
+        Each must call register_worker() and deregister_worker() .
+        A negative count removes workers that stopped without deregistering.
+        """
+        with self.__condition:
+            self.__counts[self.__REGISTERED_COUNT] += count
+            self.__update()
+
+    def __get_worker(self) -> "tuple | None":
+        """
+        Returns the registration of the current worker with this controller, None if there is
+        none.
+        """
+        worker = WorkerController.__worker.get()
+        if worker is None or worker[0] is not self:
+            return None
+
+        return worker
+
+    def register_worker(
+        self,
+        progress: "ctypes.Array[ctypes.c_uint64] | None" = None,
+        retire_flags: "ctypes.Array[ctypes.c_uint8] | None" = None,
+        index: int = 0,
+    ) -> None:
+        """
+        Marks this process, thread, or asyncio task as an expected worker,
+        call from the worker when it starts.
+
+        progress: Shared counters, the counter at the index is incremented by every
+            check_pause() call so that the worker manager can tell whether the worker is stuck.
+        retire_flags: Shared flags, is_exit_requested() is also true while the flag at the
+            index is set so that the worker manager can stop this worker only.
+        index: Index of the counter and flag of this worker.
+        """
+        WorkerController.__worker.set((self, progress, retire_flags, index))
+
+    def deregister_worker(self) -> None:
+        """
+        Removes this worker from the count, call from the worker when it stops.
+        """
+        if self.__get_worker() is None:
+            return
+
+        WorkerController.__worker.set(None)
+        with self.__condition:
+            self.__counts[self.__REGISTERED_COUNT] -= 1
+            self.__update()
+
+    def get_registered_count(self) -> int:
+        """
+        Returns the number of workers started and not yet stopped.
         """
-        self.__pause = mp.BoundedSemaphore(1)
-        self.__is_paused = False
-        self.__exit_queue = mp.Queue(1)
+        return self.__counts[self.__REGISTERED_COUNT]
 
-    def request_pause(self) -> None:
+    def request_pause(self, wait: bool = False, timeout: "float | None" = None) -> bool:
         """
         Requests worker processes to pause.
+
+        wait: Whether to wait until every registered worker has parked in check_pause() .
+        timeout: Time waiting in seconds, None is forever.
+
+        Returns whether all workers have parked if waiting, otherwise True.
         """
-        if not self.__is_paused:
-            self.__pause.acquire()
-            self.__is_paused = True
+        return self.__request(
+            self.__PAUSE_FLAG,
+            self.__PAUSE_REQUEST_TIME,
+            self.__PAUSE_QUIESCENT_TIME,
+            wait,
+            timeout,
+        )
 
     def request_resume(self) -> None:
         """
         Requests worker processes to resume.
         """
-        if self.__is_paused:
-            self.__pause.release()
-            self.__is_paused = False
+        self.__clear(self.__PAUSE_FLAG)
+
+    def is_pause_requested(self) -> bool:
+        """
+        Returns whether main has requested the worker process to pause.
+        """
+        return bool(self.__flags.value & self.__PAUSE_FLAG)
+
+    def get_pause_latency(self) -> "float | None":
+        """
+        Returns the time in seconds from the last pause request until every registered worker
+        parked, None if they have not all parked yet.
+        """
+        return self.__get_latency(self.__PAUSE_REQUEST_TIME, self.__PAUSE_QUIESCENT_TIME)
 
     def check_pause(self) -> None:
         """
         Blocks worker if main has requested it to pause, otherwise continues.
+        Returns once resumed or exit has been requested.
         """
-        self.__pause.acquire()
-        self.__pause.release()
+        worker = self.__get_worker()
+        if worker is not None and worker[1] is not None:
+            worker[1][worker[3]] += 1
+
+        if not self.__flags.value & self.__PAUSE_FLAG:
+            return
 
-    def request_exit(self) -> None:
+        if worker is None:
+            self.__run_event.wait()
+            return
+
+        with self.__condition:
+            self.__counts[self.__PARKED_COUNT] += 1
+            self.__update()
+
+        # Stays parked if paused again before it woke, so it is not counted while running
+        while not self.__run_event.wait():
+            pass
+
+        # Before another pause request can count this worker as parked
+        with self.__condition:
+            self.__counts[self.__PARKED_COUNT] -= 1
+            self.__update()
+
+    async def check_pause_async(self) -> None:
+        """
+        Same as check_pause() for asyncio workers, waits in a thread of the default executor
+        so that the other tasks on the event loop can park too.
+        """
+        worker = self.__get_worker()
+        if worker is not None and worker[1] is not None:
+            worker[1][worker[3]] += 1
+
+        if not self.__flags.value & self.__PAUSE_FLAG:
+            return
+
+        loop = asyncio.get_running_loop()
+        if worker is None:
+            await loop.run_in_executor(None, self.__run_event.wait)
+            return
+
+        with self.__condition:
+            self.__counts[self.__PARKED_COUNT] += 1
+            self.__update()
+
+        try:
+            # Stays parked if paused again before it woke, so it is not counted while running
+            while not await loop.run_in_executor(None, self.__run_event.wait):
+                pass
+        finally:
+            with self.__condition:
+                self.__counts[self.__PARKED_COUNT] -= 1
+                self.__update()
+
+    def request_exit(self, wait: bool = False, timeout: "float | None" = None) -> bool:
         """
         Requests worker processes to exit.
         Does nothing if already requested.
+
+        wait: Whether to wait until every registered worker has stopped.
+        timeout: Time waiting in seconds, None is forever.
+
+        Returns whether all workers have stopped if waiting, otherwise True.
         """
-        time.sleep(self.__QUEUE_DELAY)
-        if self.__exit_queue.empty():
-            self.__exit_queue.put(None)
+        return self.__request(
+            self.__EXIT_FLAG,
+            self.__EXIT_REQUEST_TIME,
+            self.__EXIT_QUIESCENT_TIME,
+            wait,
+            timeout,
+        )
 
     def clear_exit(self) -> None:
         """
         Clears the exit request condition.
         Does nothing if already cleared.
         """
-        time.sleep(self.__QUEUE_DELAY)
-        if not self.__exit_queue.empty():
-            _ = self.__exit_queue.get()
+        self.__clear(self.__EXIT_FLAG)
 
     def is_exit_requested(self) -> bool:
         """
@@ -69,4 +311,15 @@ class WorkerController:
         There is a race condition, but it's fine because the worker process
         will do at most 1 additional loop.
         """
-        return not self.__exit_queue.empty()
+        if self.__flags.value & self.__EXIT_FLAG:
+            return True
+
+        worker = self.__get_worker()
+        return worker is not None and worker[2] is not None and bool(worker[2][worker[3]])
+
+    def get_exit_latency(self) -> "float | None":
+        """
+        Returns the time in seconds from the last exit request until every registered worker
+        stopped, None if they have not all stopped yet.
+        """
+        return self.__get_latency(self.__EXIT_REQUEST_TIME, self.__EXIT_QUIESCENT_TIME)
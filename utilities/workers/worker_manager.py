@@ -2,14 +2,142 @@
 For managing workers.
 """
 
+import ctypes
+import enum
+import inspect
 import multiprocessing as mp
+import multiprocessing.forkserver
+import os
+import threading
+import time
 
 from modules.common.modules.logger import logger
+from utilities.workers import asyncio_worker
 from utilities.workers import worker_controller
 from utilities.workers import queue_proxy_wrapper
+from utilities.workers import sharded_queue
 
 
-class WorkerProperties:
+class WorkerBackend(enum.Enum):
+    """
+    How workers are run.
+
+    PROCESS: Separate process, for CPU bound work and isolation.
+    THREAD: Thread of the main process, for I/O bound work that mostly waits.
+    ASYNCIO: Task on an event loop thread of the main process, the target must be a coroutine
+        function and must not block, so it calls controller.check_pause_async() .
+    """
+
+    PROCESS = 0
+    THREAD = 1
+    ASYNCIO = 2
+
+
+def start_forkserver(preload_modules: "list[str]") -> None:
+    """
+    Makes the fork server the default start method and starts it with the modules imported,
+    so that process workers are forked from it and do not import them again.
+    Call once at the start of main, before creating any multiprocessing objects.
+
+    Workers that are given objects that cannot be pickled (e.g. a connection) must use the
+    "fork" start method instead.
+
+    preload_modules: Names of modules for the fork server to import, "__main__" is the main
+        script and the modules it imports.
+    """
+    mp.set_start_method("forkserver")
+    mp.set_forkserver_preload(preload_modules)
+    multiprocessing.forkserver.ensure_running()
+
+
+def select_queue_backend(
+    endpoint_backends: "list[WorkerBackend | None]",
+    cross_process_backend: queue_proxy_wrapper.QueueBackend,
+) -> queue_proxy_wrapper.QueueBackend:
+    """
+    Picks the queue backend for an edge of the pipeline.
+
+    endpoint_backends: Backends of the producers and consumers of the queue, None for main.
+    cross_process_backend: Queue backend to use if any endpoint is a separate process.
+
+    Returns the in process backend if every endpoint is in the main process.
+    """
+    if WorkerBackend.PROCESS in endpoint_backends:
+        return cross_process_backend
+
+    return queue_proxy_wrapper.QueueBackend.IN_PROCESS
+
+
+def set_scheduling(cpu_affinity: "set[int] | None", nice: "int | None") -> None:
+    """
+    Pins the calling process or thread to CPUs and sets its nice value.
+    On Linux both are per thread, so a thread worker leaves the rest of main unchanged.
+
+    cpu_affinity: CPUs to run on, None is unchanged.
+    nice: Nice value from -20 to 19, higher runs less often, None is unchanged.
+        Lowering it requires privileges.
+    """
+    if cpu_affinity is not None:
+        os.sched_setaffinity(0, cpu_affinity)
+
+    if nice is not None:
+        os.setpriority(os.PRIO_PROCESS, 0, nice)
+
+
+def run_worker(
+    target: "(...) -> object",  # type: ignore
+    args: "tuple",
+    controller: worker_controller.WorkerController,
+    progress: "ctypes.Array[ctypes.c_uint64]",
+    retire_flags: "ctypes.Array[ctypes.c_uint8]",
+    index: int,
+    cpu_affinity: "set[int] | None" = None,
+    nice: "int | None" = None,
+) -> None:
+    """
+    Worker process entry point, registers with the controller while the target runs.
+
+    target: Function.
+    args: Target function arguments.
+    controller: Worker controller.
+    progress: Progress counters of the workers of the manager, in shared memory.
+    retire_flags: Retire flags of the workers of the manager, in shared memory.
+    index: Index of this worker.
+    cpu_affinity: CPUs to run on, None is unchanged.
+    nice: Nice value, None is unchanged.
+    """
+    # Running with the default scheduling is better than not running
+    try:
+        set_scheduling(cpu_affinity, nice)
+    except OSError as e:
+        print(f"ERROR: Worker failed to set scheduling: {e}")
+
+    controller.register_worker(progress, retire_flags, index)
+    try:
+        target(*args)
+    finally:
+        controller.deregister_worker()
+
+
+async def run_worker_async(
+    target: "(...) -> collections.abc.Coroutine",  # type: ignore
+    args: "tuple",
+    controller: worker_controller.WorkerController,
+    progress: "ctypes.Array[ctypes.c_uint64]",
+    retire_flags: "ctypes.Array[ctypes.c_uint8]",
+    index: int,
+) -> None:
+    """
+    Asyncio worker entry point, same as run_worker() .
+    """
+    controller.register_worker(progress, retire_flags, index)
+    try:
+        await target(*args)
+    finally:
+        controller.deregister_worker()
+
+
+class WorkerProperties:  # pylint: disable=too-many-instance-attributes
     """
     Worker Properties.
     """
@@ -22,21 +150,32 @@ class WorkerProperties:
         count: int,
         target: "(...) -> object",  # type: ignore
         work_arguments: "tuple",
-        input_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
-        output_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
+        input_queues: "list[queue_proxy_wrapper.QueueProxyWrapper | sharded_queue.ShardedQueue]",
+        output_queues: "list[queue_proxy_wrapper.QueueProxyWrapper | sharded_queue.ShardedQueue]",
         controller: worker_controller.WorkerController,
         local_logger: logger.Logger,
+        max_count: "int | None" = None,
+        backend: WorkerBackend = WorkerBackend.PROCESS,
+        start_method: "str | None" = None,
+        cpu_affinity: "set[int] | None" = None,
+        nice: "int | None" = None,
     ) -> "tuple[bool, WorkerProperties | None]":
         """
         Creates worker properties.
 
-        count: Number of workers.
+        count: Number of workers, the initial and minimum number if scaling.
         target: Function.
-        work_arguments: Arguments for worker internals.
-        input_queues: Input queues.
-        output_queues: Output queues.
+        work_arguments: Arguments for worker internals, worker `i` gets value `i` of PerWorker.
+        input_queues: Input queues, worker `i` gets shard `i` of sharded queues.
+        output_queues: Output queues, worker `i` gets shard `i` of sharded queues.
         controller: Worker controller.
         local_logger: Existing logger from process.
+        max_count: Maximum number of workers if scaling, None is count (not scaling).
+        backend: How the workers are run.
+        start_method: Multiprocessing start method of process workers, None is the default.
+        cpu_affinity: CPUs the workers run on, None is any. Not for asyncio workers.
+        nice: Nice value of the workers from -20 to 19, higher runs less often,
+            None is inherited from main. Not for asyncio workers.
 
         Returns the WorkerProperties object.
         """
@@ -47,9 +186,83 @@ class WorkerProperties:
             )
             return False, None
 
+        if max_count is None:
+            max_count = count
+
+        if max_count < count:
+            local_logger.error(
+                f"Maximum worker count {max_count} is less than worker count {count}",
+                True,
+            )
+            return False, None
+
+        if (backend == WorkerBackend.ASYNCIO) != inspect.iscoroutinefunction(target):
+            local_logger.error(
+                f"Asyncio backend requires a coroutine function target and other backends "
+                f"require a function, got {backend.name} with {target.__name__}",
+                True,
+            )
+            return False, None
+
+        if backend == WorkerBackend.PROCESS:
+            for worker_queue in input_queues + output_queues:
+                if worker_queue.backend == queue_proxy_wrapper.QueueBackend.IN_PROCESS:
+                    local_logger.error(
+                        f"Process workers cannot use in process queues, target {target.__name__}",
+                        True,
+                    )
+                    return False, None
+
+        # Each worker owns a shard, so the workers cannot scale
+        for argument in list(work_arguments) + input_queues + output_queues:
+            if isinstance(argument, sharded_queue.ShardedQueue):
+                shard_count = len(argument.get_shards())
+            elif isinstance(argument, sharded_queue.PerWorker):
+                shard_count = len(argument)
+            else:
+                continue
+
+            if count != shard_count or max_count != shard_count:
+                local_logger.error(
+                    f"Workers of sharded queues need a fixed count equal to the {shard_count} "
+                    f"shards, got {count} to {max_count}, target {target.__name__}",
+                    True,
+                )
+                return False, None
+
+        if start_method is not None and start_method not in mp.get_all_start_methods():
+            local_logger.error(f"Unsupported start method: {start_method}", True)
+            return False, None
+
+        if backend == WorkerBackend.ASYNCIO and (cpu_affinity is not None or nice is not None):
+            local_logger.error("Asyncio workers share a thread, cannot set their scheduling", True)
+            return False, None
+
+        if cpu_affinity is not None:
+            if not hasattr(os, "sched_setaffinity"):
+                local_logger.error("CPU affinity is not supported on this platform", True)
+                return False, None
+
+            available_cpus = os.sched_getaffinity(0)
+            if len(cpu_affinity) == 0 or not cpu_affinity <= available_cpus:
+                local_logger.error(
+                    f"CPU affinity {cpu_affinity} is not a subset of {available_cpus}",
+                    True,
+                )
+                return False, None
+
+        if nice is not None and not -20 <= nice <= 19:
+            local_logger.error(f"Nice value must be from -20 to 19, got {nice}", True)
+            return False, None
+
         return True, WorkerProperties(
             cls.__create_key,
             count,
+            max_count,
+            backend,
+            start_method,
+            cpu_affinity,
+            nice,
             target,
             work_arguments,
             input_queues,
@@ -61,10 +274,15 @@ class WorkerProperties:
         self,
         class_private_create_key: object,
         count: int,
+        max_count: int,
+        backend: WorkerBackend,
+        start_method: "str | None",
+        cpu_affinity: "set[int] | None",
+        nice: "int | None",
         target: "(...) -> object",  # type: ignore
         work_arguments: "tuple",
-        input_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
-        output_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
+        input_queues: "list[queue_proxy_wrapper.QueueProxyWrapper | sharded_queue.ShardedQueue]",
+        output_queues: "list[queue_proxy_wrapper.QueueProxyWrapper | sharded_queue.ShardedQueue]",
         controller: worker_controller.WorkerController,
     ) -> None:
         """
@@ -73,43 +291,89 @@ class WorkerProperties:
         assert class_private_create_key is WorkerProperties.__create_key, "Use create() method"
 
         self.__count = count
+        self.__max_count = max_count
+        self.__backend = backend
+        self.__start_method = start_method
+        self.__cpu_affinity = cpu_affinity
+        self.__nice = nice
         self.__target = target
         self.__work_arguments = work_arguments
         self.__input_queues = input_queues
         self.__output_queues = output_queues
         self.__controller = controller
 
-    def get_worker_arguments(self) -> "tuple":
+    def get_worker_arguments(self, index: int) -> "tuple":
         """
         Concatenates the worker properties into a tuple.
 
+        index: Index of the worker, which selects its shard of sharded queues.
+
         Returns the worker properties as a tuple.
         """
-        return (
-            self.__work_arguments
-            + tuple(self.__input_queues)
-            + tuple(self.__output_queues)
-            + (self.__controller,)
+        work_arguments = tuple(
+            argument.get(index) if isinstance(argument, sharded_queue.PerWorker) else argument
+            for argument in self.__work_arguments
+        )
+        queues = tuple(
+            (
+                worker_queue.get_shards()[index]
+                if isinstance(worker_queue, sharded_queue.ShardedQueue)
+                else worker_queue
+            )
+            for worker_queue in self.__input_queues + self.__output_queues
         )
+        return work_arguments + queues + (self.__controller,)
 
     def get_worker_count(self) -> int:
         """
-        Returns the worker count.
+        Returns the worker count, the minimum if scaling.
         """
         return self.__count
 
+    def get_max_worker_count(self) -> int:
+        """
+        Returns the maximum worker count.
+        """
+        return self.__max_count
+
+    def get_backend(self) -> WorkerBackend:
+        """
+        Returns how the workers are run.
+        """
+        return self.__backend
+
+    def get_start_method(self) -> "str | None":
+        """
+        Returns the multiprocessing start method of process workers, None if the default.
+        """
+        return self.__start_method
+
+    def get_scheduling(self) -> "tuple[set[int] | None, int | None]":
+        """
+        Returns the CPU affinity and nice value of the workers, None if unchanged.
+        """
+        return self.__cpu_affinity, self.__nice
+
     def get_worker_target(self) -> "(...) -> object":  # type: ignore
         """
         Returns the worker target.
         """
         return self.__target
 
-    def get_input_queues(self) -> "list[queue_proxy_wrapper.QueueProxyWrapper]":
+    def get_input_queues(
+        self,
+    ) -> "list[queue_proxy_wrapper.QueueProxyWrapper | sharded_queue.ShardedQueue]":
         """
         Returns the input queues.
         """
         return self.__input_queues
 
+    def get_controller(self) -> worker_controller.WorkerController:
+        """
+        Returns the worker controller.
+        """
+        return self.__controller
+
     def get_target_name(self) -> str:
         """
         Returns the name of the target.
@@ -117,14 +381,25 @@ class WorkerProperties:
         return self.__target.__name__
 
 
-class WorkerManager:
+class WorkerManager:  # pylint: disable=too-many-instance-attributes
     """
     For interprocess communication from main to worker.
     Contains exit and pause requests.
+
+    Workers occupy slots up to the maximum worker count. Scaling down sets the retire flag of a
+    slot, which makes is_exit_requested() true for that worker only, and the slot is freed once
+    the worker has stopped. Workers should therefore not block indefinitely on their inputs.
+
+    Methods may be called from main and from supervisor or autoscaler threads.
+
+    Thread workers cannot be stopped from outside, so only a dead thread worker can be
+    restarted. Asyncio workers are cancelled at their current await.
     """
 
     __create_key = object()
 
+    __STOP_TIMEOUT = 1.0  # seconds
+
     @classmethod
     def create(
         cls,
@@ -139,22 +414,39 @@ class WorkerManager:
 
         Returns whether the workers were able to be created and the Worker Manager.
         """
-        workers = []
-        for _ in range(0, worker_properties.get_worker_count()):
+        max_count = worker_properties.get_max_worker_count()
+
+        # Workers count their loop iterations here so that hangs can be detected
+        progress = mp.RawArray(ctypes.c_uint64, max_count)
+        retire_flags = mp.RawArray(ctypes.c_uint8, max_count)
+
+        # Asyncio workers of this manager share an event loop
+        loop_thread = None
+        if worker_properties.get_backend() == WorkerBackend.ASYNCIO:
+            loop_thread = asyncio_worker.EventLoopThread(worker_properties.get_target_name())
+
+        workers = [None] * max_count
+        for index in range(0, worker_properties.get_worker_count()):
             result, worker = WorkerManager.__create_single_worker(
-                worker_properties.get_worker_target(),
-                worker_properties.get_worker_arguments(),
+                worker_properties,
+                progress,
+                retire_flags,
+                loop_thread,
+                index,
                 local_logger,
             )
             if not result:
                 local_logger.error("Failed to create worker", True)
                 return False, None
 
-            workers.append(worker)
+            workers[index] = worker
 
         return True, WorkerManager(
             cls.__create_key,
             workers,
+            progress,
+            retire_flags,
+            loop_thread,
             worker_properties,
             local_logger,
         )
@@ -162,7 +454,10 @@ class WorkerManager:
     def __init__(
         self,
         class_private_create_key: object,
-        workers: "list[mp.Process]",
+        workers: "list[mp.Process | threading.Thread | asyncio_worker.AsyncioWorker | None]",
+        progress: "ctypes.Array[ctypes.c_uint64]",
+        retire_flags: "ctypes.Array[ctypes.c_uint8]",
+        loop_thread: "asyncio_worker.EventLoopThread | None",
         worker_properties: WorkerProperties,
         local_logger: logger.Logger,
     ) -> None:
@@ -172,22 +467,63 @@ class WorkerManager:
         assert class_private_create_key is WorkerManager.__create_key, "Use create() method"
 
         self.__workers = workers
+        self.__progress = progress
+        self.__retire_flags = retire_flags
+        self.__loop_thread = loop_thread
+        # Number of workers started in each slot
+        self.__generations = [0] * len(workers)
         self.__worker_properties = worker_properties
         self.__local_logger = local_logger
 
+        self.__lock = threading.Lock()
+
     @staticmethod
-    def __create_single_worker(target: "(...) -> object", args: "tuple", local_logger: logger.Logger) -> "tuple[bool, mp.Process | None]":  # type: ignore
+    def __create_single_worker(
+        worker_properties: WorkerProperties,
+        progress: "ctypes.Array[ctypes.c_uint64]",
+        retire_flags: "ctypes.Array[ctypes.c_uint8]",
+        loop_thread: "asyncio_worker.EventLoopThread | None",
+        index: int,
+        local_logger: logger.Logger,
+    ) -> "tuple[bool, mp.Process | threading.Thread | asyncio_worker.AsyncioWorker | None]":
         """
         Creates a single worker.
 
-        target: Function.
-        args: Target function arguments.
+        worker_properties: Worker properties.
+        progress: Progress counters of the workers of the manager.
+        retire_flags: Retire flags of the workers of the manager.
+        loop_thread: Event loop for asyncio workers, None for other backends.
+        index: Index of the worker.
         local_logger: Existing logger from process.
 
         Returns whether a worker was created and the worker.
         """
+        name = f"{worker_properties.get_target_name()}_{index}"
+        args = (
+            worker_properties.get_worker_target(),
+            worker_properties.get_worker_arguments(index),
+            worker_properties.get_controller(),
+            progress,
+            retire_flags,
+            index,
+        )
+
         try:
-            worker = mp.Process(target=target, args=args)
+            backend = worker_properties.get_backend()
+            scheduled_args = args + worker_properties.get_scheduling()
+            if backend == WorkerBackend.PROCESS:
+                context = mp.get_context(worker_properties.get_start_method())
+                worker = context.Process(target=run_worker, args=scheduled_args, name=name)
+            elif backend == WorkerBackend.THREAD:
+                worker = threading.Thread(
+                    target=run_worker,
+                    args=scheduled_args,
+                    name=name,
+                    daemon=True,
+                )
+            else:
+                assert loop_thread is not None, "Asyncio workers require an event loop"
+                worker = asyncio_worker.AsyncioWorker(loop_thread, run_worker_async, args, name)
         # Catching all exceptions for library call
         # pylint: disable-next=broad-exception-caught
         except Exception as e:
@@ -196,52 +532,298 @@ class WorkerManager:
 
         return True, worker
 
+    def __start_single_worker(self, index: int) -> bool:
+        """
+        Creates and starts a worker in the slot. Lock must be held.
+        """
+        self.__retire_flags[index] = 0
+        result, worker = WorkerManager.__create_single_worker(
+            self.__worker_properties,
+            self.__progress,
+            self.__retire_flags,
+            self.__loop_thread,
+            index,
+            self.__local_logger,
+        )
+        if not result:
+            return False
+
+        # Get Pylance to stop complaining
+        assert worker is not None
+
+        self.__worker_properties.get_controller().expect_workers(1)
+        worker.start()
+        self.__workers[index] = worker
+        self.__generations[index] += 1
+        return True
+
+    def __reap_retired_workers(self) -> None:
+        """
+        Frees the slots of retired workers that have stopped. Lock must be held.
+        """
+        for index, worker in enumerate(self.__workers):
+            if worker is None or not self.__retire_flags[index] or worker.is_alive():
+                continue
+
+            worker.join()
+            self.__workers[index] = None
+            self.__retire_flags[index] = 0
+
     def start_workers(self) -> None:
         """
         Start workers.
         """
-        for worker in self.__workers:
-            worker.start()
+        with self.__lock:
+            workers = [worker for worker in self.__workers if worker is not None]
+
+            # Count workers before starting so that main never sees too few registered
+            self.__worker_properties.get_controller().expect_workers(len(workers))
+            for worker in workers:
+                worker.start()
+
+    def __check_stopped(self) -> bool:
+        """
+        Stops the event loop of asyncio workers once all workers have stopped.
+        Lock must be held.
 
-    def join_workers(self) -> None:
+        Returns whether all workers have stopped.
+        """
+        if any(worker is not None and worker.is_alive() for worker in self.__workers):
+            return False
+
+        if self.__loop_thread is not None:
+            self.__loop_thread.stop()
+            self.__loop_thread = None
+
+        return True
+
+    def join_workers(self, deadline: "float | None" = None) -> bool:
         """
         Join workers.
+
+        deadline: Monotonic time in seconds to give up at, None is forever.
+            Several managers can be joined in turn with the same deadline, as their workers
+            stop concurrently.
+
+        Returns whether all workers have stopped.
         """
-        for worker in self.__workers:
-            worker.join()
+        with self.__lock:
+            for worker in self.__workers:
+                if worker is None:
+                    continue
 
-    def check_and_restart_dead_workers(self) -> bool:
+                if deadline is None:
+                    worker.join()
+                else:
+                    worker.join(max(deadline - time.monotonic(), 0.0))
+
+            return self.__check_stopped()
+
+    def stop_workers(self) -> bool:
         """
-        Check and restart dead workers.
+        Forcibly stops workers that are still running, call after join_workers() gives up.
+        Process workers are terminated, and killed if still running after a timeout.
+        Asyncio workers are cancelled. Thread workers cannot be stopped, they are daemons so
+        they stop when main does.
 
-        Returns whether the dead workers were able to be restarted.
+        Returns whether all workers have stopped.
         """
-        new_workers = []
-        for worker in self.__workers:
-            if worker.is_alive():
-                new_workers.append(worker)
-                continue
+        with self.__lock:
+            backend = self.__worker_properties.get_backend()
+            running_workers = [
+                worker for worker in self.__workers if worker is not None and worker.is_alive()
+            ]
+
+            for worker in running_workers:
+                if backend == WorkerBackend.THREAD:
+                    self.__local_logger.error(
+                        f"Cannot stop running thread {self.get_target_name()} {worker.name}",
+                        True,
+                    )
+                    continue
+
+                worker.terminate()
+
+            # Terminated workers stop concurrently
+            deadline = time.monotonic() + self.__STOP_TIMEOUT
+            for worker in running_workers:
+                worker.join(max(deadline - time.monotonic(), 0.0))
+
+            if backend == WorkerBackend.PROCESS:
+                for worker in running_workers:
+                    if worker.is_alive():
+                        self.__local_logger.warning(
+                            f"Killing {self.get_target_name()} {worker.name}",
+                            True,
+                        )
+                        worker.kill()
+                        worker.join()
+
+                    # Killed by a signal, so it could not deregister itself
+                    if worker.exitcode < 0:
+                        self.__worker_properties.get_controller().expect_workers(-1)
+
+            return self.__check_stopped()
 
-            # Log dead worker
-            target_and_worker_name = f"{self.__worker_properties.get_target_name()} {worker.name}"
-            self.__local_logger.warning(
-                f"Worker died, restarting {target_and_worker_name}",
-                True,
-            )
+    def get_target_name(self) -> str:
+        """
+        Returns the name of the target of the workers.
+        """
+        return self.__worker_properties.get_target_name()
 
-            # Create a new worker
-            result, new_worker = WorkerManager.__create_single_worker(
-                self.__worker_properties.get_worker_target(),
-                self.__worker_properties.get_worker_arguments(),
-                self.__local_logger,
-            )
-            if not result:
-                self.__local_logger.error(f"Failed to restart {target_and_worker_name}", True)
+    def get_input_queues(self) -> "list[queue_proxy_wrapper.QueueProxyWrapper]":
+        """
+        Returns the input queues of the workers.
+        """
+        return self.__worker_properties.get_input_queues()
+
+    def get_slot_count(self) -> int:
+        """
+        Returns the number of worker slots, which is the maximum worker count.
+        """
+        return len(self.__workers)
+
+    def get_worker_count(self) -> int:
+        """
+        Returns the number of active workers, excluding retiring workers.
+        """
+        return sum(1 for index in range(len(self.__workers)) if self.is_worker_active(index))
+
+    def is_worker_active(self, index: int) -> bool:
+        """
+        Returns whether the slot has a worker that has not been retired.
+        """
+        return self.__workers[index] is not None and not self.__retire_flags[index]
+
+    def is_worker_alive(self, index: int) -> bool:
+        """
+        Returns whether the slot has a running worker.
+        """
+        worker = self.__workers[index]
+        return worker is not None and worker.is_alive()
+
+    def get_worker_generation(self, index: int) -> int:
+        """
+        Returns the number of workers started in the slot by add_worker() and restart_worker(),
+        which changes whenever the slot gets a different worker.
+        """
+        return self.__generations[index]
+
+    def get_worker_progress(self, index: int) -> int:
+        """
+        Returns the number of loop iterations of the worker (calls to check_pause()),
+        which wraps around.
+        """
+        return self.__progress[index]
+
+    def add_worker(self) -> bool:
+        """
+        Starts a worker in a free slot.
+
+        Returns whether a worker was started, False if at the maximum worker count.
+        """
+        with self.__lock:
+            self.__reap_retired_workers()
+            for index, worker in enumerate(self.__workers):
+                if worker is None:
+                    return self.__start_single_worker(index)
+
+        return False
+
+    def retire_worker(self) -> bool:
+        """
+        Requests the newest active worker to stop, its slot is freed once it has stopped.
+
+        Returns whether a worker was retired, False if at the minimum worker count.
+        """
+        with self.__lock:
+            self.__reap_retired_workers()
+            if self.get_worker_count() <= self.__worker_properties.get_worker_count():
                 return False
 
-            # Append the new worker
-            new_workers.append(new_worker)
+            for index in reversed(range(len(self.__workers))):
+                if self.is_worker_active(index):
+                    self.__retire_flags[index] = 1
+                    return True
+
+        return False
 
-        self.__workers = new_workers
+    def __restart_worker(self, index: int) -> bool:
+        """
+        Stops the worker if it is still running and starts a replacement. Lock must be held.
+
+        Returns whether the replacement was started.
+        """
+        worker = self.__workers[index]
+        if worker is None:
+            return False
+
+        target_and_worker_name = f"{self.get_target_name()} {worker.name}"
+        backend = self.__worker_properties.get_backend()
+
+        if worker.is_alive():
+            if backend == WorkerBackend.THREAD:
+                self.__local_logger.error(
+                    f"Cannot stop running thread {target_and_worker_name}",
+                    True,
+                )
+                return False
+
+            worker.terminate()
+            worker.join(self.__STOP_TIMEOUT)
+
+            if worker.is_alive() and backend == WorkerBackend.ASYNCIO:
+                self.__local_logger.error(
+                    f"Cancelled task {target_and_worker_name} did not stop",
+                    True,
+                )
+                return False
+
+            if worker.is_alive():
+                worker.kill()
+                worker.join()
+
+        # Killed by a signal, so it could not deregister itself
+        if backend == WorkerBackend.PROCESS and worker.exitcode < 0:
+            self.__worker_properties.get_controller().expect_workers(-1)
+
+        self.__workers[index] = None
+        if not self.__start_single_worker(index):
+            self.__local_logger.error(f"Failed to restart {target_and_worker_name}", True)
+            return False
+
+        return True
+
+    def restart_worker(self, index: int) -> bool:
+        """
+        Stops the worker if it is still running and starts a replacement.
+
+        index: Index of the worker.
+
+        Returns whether the replacement was started.
+        """
+        with self.__lock:
+            return self.__restart_worker(index)
+
+    def check_and_restart_dead_workers(self) -> bool:
+        """
+        Check and restart dead workers.
+
+        Returns whether the dead workers were able to be restarted.
+        """
+        # Same slots as add_worker(), retire_worker() and restart_worker() from other threads
+        with self.__lock:
+            for index, worker in enumerate(self.__workers):
+                if not self.is_worker_active(index) or worker.is_alive():
+                    continue
+
+                # Log dead worker
+                self.__local_logger.warning(
+                    f"Worker died, restarting {self.get_target_name()} {worker.name}",
+                    True,
+                )
+
+                if not self.__restart_worker(index):
+                    return False
 
         return True
@@ -0,0 +1,244 @@
+"""
+For restarting crashed and hung workers.
+"""
+
+import threading
+import time
+
+from modules.common.modules.logger import logger
+from utilities.workers import worker_controller
+from utilities.workers import worker_manager
+
+
+class WorkerSupervisor:  # pylint: disable=too-many-instance-attributes
+    """
+    Checks the workers of several worker managers, and restarts workers that have died or
+    whose progress counter has not changed for too long (e.g. stuck in a blocking call).
+
+    Restarts of the same worker back off exponentially, and the backoff resets once the
+    worker has run for longer than the maximum backoff. Nothing is checked while exit is
+    requested, and hangs are not checked while pause is requested.
+
+    Call check() from the main loop, or start() a background thread that does.
+    Stop the thread before joining the workers.
+
+    A hung process worker is terminated, which does not release locks it holds. If it was
+    inside a shared memory queue (SHARED_MEMORY, LATEST_VALUE or BROADCAST backends) or a
+    worker controller request, that lock stays held and every other user of it blocks, so
+    restarting only recovers workers hung outside those. Such a hang needs the queues and
+    workers using them to be created again, e.g. by restarting main.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        worker_managers: "list[worker_manager.WorkerManager]",
+        controller: worker_controller.WorkerController,
+        hang_timeout: float,
+        initial_backoff: float,
+        max_backoff: float,
+        local_logger: logger.Logger,
+    ) -> "tuple[bool, WorkerSupervisor | None]":
+        """
+        worker_managers: Managers of the workers to supervise, with workers started.
+        controller: Worker controller of the workers.
+        hang_timeout: Time in seconds without progress before a worker is considered hung,
+            must be greater than 0 .
+        initial_backoff: Time in seconds after the first restart of a worker before it can be
+            restarted again, doubling with each restart, at least 0 .
+        max_backoff: Maximum time in seconds between restarts of a worker,
+            at least initial_backoff .
+        local_logger: Existing logger from process.
+
+        Returns whether the supervisor was created and the supervisor.
+        """
+        if hang_timeout <= 0.0:
+            local_logger.error(f"Hang timeout must be greater than 0, got {hang_timeout}", True)
+            return False, None
+
+        if initial_backoff < 0.0 or max_backoff < initial_backoff:
+            local_logger.error(
+                f"Invalid backoff, initial {initial_backoff} and maximum {max_backoff}",
+                True,
+            )
+            return False, None
+
+        return True, WorkerSupervisor(
+            cls.__create_key,
+            worker_managers,
+            controller,
+            hang_timeout,
+            initial_backoff,
+            max_backoff,
+            local_logger,
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        worker_managers: "list[worker_manager.WorkerManager]",
+        controller: worker_controller.WorkerController,
+        hang_timeout: float,
+        initial_backoff: float,
+        max_backoff: float,
+        local_logger: logger.Logger,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is WorkerSupervisor.__create_key, "Use create() method"
+
+        self.__worker_managers = worker_managers
+        self.__controller = controller
+        self.__hang_timeout = hang_timeout
+        self.__initial_backoff = initial_backoff
+        self.__max_backoff = max_backoff
+        self.__local_logger = local_logger
+
+        # Per worker slot, keyed by manager index and worker index, filled in on first check
+        self.__generation = {}
+        self.__last_progress = {}
+        self.__last_progress_time = {}
+        self.__start_time = {}
+        self.__restart_count = {}
+        self.__next_restart_time = {}
+
+        self.__stop_event = threading.Event()
+        self.__thread = None
+
+    def __track(
+        self,
+        key: "tuple[int, int]",
+        manager: worker_manager.WorkerManager,
+        now: float,
+    ) -> None:
+        """
+        Resets the progress tracking of the slot if it has a different worker than last time,
+        keeping the restart backoff.
+        """
+        generation = manager.get_worker_generation(key[1])
+        if key in self.__generation and self.__generation[key] == generation:
+            return
+
+        self.__generation[key] = generation
+        self.__last_progress[key] = manager.get_worker_progress(key[1])
+        self.__last_progress_time[key] = now
+        self.__start_time[key] = now
+        self.__restart_count.setdefault(key, 0)
+        self.__next_restart_time.setdefault(key, now)
+
+    def __is_hung(
+        self,
+        key: "tuple[int, int]",
+        manager: worker_manager.WorkerManager,
+        now: float,
+    ) -> bool:
+        """
+        Updates the progress of the worker and returns whether it has stopped progressing.
+        """
+        progress = manager.get_worker_progress(key[1])
+        if progress != self.__last_progress[key] or self.__controller.is_pause_requested():
+            self.__last_progress[key] = progress
+            self.__last_progress_time[key] = now
+            return False
+
+        return now - self.__last_progress_time[key] > self.__hang_timeout
+
+    def __restart(
+        self,
+        key: "tuple[int, int]",
+        manager: worker_manager.WorkerManager,
+        reason: str,
+    ) -> None:
+        """
+        Restarts the worker if its backoff has elapsed. A failed restart backs off the same
+        as a successful one, so it is not attempted again on every check.
+        """
+        now = time.monotonic()
+        if now < self.__next_restart_time[key]:
+            return
+
+        self.__local_logger.warning(
+            f"Restarting {manager.get_target_name()} worker {key[1]}: {reason}",
+            True,
+        )
+
+        # Running long enough means the earlier restarts were unrelated
+        if now - self.__start_time[key] > self.__max_backoff:
+            self.__restart_count[key] = 0
+
+        backoff = min(self.__initial_backoff * 2 ** self.__restart_count[key], self.__max_backoff)
+        self.__restart_count[key] += 1
+        self.__next_restart_time[key] = now + backoff
+        # Failed restarts are not a worker running, so they do not reset the backoff
+        self.__start_time[key] = now
+
+        if not manager.restart_worker(key[1]):
+            return
+
+        self.__track(key, manager, now)
+
+    def check(self) -> int:
+        """
+        Checks every worker once and restarts dead and hung workers whose backoff has elapsed.
+
+        Returns the number of dead and hung workers found.
+        """
+        if self.__controller.is_exit_requested():
+            return 0
+
+        found_count = 0
+        now = time.monotonic()
+        for manager_index, manager in enumerate(self.__worker_managers):
+            for index in range(manager.get_slot_count()):
+                # Free slots and retiring workers are up to the worker manager
+                if not manager.is_worker_active(index):
+                    continue
+
+                key = (manager_index, index)
+                self.__track(key, manager, now)
+
+                if not manager.is_worker_alive(index):
+                    reason = "died"
+                elif self.__is_hung(key, manager, now):
+                    reason = f"hung, no progress for {self.__hang_timeout} s"
+                else:
+                    continue
+
+                found_count += 1
+                self.__restart(key, manager, reason)
+
+        return found_count
+
+    def __run(self, period: float) -> None:
+        """
+        Background thread.
+        """
+        while not self.__stop_event.wait(period):
+            self.check()
+
+    def start(self, period: float) -> None:
+        """
+        Starts checking in a background thread.
+
+        period: Time between checks in seconds.
+        """
+        if self.__thread is not None:
+            return
+
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self.__run, args=(period,), daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the background thread, waiting for a check in progress.
+        """
+        if self.__thread is None:
+            return
+
+        self.__stop_event.set()
+        self.__thread.join()
+        self.__thread = None